@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+File Scanner
+Shared directory walker for the project's scripts, built on os.scandir
+"""
+
+import os
+import json
+from fnmatch import fnmatch
+from pathlib import Path
+
+class FileScanner:
+    """
+    Walks a directory tree and yields matching files as soon as they are found
+    
+    Directories matching an exclude glob (by name or by path relative to the
+    root) are never entered. With a snapshot_path, the entries of each
+    directory are remembered along with its mtime; a directory whose mtime
+    has not changed since the last scan is not listed again. Its subdirectories
+    are still checked, since a change deep in a tree does not touch the mtime
+    of its parents.
+    """
+    default_excludes = ('.git', 'node_modules', '__pycache__', '.venv', 'venv')
+    
+    def __init__(self, extensions=None, exclude=None, exclude_dirs=None, snapshot_path=None):
+        self.extensions = {e.lower() for e in extensions} if extensions else None
+        self.exclude = tuple(self.default_excludes if exclude is None else exclude)
+        self.exclude_dirs = {os.path.realpath(d) for d in exclude_dirs or ()}
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        
+        self.stats = {'directories': 0, 'listed': 0, 'reused': 0}
+    
+    def is_excluded(self, name, rel_path):
+        """Whether an entry matches one of the exclude globs"""
+        return any(fnmatch(name, glob) or fnmatch(rel_path, glob) for glob in self.exclude)
+    
+    def matches(self, name):
+        """Whether a file name has one of the wanted extensions"""
+        return self.extensions is None or os.path.splitext(name)[1].lower() in self.extensions
+    
+    def scan(self, root=".", pattern=None):
+        """
+        Yield paths of matching files under root, in sorted order per directory
+        
+        Paths are joined onto root the way os.walk joins them. When pattern is
+        given, only paths containing it are yielded. The snapshot is saved only
+        if the generator is run to the end.
+        """
+        previous = self.load_snapshot(root)
+        snapshot = {}
+        stack = ['']
+        
+        while stack:
+            rel_dir = stack.pop()
+            dir_path = os.path.join(root, rel_dir) if rel_dir else root
+            
+            listing = self.list_directory(dir_path, rel_dir, previous.get(rel_dir))
+            if listing is None:
+                continue
+            snapshot[rel_dir] = listing
+            
+            for name in listing['files']:
+                file_path = os.path.join(dir_path, name)
+                if pattern is None or pattern in file_path:
+                    yield file_path
+            
+            # Reversed so the stack pops subdirectories in sorted order
+            stack.extend(f"{rel_dir}/{name}" if rel_dir else name for name in reversed(listing['dirs']))
+        
+        self.save_snapshot(root, snapshot)
+    
+    def list_directory(self, dir_path, rel_dir, cached):
+        """Matching files and subdirectories of one directory, from the snapshot if it is current"""
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return None
+        
+        self.stats['directories'] += 1
+        
+        if cached and cached['mtime_ns'] == mtime_ns:
+            self.stats['reused'] += 1
+            return cached
+        
+        files, dirs = [], []
+        
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    if self.is_excluded(entry.name, rel_path):
+                        continue
+                    
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.exclude_dirs or os.path.realpath(entry.path) not in self.exclude_dirs:
+                                dirs.append(entry.name)
+                        elif self.matches(entry.name) and entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue  # Entry vanished or is unreadable
+        except OSError:
+            return None
+        
+        self.stats['listed'] += 1
+        return {'mtime_ns': mtime_ns, 'files': sorted(files), 'dirs': sorted(dirs)}
+    
+    def signature(self, root):
+        """Settings a snapshot was taken with; a snapshot with other settings is not reused"""
+        return {
+            'root': os.path.realpath(root),
+            'extensions': sorted(self.extensions) if self.extensions else None,
+            'exclude': list(self.exclude),
+            'exclude_dirs': sorted(self.exclude_dirs)
+        }
+    
+    def load_snapshot(self, root):
+        """Directory listings from the last complete scan of root"""
+        if not self.snapshot_path or not self.snapshot_path.exists():
+            return {}
+        
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        
+        if data.get('signature') != self.signature(root):
+            return {}
+        return data.get('directories', {})
+    
+    def save_snapshot(self, root, directories):
+        """Write the snapshot atomically"""
+        if not self.snapshot_path:
+            return
+        
+        temp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(temp_path, 'w') as f:
+            json.dump({'signature': self.signature(root), 'directories': directories}, f)
+        os.replace(temp_path, self.snapshot_path)
@@ -1,9 +1,177 @@
 import os
+import re
+import json
+import html
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+from file_scanner import FileScanner
+
+STATE_FILE = ".index_state.json"
+# Bump when rendered sections change, so sections cached by older versions are rendered again
+STATE_VERSION = 2
+CSS_URL_PATTERN = re.compile(r"url\(\s*['\"]?([^'\")]+)['\"]?\s*\)", re.IGNORECASE)
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".svg"}
+# Same threshold image_optimizer.py starts compressing at
+UNOPTIMIZED_MIN_BYTES = 2 * 1024 * 1024
+
+class PageAnalyzer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.images = []
+        self.external_scripts = []
+        self._in_title = False
+        self._in_style = False
+
+    def add_image(self, url):
+        url = url.strip()
+        if url and not url.startswith(("data:", "#")) and url not in self.images:
+            self.images.append(url)
+
+    def add_css_images(self, css):
+        for url in CSS_URL_PATTERN.findall(css):
+            if os.path.splitext(urlsplit(url).path)[1].lower() in IMAGE_EXTENSIONS:
+                self.add_image(url)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        if tag == "title":
+            self._in_title = True
+        elif tag == "style":
+            self._in_style = True
+        elif tag == "script" and urlsplit(attrs.get("src", "")).netloc:
+            self.external_scripts.append(attrs["src"])
+        elif tag == "img":
+            self.add_image(attrs.get("src", ""))
+        elif tag == "video":
+            self.add_image(attrs.get("poster", ""))
+        elif tag == "link" and attrs.get("rel") == "preload" and attrs.get("as") == "image":
+            self.add_image(attrs.get("href", ""))
+
+        if tag in ("img", "source") and attrs.get("srcset"):
+            for candidate in attrs["srcset"].split(","):
+                self.add_image(candidate.strip().split(" ")[0])
+        if attrs.get("style"):
+            self.add_css_images(attrs["style"])
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "style":
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif self._in_style:
+            self.add_css_images(data)
+
+def analyze_page(file_path):
+    # Runs in a worker process; only depends on the page's content, so results are cached by hash
+    analyzer = PageAnalyzer()
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        analyzer.feed(f.read())
+    analyzer.close()
+    return {
+        "title": " ".join(analyzer.title.split()),
+        "images": analyzer.images,
+        "external_scripts": analyzer.external_scripts
+    }
+
+def file_sha256(file_path):
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_state(state_path):
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION and all(key in state for key in ("files", "sections", "pages")):
+            return state
+    except (OSError, json.JSONDecodeError):
+        pass
+    return {"files": {}, "sections": {}, "pages": {}}
+
+def page_weight(root_dir, file_link, page, image_sizes):
+    # Image sizes are read fresh on every run, since optimizing images does not change the page
+    page_dir = os.path.dirname(os.path.join(root_dir, file_link))
+    local_images = []
+    external_images = 0
+    for url in page["images"]:
+        parts = urlsplit(url)
+        if parts.scheme or parts.netloc:
+            external_images += 1
+            continue
+        path = unquote(parts.path)
+        image_path = os.path.normpath(os.path.join(root_dir, path.lstrip("/")) if path.startswith("/") else os.path.join(page_dir, path))
+        if image_path not in image_sizes:
+            image_sizes[image_path] = os.path.getsize(image_path) if os.path.isfile(image_path) else None
+        if image_sizes[image_path] is not None:
+            local_images.append((image_sizes[image_path], os.path.relpath(image_path, root_dir).replace("\\", "/")))
+
+    local_images.sort(reverse=True)
+    return {
+        "image_bytes": sum(size for size, _ in local_images),
+        "image_count": len(local_images),
+        "external_images": external_images,
+        "largest": local_images[:3],
+        "unoptimized": [path for size, path in local_images if size >= UNOPTIMIZED_MIN_BYTES],
+        "external_scripts": page["external_scripts"]
+    }
+
+def render_heaviest_pages(weights):
+    lines = [
+        '<div class="folder-section">',
+        '<div class="folder-title">Heaviest pages</div>',
+        '<table class="weight-table">',
+        '<thead><tr><th>Page</th><th data-sort="number">Image bytes</th><th data-sort="number">Images</th>'
+        '<th>Largest images</th><th data-sort="number">Unoptimized</th><th data-sort="number">External scripts</th></tr></thead>',
+        '<tbody>'
+    ]
+    for file_link, weight in sorted(weights.items(), key=lambda item: (-item[1]["image_bytes"], item[0])):
+        largest = "<br>".join(f"{html.escape(path)} ({format_size(size)})" for size, path in weight["largest"])
+        unoptimized = "<br>".join(html.escape(path) for path in weight["unoptimized"])
+        scripts = "<br>".join(html.escape(url) for url in weight["external_scripts"])
+        images = f'{weight["image_count"]} local' + (f' + {weight["external_images"]} external' if weight["external_images"] else "")
+        lines.append(
+            f'<tr><td><a href="{file_link}">{html.escape(file_link)}</a></td>'
+            f'<td data-value="{weight["image_bytes"]}">{format_size(weight["image_bytes"])}</td>'
+            f'<td data-value="{weight["image_count"]}">{images}</td>'
+            f'<td>{largest}</td>'
+            f'<td data-value="{len(weight["unoptimized"])}">{unoptimized or "-"}</td>'
+            f'<td data-value="{len(weight["external_scripts"])}"><details><summary>{len(weight["external_scripts"])}</summary>{scripts}</details></td></tr>'
+        )
+    lines.append('</tbody></table></div>')
+    return "\n".join(lines)
+
+def format_size(size):
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+def render_section(folder, files, file_info):
+    lines = [
+        '<div class="folder-section">',
+        f'<div class="folder-title">{folder}</div>',
+        '<ul class="file-list">'
+    ]
+    for file_link in files:
+        info = file_info[file_link]
+        # Modification times stay in the state file; rendering them would change index.html on every checkout
+        meta = " · ".join(part for part in (html.escape(info["title"]), format_size(info["size"])) if part)
+        lines.append(f'<li><a href="{file_link}">{os.path.basename(file_link)}</a> <span class="file-meta">{meta}</span></li>')
+    lines.append('</ul></div>')
+    return "\n".join(lines)
 
 def generate_index_html(root_dir, output_file="index.html"):
     html_content = [
         "<html>",
         "<head>",
+        '<meta charset="utf-8">',
         "<title>HTML File Index</title>",
         '<meta name="viewport" content="width=device-width, initial-scale=1">',
         "<style>",
@@ -17,6 +185,10 @@ def generate_index_html(root_dir, output_file="index.html"):
         "a { color: #007bff; text-decoration: none; font-size: 1.1em; }",
         "a:hover { text-decoration: underline; }",
         ".file-list { background: #f4f8fb; border-radius: 6px; padding: 16px 20px; box-shadow: 0 1px 4px rgba(0,0,0,0.03); }",
+        ".file-meta { display: block; color: #6c757d; font-size: 0.85em; margin-top: 2px; }",
+        ".weight-table { width: 100%; border-collapse: collapse; font-size: 0.85em; }",
+        ".weight-table th, .weight-table td { text-align: left; vertical-align: top; padding: 6px 8px; border-bottom: 1px solid #e9ecef; word-break: break-all; }",
+        ".weight-table th { cursor: pointer; background: #f4f8fb; }",
         "</style>",
         "</head>",
         "<body>",
@@ -24,31 +196,90 @@ def generate_index_html(root_dir, output_file="index.html"):
         "<h1>HTML File Index</h1>"
     ]
 
+    # Sizes, hashes and rendered sections from the last run, and page analyses by content hash;
+    # only changed pages are read again, and only pages with new content are parsed
+    state_path = os.path.join(root_dir, STATE_FILE)
+    state = load_state(state_path)
+    file_info = {}
+    changed_folders = set()
+    to_parse = {}
+
     folder_map = {}
-    for dirpath, _, filenames in os.walk(root_dir):
-        rel_dir = os.path.relpath(dirpath, root_dir)
-        if rel_dir == ".":
-            rel_dir = "Root"
-        html_files = [f for f in filenames if f.endswith(".html") and f != output_file]
-        if html_files:
-            folder_map[rel_dir] = [os.path.join(rel_dir if rel_dir != "Root" else "", f).replace("\\", "/") for f in html_files]
+    for file_path in FileScanner(extensions={".html"}).scan(root_dir):
+        rel_dir, filename = os.path.split(os.path.relpath(file_path, root_dir))
+        if filename == output_file:
+            continue
+        file_link = os.path.join(rel_dir, filename).replace("\\", "/")
+        folder = rel_dir or "Root"
+        folder_map.setdefault(folder, []).append(file_link)
+
+        stat = os.stat(file_path)
+        info = state["files"].get(file_link)
+        if not info or info["mtime_ns"] != stat.st_mtime_ns or info["size"] != stat.st_size:
+            info = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_sha256(file_path)}
+            changed_folders.add(folder)
+        if info["sha256"] not in state["pages"]:
+            to_parse[info["sha256"]] = file_path
+        file_info[file_link] = info
+
+    pages = {info["sha256"]: state["pages"].get(info["sha256"]) for info in file_info.values()}
+    if len(to_parse) > 1:
+        with ProcessPoolExecutor() as executor:
+            pages.update(zip(to_parse, executor.map(analyze_page, to_parse.values())))
+    else:
+        pages.update((sha256, analyze_page(file_path)) for sha256, file_path in to_parse.items())
+    for info in file_info.values():
+        info["title"] = pages[info["sha256"]]["title"]
 
+    sections = {}
     for folder, files in sorted(folder_map.items()):
-        html_content.append(f'<div class="folder-section">')
-        html_content.append(f'<div class="folder-title">{folder}</div>')
-        html_content.append('<ul class="file-list">')
-        for file_link in files:
-            html_content.append(f'<li><a href="{file_link}">{os.path.basename(file_link)}</a></li>')
-        html_content.append('</ul></div>')
+        cached = state["sections"].get(folder)
+        if folder in changed_folders or not cached or cached["files"] != files:
+            cached = {"files": files, "html": render_section(folder, files, file_info)}
+        sections[folder] = cached
+        html_content.append(cached["html"])
+
+    image_sizes = {}
+    weights = {file_link: page_weight(root_dir, file_link, pages[info["sha256"]], image_sizes) for file_link, info in file_info.items()}
+    if weights:
+        html_content.append(render_heaviest_pages(weights))
 
     html_content.extend([
         "</div>",
+        # Click a column header to sort the heaviest pages table by it
+        "<script>",
+        "document.querySelectorAll('.weight-table th').forEach((th, i) => th.addEventListener('click', () => {",
+        "  const body = th.closest('table').tBodies[0], numeric = th.dataset.sort === 'number';",
+        "  const key = row => numeric ? Number(row.cells[i].dataset.value) : row.cells[i].textContent;",
+        "  const rows = [...body.rows].sort((a, b) => numeric ? key(b) - key(a) : key(a).localeCompare(key(b)));",
+        "  body.append(...rows);",
+        "}));",
+        "</script>",
         "</body>",
         "</html>"
     ])
 
-    with open(os.path.join(root_dir, output_file), "w", encoding="utf-8") as f:
-        f.write("\n".join(html_content))
+    new_state = {"version": STATE_VERSION, "files": file_info, "sections": sections, "pages": pages}
+    if new_state != state:
+        with open(state_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(new_state, f, ensure_ascii=False)
+        os.replace(state_path + ".tmp", state_path)
+
+    # Leave the file (and its mtime) alone when nothing changed
+    output = "\n".join(html_content).encode("utf-8")
+    output_path = os.path.join(root_dir, output_file)
+    try:
+        with open(output_path, "rb") as f:
+            if f.read() == output:
+                print(f"{output_file} is up to date")
+                return False
+    except OSError:
+        pass
+
+    with open(output_path, "wb") as f:
+        f.write(output)
+    print(f"Updated {output_file} ({len(changed_folders)} of {len(folder_map)} folders changed)")
+    return True
 
 if __name__ == "__main__":
     generate_index_html(".")
@@ -8,16 +8,140 @@ import os
 import sys
 import json
 import shutil
+import hashlib
+import math
+import time
+from io import BytesIO
 from pathlib import Path
-from PIL import Image, ImageOps
+from PIL import Image, ImageOps, features
 import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+from file_scanner import FileScanner
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Only needed for --target-ssim
+
+# Optimizer used by each worker process in --jobs mode
+_worker_optimizer = None
+
+def file_sha256(file_path):
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class SSIMReference:
+    """
+    Reference image for repeated structural similarity (SSIM) comparisons, on luma
+    
+    Local statistics use a box window computed from integral images, so
+    each comparison is a handful of vectorized NumPy operations. Windows
+    are sampled every `stride` pixels, and the reference's own statistics
+    are computed once and reused for every candidate encoding.
+    """
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    
+    def __init__(self, image, window=8, stride=4):
+        self.x = np.asarray(image.convert('L'), dtype=np.float64)
+        self.window = min(window, *self.x.shape)
+        self.stride = stride
+        self.mu_x = self._box_mean(self.x)
+        self.var_x = self._box_mean(self.x * self.x) - self.mu_x ** 2
+    
+    def _box_mean(self, a):
+        """Mean of each sampled window, via an integral image"""
+        w, step = self.window, self.stride
+        rows = (a.shape[0] - w) // step * step + 1
+        cols = (a.shape[1] - w) // step * step + 1
+        
+        s = np.zeros((a.shape[0] + 1, a.shape[1] + 1))
+        s[1:, 1:] = a.cumsum(axis=0).cumsum(axis=1)
+        
+        return (
+            s[w:w + rows:step, w:w + cols:step] - s[:rows:step, w:w + cols:step]
+            - s[w:w + rows:step, :cols:step] + s[:rows:step, :cols:step]
+        ) / w ** 2
+    
+    def score(self, candidate):
+        """Mean SSIM of a same-sized candidate image against the reference"""
+        y = np.asarray(candidate.convert('L'), dtype=np.float64)
+        
+        mu_y = self._box_mean(y)
+        var_y = self._box_mean(y * y) - mu_y ** 2
+        cov_xy = self._box_mean(self.x * y) - self.mu_x * mu_y
+        
+        ssim_map = ((2 * self.mu_x * mu_y + self.c1) * (2 * cov_xy + self.c2)) / (
+            (self.mu_x ** 2 + mu_y ** 2 + self.c1) * (self.var_x + var_y + self.c2)
+        )
+        return float(ssim_map.mean())
+
+def clone_file(src, dst):
+    """
+    Copy src to dst as cheaply as the filesystem allows
+    
+    Tries a copy-on-write reflink, then a hard link, then a full copy.
+    Returns the method used.
+    """
+    try:
+        import fcntl
+        FICLONE = 0x40049409  # Linux ioctl, supported by Btrfs, XFS and others
+        with open(src, 'rb') as source, open(dst, 'wb') as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        shutil.copystat(src, dst)
+        return 'reflink'
+    except (ImportError, OSError):
+        if os.path.exists(dst):
+            os.remove(dst)
+    
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError:
+        pass
+    
+    shutil.copy2(src, dst)
+    return 'copy'
+
+def _init_worker(optimizer):
+    """Install the optimizer (or variant generator) copied into a pool worker"""
+    global _worker_optimizer
+    _worker_optimizer = optimizer
+
+def _process_in_worker(file_path, dry_run):
+    """Optimize one image in a pool worker"""
+    return _worker_optimizer.process_image(file_path, dry_run)
 
 class ImageOptimizer:
-    def __init__(self, backup_dir="backup_images"):
+    title = "image optimization"
+    
+    def __init__(self, backup_dir="backup_images", target_ssim=None):
         self.backup_dir = Path(backup_dir)
         self.backup_dir.mkdir(exist_ok=True)
         
+        # Perceptual target: pick the lowest JPEG quality whose SSIM reaches this, instead of the tier quality
+        self.target_ssim = target_ssim
+        self.quality_range = (30, 95)
+        
+        # Output directories that must not be scanned as sources
+        self.excluded_dirs = {self.backup_dir.resolve()}
+        
+        # Results of the current run, appended as files finish so an interrupted run can resume.
+        # Once the run completes, the journal gets a summary record and becomes the report.
+        self.progress_path = self.backup_dir / ".optimization_progress.jsonl"
+        
+        # What was done to each file in earlier runs, so unchanged files are not reconsidered
+        self.manifest_path = self.backup_dir / "optimization_manifest.json"
+        self.manifest = self.load_manifest()
+        
+        # Directory listings of the last scan, reused for directories whose mtime has not changed
+        self.snapshot_path = self.backup_dir / ".scan_snapshot.json"
+        
         # Compression settings based on file size
         self.compression_tiers = {
             'high': {'quality': 70, 'max_width': 1920, 'max_height': 1080},
@@ -30,11 +154,17 @@ class ImageOptimizer:
             'total_files': 0,
             'processed_files': 0,
             'skipped_files': 0,
+            'unchanged_files': 0,
+            'resumed_files': 0,
             'original_size': 0,
             'compressed_size': 0,
-            'files_processed': []
+            'backup_methods': {},
+            'draft_decoded_files': 0,
+            'decoded_megapixels_saved': 0,
+            'quality_counts': {},
+            'timings': {}
         }
-        
+    
     def get_file_size_mb(self, file_path):
         """Get file size in MB"""
         return os.path.getsize(file_path) / (1024 * 1024)
@@ -50,82 +180,341 @@ class ImageOptimizer:
         else:
             return 'skip'
     
+    def get_draft_size(self, img, max_width, max_height):
+        """
+        Smallest size a JPEG can be decoded at and still fill the given bounds
+        
+        Returns None when the image is not downscaled. The size is in the
+        image's stored orientation, before EXIF rotation.
+        """
+        # Rotated by EXIF 90/270 degrees: the bounds apply to the swapped dimensions
+        if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            max_width, max_height = max_height, max_width
+        
+        scale = min(max_width / img.width, max_height / img.height)
+        if scale >= 1:
+            return None
+        
+        return (math.ceil(img.width * scale), math.ceil(img.height * scale))
+    
+    def search_quality(self, img, target):
+        """
+        Binary-search the lowest JPEG quality whose SSIM against img reaches target
+        
+        Returns (quality, score). If no quality in range reaches the target,
+        the highest quality is used. The search assumes the score rises with
+        quality; where it does not (e.g. black levels shifting in dark
+        areas), the result still meets the target but may not be the minimum.
+        """
+        reference = SSIMReference(img)
+        
+        def score_at(quality):
+            buffer = BytesIO()
+            img.save(buffer, 'JPEG', quality=quality)
+            buffer.seek(0)
+            with Image.open(buffer) as encoded:
+                return reference.score(encoded)
+        
+        low, high = self.quality_range
+        best = None
+        
+        while low <= high:
+            quality = (low + high) // 2
+            score = score_at(quality)
+            if score >= target:
+                best = (quality, score)
+                high = quality - 1
+            else:
+                low = quality + 1
+        
+        if best is None:
+            quality = self.quality_range[1]
+            best = (quality, score_at(quality))
+        
+        return best
+    
     def backup_file(self, file_path):
-        """Create backup of original file"""
-        rel_path = os.path.relpath(file_path)
-        backup_path = self.backup_dir / rel_path
+        """
+        Back up the original file into the content-addressed store
+        
+        Blobs live at objects/<hash[:2]>/<hash><ext>, so identical originals
+        are stored once. New blobs are reflinked or hard-linked where the
+        filesystem allows; a hard link stays valid because the optimized
+        file replaces the original instead of overwriting it.
+        
+        Returns (backup_path, method), where method is 'existing' for a
+        blob that was already stored.
+        """
+        digest = file_sha256(file_path)
+        backup_path = self.backup_dir / "objects" / digest[:2] / f"{digest}{Path(file_path).suffix.lower()}"
+        
+        if backup_path.exists():
+            return backup_path, 'existing'
+        
         backup_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(file_path, backup_path)
-        return backup_path
+        temp_path = backup_path.with_name(f"{backup_path.name}.{os.getpid()}.tmp")
+        method = clone_file(file_path, temp_path)
+        os.replace(temp_path, backup_path)
+        
+        return backup_path, method
     
     def optimize_image(self, file_path, dry_run=False):
         """Optimize a single image file"""
+        result = self.process_image(file_path, dry_run)
+        self.print_result(result)
+        self.record_result(result)
+        return result
+    
+    def process_image(self, file_path, dry_run=False):
+        """
+        Optimize a single image file without touching self.stats
+        
+        Safe to run in a worker process; the returned result is merged
+        into the stats by record_result().
+        """
+        temp_path = f"{file_path}.tmp"
+        
         try:
             original_size = self.get_file_size_mb(file_path)
             tier = self.get_compression_tier(original_size)
             
             if tier == 'skip':
-                print(f"⏩ Skipping {file_path} ({original_size:.2f}MB - already optimized)")
-                self.stats['skipped_files'] += 1
-                return
+                return {
+                    'status': 'skipped',
+                    'file': str(file_path),
+                    'original_size_mb': original_size,
+                    **(self.file_identity(file_path) if not dry_run else {})
+                }
             
             settings = self.compression_tiers[tier]
             
             if dry_run:
-                print(f"🔍 Would compress {file_path} ({original_size:.2f}MB) using {tier} compression")
-                return
+                return {'status': 'dry_run', 'file': str(file_path), 'original_size_mb': original_size, 'tier': tier}
+            
+            timings = {}
+            started = time.perf_counter()
+            
+            def lap(stage):
+                nonlocal started
+                now = time.perf_counter()
+                timings[stage] = round(now - started, 4)
+                started = now
             
             # Backup original
-            backup_path = self.backup_file(file_path)
+            backup_path, backup_method = self.backup_file(file_path)
+            lap('backup')
             
             # Open and process image
             with Image.open(file_path) as img:
+                source_size = img.size
+                
+                # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when the thumbnail is that much smaller
+                if img.format == 'JPEG':
+                    draft_size = self.get_draft_size(img, settings['max_width'], settings['max_height'])
+                    if draft_size:
+                        img.draft(None, draft_size)
+                
+                decoded_size = img.size
+                
                 # Convert to RGB if necessary
                 if img.mode in ('RGBA', 'LA', 'P'):
                     img = img.convert('RGB')
                 
                 # Auto-orient based on EXIF data
                 img = ImageOps.exif_transpose(img)
+                img.load()
+                lap('decode')
                 
                 # Resize if too large
                 if img.width > settings['max_width'] or img.height > settings['max_height']:
                     img.thumbnail((settings['max_width'], settings['max_height']), Image.Resampling.LANCZOS)
+                lap('resize')
+                
+                quality, score = settings['quality'], None
+                if self.target_ssim:
+                    quality, score = self.search_quality(img, self.target_ssim)
+                    lap('quality_search')
                 
-                # Save with compression
-                img.save(file_path, 'JPEG', quality=settings['quality'], optimize=True)
+                # Compress in memory, then write a temporary file and swap it in
+                buffer = BytesIO()
+                img.save(buffer, 'JPEG', quality=quality, optimize=True)
+                lap('encode')
+                
+                with open(temp_path, 'wb') as f:
+                    f.write(buffer.getbuffer())
+                os.replace(temp_path, file_path)
+                lap('write')
             
             new_size = self.get_file_size_mb(file_path)
             compression_ratio = ((original_size - new_size) / original_size) * 100
             
-            print(f"✅ Compressed {file_path}")
-            print(f"   {original_size:.2f}MB → {new_size:.2f}MB ({compression_ratio:.1f}% reduction)")
-            
-            self.stats['processed_files'] += 1
-            self.stats['original_size'] += original_size
-            self.stats['compressed_size'] += new_size
-            self.stats['files_processed'].append({
+            return {
+                'status': 'processed',
                 'file': str(file_path),
                 'original_size_mb': original_size,
                 'compressed_size_mb': new_size,
                 'compression_ratio': compression_ratio,
                 'tier': tier,
-                'backup_path': str(backup_path)
-            })
-            
+                'settings': {**settings, 'quality': quality, 'target_ssim': self.target_ssim},
+                'quality': quality,
+                'ssim': score,
+                'backup_path': str(backup_path),
+                'backup_method': backup_method,
+                'source_dimensions': list(source_size),
+                'decoded_dimensions': list(decoded_size),
+                'decode_scale': round(source_size[0] / decoded_size[0]),
+                'timings': timings,
+                **self.file_identity(file_path)
+            }
+        
         except Exception as e:
-            print(f"❌ Error processing {file_path}: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return {'status': 'error', 'file': str(file_path), 'error': str(e)}
+    
+    def print_result(self, result):
+        """Print the outcome of processing one file"""
+        file_path = result['file']
+        
+        if result['status'] == 'skipped':
+            print(f"⏩ Skipping {file_path} ({result['original_size_mb']:.2f}MB - already optimized)")
+        elif result['status'] == 'dry_run':
+            print(f"🔍 Would compress {file_path} ({result['original_size_mb']:.2f}MB) using {result['tier']} compression")
+        elif result['status'] == 'processed':
+            print(f"✅ Compressed {file_path}")
+            print(f"   {result['original_size_mb']:.2f}MB → {result['compressed_size_mb']:.2f}MB "
+                  f"({result['compression_ratio']:.1f}% reduction)")
+            if result.get('ssim') is not None:
+                print(f"   quality {result['quality']} (SSIM {result['ssim']:.4f})")
+        else:
+            print(f"❌ Error processing {file_path}: {result['error']}")
+    
+    def record_result(self, result):
+        """
+        Merge the outcome of processing one file into self.stats
+        
+        Only totals are kept in memory; the per-file records are streamed
+        to the report journal by _save_progress().
+        """
+        if result['status'] == 'skipped':
+            self.stats['skipped_files'] += 1
+        elif result['status'] == 'processed':
+            self.stats['processed_files'] += 1
+            self.stats['original_size'] += result['original_size_mb']
+            self.stats['compressed_size'] += result['compressed_size_mb']
+            
+            method = result.get('backup_method', 'copy')
+            self.stats['backup_methods'][method] = self.stats['backup_methods'].get(method, 0) + 1
+            
+            if result.get('decode_scale', 1) > 1:
+                source_width, source_height = result['source_dimensions']
+                decoded_width, decoded_height = result['decoded_dimensions']
+                self.stats['draft_decoded_files'] += 1
+                self.stats['decoded_megapixels_saved'] += (
+                    source_width * source_height - decoded_width * decoded_height
+                ) / 1e6
+            
+            if result.get('ssim') is not None:
+                quality = str(result['quality'])
+                self.stats['quality_counts'][quality] = self.stats['quality_counts'].get(quality, 0) + 1
+            
+            for stage, seconds in result.get('timings', {}).items():
+                self.stats['timings'][stage] = self.stats['timings'].get(stage, 0) + seconds
+        
+        if result['status'] in ('processed', 'skipped'):
+            self.update_manifest(result)
+    
+    def manifest_key(self, file_path):
+        """Normalized path used as the manifest key"""
+        return Path(os.path.relpath(file_path)).as_posix()
+    
+    def file_identity(self, file_path):
+        """Content hash, size and mtime of a file, as stored in the manifest"""
+        stat = os.stat(file_path)
+        return {'sha256': file_sha256(file_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    def load_manifest(self):
+        """Load the manifest of earlier runs"""
+        if not self.manifest_path.exists():
+            return {}
+        
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable manifest {self.manifest_path}: {str(e)}")
+            return {}
+    
+    def save_manifest(self):
+        """Write the manifest atomically"""
+        temp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+    
+    def update_manifest(self, result):
+        """Record the state a file was left in"""
+        if 'sha256' not in result:
+            return
+        
+        self.manifest[self.manifest_key(result['file'])] = {
+            'sha256': result['sha256'],
+            'size': result['size'],
+            'mtime_ns': result['mtime_ns'],
+            'tier': result.get('tier', 'skip'),
+            'settings': result.get('settings'),
+            'optimized_at': datetime.now().isoformat(timespec='seconds')
+        }
     
-    def find_images(self, directory="."):
-        """Find all image files in directory"""
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
-        image_files = []
+    def is_unchanged(self, file_path):
+        """
+        Whether a file is exactly as an earlier run left it
+        
+        Size and mtime are compared first; the content hash is only
+        computed when the mtime changed but the size did not (e.g. a copy).
+        """
+        entry = self.manifest.get(self.manifest_key(file_path))
+        if not entry:
+            return False
         
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if Path(file).suffix.lower() in image_extensions:
-                    image_files.append(os.path.join(root, file))
+        stat = os.stat(file_path)
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns == entry['mtime_ns']:
+            return True
         
-        return sorted(image_files)
+        if file_sha256(file_path) == entry['sha256']:
+            entry['mtime_ns'] = stat.st_mtime_ns
+            return True
+        return False
+    
+    def load_progress(self):
+        """Load results of an interrupted run, keyed by file path"""
+        if not self.progress_path.exists():
+            return {}
+        
+        completed = {}
+        with open(self.progress_path, 'r') as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partially written last line
+                
+                # Files that failed are tried again
+                if result.get('record', 'file') == 'file' and result['status'] in ('processed', 'skipped'):
+                    completed[result['file']] = result
+        
+        return completed
+    
+    def find_images(self, directory=".", file_pattern=None, use_snapshot=True):
+        """Yield image files in directory as they are found"""
+        scanner = FileScanner(
+            extensions={'.jpg', '.jpeg', '.png', '.gif', '.webp'},
+            exclude_dirs=self.excluded_dirs,
+            snapshot_path=self.snapshot_path if use_snapshot else None
+        )
+        return scanner.scan(directory, pattern=file_pattern)
     
     def generate_report(self):
         """Generate optimization report"""
@@ -141,43 +530,493 @@ class ImageOptimizer:
         print(f"Total files found: {self.stats['total_files']}")
         print(f"Files processed: {self.stats['processed_files']}")
         print(f"Files skipped: {self.stats['skipped_files']}")
+        print(f"Files unchanged since last run: {self.stats['unchanged_files']}")
         print(f"Original size: {self.stats['original_size']:.2f}MB")
         print(f"Compressed size: {self.stats['compressed_size']:.2f}MB")
         print(f"Space saved: {total_reduction:.2f}MB ({avg_reduction:.1f}% reduction)")
         
-        # Save detailed report
-        report_path = f"optimization_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(report_path, 'w') as f:
-            json.dump(self.stats, f, indent=2)
+        if self.stats['quality_counts']:
+            counts = {int(q): n for q, n in self.stats['quality_counts'].items()}
+            mean = sum(q * n for q, n in counts.items()) / sum(counts.values())
+            print(f"SSIM target {self.target_ssim}: qualities {min(counts)}-{max(counts)}, mean {mean:.0f}")
+        
+        if self.stats['backup_methods']:
+            methods = ", ".join(f"{count} {method}" for method, count in sorted(self.stats['backup_methods'].items()))
+            print(f"Backups: {methods}")
+        
+        if self.stats['draft_decoded_files']:
+            print(f"Reduced-scale decodes: {self.stats['draft_decoded_files']} files, "
+                  f"{self.stats['decoded_megapixels_saved']:.1f} megapixels not decoded")
+        
+        if self.stats['timings']:
+            timings = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in self.stats['timings'].items())
+            print(f"Time spent: {timings}")
+        
+        # The journal already holds one record per file; close it with the totals and keep it as the report
+        report_path = f"optimization_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        with open(self.progress_path, 'a') as f:
+            f.write(json.dumps({
+                'record': 'summary',
+                **self.stats,
+                'target_ssim': self.target_ssim,
+                'finished_at': datetime.now().isoformat(timespec='seconds')
+            }) + "\n")
+        shutil.move(self.progress_path, report_path)
         print(f"Detailed report saved to: {report_path}")
     
-    def run(self, directory=".", dry_run=False, file_pattern=None):
-        """Run the optimization process"""
-        print(f"🚀 Starting image optimization in: {directory}")
+    @staticmethod
+    def load_report(report_path):
+        """
+        Read an optimization report in the original JSON shape
+        
+        Accepts the streamed .jsonl reports (including the journal of an
+        interrupted run) as well as older .json reports. Totals come from
+        the summary record when there is one.
+        """
+        with open(report_path, 'r') as f:
+            if not str(report_path).endswith('.jsonl'):
+                return json.load(f)
+            
+            summary = {}
+            files = {}
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partially written last line
+                
+                if record.get('record') == 'summary':
+                    summary = {k: v for k, v in record.items() if k != 'record'}
+                elif record.get('status') == 'processed':
+                    # A resumed run may have retried the file; the last record wins
+                    files[record['file']] = {
+                        k: v for k, v in record.items()
+                        if k not in ('record', 'status', 'settings', 'sha256', 'size', 'mtime_ns', 'timings')
+                    }
+        
+        return {**summary, 'files_processed': list(files.values())}
+    
+    @staticmethod
+    def convert_report(report_path, output_path=None):
+        """Write a .jsonl report as a single JSON document, as reports used to be saved"""
+        output_path = output_path or str(Path(report_path).with_suffix('.json'))
+        
+        with open(output_path, 'w') as f:
+            json.dump(ImageOptimizer.load_report(report_path), f, indent=2)
+        
+        print(f"Converted {report_path} to {output_path}")
+        return output_path
+    
+    def restore(self, report_path, dry_run=False, file_pattern=None):
+        """
+        Put originals back from the backups listed in an optimization report
+        
+        Paths are resolved relative to the current directory, as they were
+        when the report was written.
+        """
+        entries = self.load_report(report_path)['files_processed']
+        
+        if file_pattern:
+            entries = [e for e in entries if file_pattern in e['file']]
+        
+        print(f"♻️ Restoring {len(entries)} files from {report_path}")
+        restored = 0
+        
+        for entry in entries:
+            # Reports written on Windows use backslashes
+            file_path = Path(entry['file'].replace('\\', os.sep))
+            backup_path = Path(entry['backup_path'].replace('\\', os.sep))
+            
+            if not backup_path.exists():
+                print(f"❌ Backup missing for {file_path}: {backup_path}")
+                continue
+            
+            # Blobs in the store are named by their hash; refuse to restore a damaged one
+            if backup_path.parent.parent.name == "objects" and file_sha256(backup_path) != backup_path.stem:
+                print(f"❌ Backup for {file_path} does not match its hash: {backup_path}")
+                continue
+            
+            if dry_run:
+                print(f"🔍 Would restore {file_path} from {backup_path}")
+                continue
+            
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = file_path.with_name(f"{file_path.name}.restore.tmp")
+            shutil.copy2(backup_path, temp_path)
+            os.replace(temp_path, file_path)
+            
+            print(f"✅ Restored {file_path}")
+            restored += 1
+        
+        print(f"\n♻️ Restored {restored}/{len(entries)} files")
+    
+    def print_settings(self):
+        """Print where output goes"""
         print(f"Backup directory: {self.backup_dir}")
+    
+    def run(self, directory=".", dry_run=False, file_pattern=None, jobs=1, force=False):
+        """Run the optimization process"""
+        print(f"🚀 Starting {self.title} in: {directory}")
+        self.print_settings()
         
         if dry_run:
             print("🔍 DRY RUN MODE - No files will be modified")
         
-        image_files = self.find_images(directory)
+        # Resume an interrupted run: reuse the results of files it already finished
+        completed = {} if dry_run else self.load_progress()
+        pending = self._pending_images(self.find_images(directory, file_pattern, use_snapshot=not force), force, completed)
         
-        if file_pattern:
-            image_files = [f for f in image_files if file_pattern in f]
+        progress = None if dry_run else open(self.progress_path, 'a')
         
-        self.stats['total_files'] = len(image_files)
+        try:
+            if jobs > 1:
+                self._run_parallel(pending, dry_run, jobs, progress)
+            else:
+                for i, file_path in enumerate(pending, 1):
+                    print(f"\n[{i}] Processing: {file_path}")
+                    result = self.optimize_image(file_path, dry_run)
+                    self._save_progress(progress, result)
+        finally:
+            if progress:
+                progress.close()
+                self.save_manifest()
         
-        if not image_files:
+        if self.stats['total_files'] == 0:
             print("No image files found!")
             return
         
-        print(f"Found {len(image_files)} image files")
-        
-        for i, file_path in enumerate(image_files, 1):
-            print(f"\n[{i}/{len(image_files)}] Processing: {file_path}")
-            self.optimize_image(file_path, dry_run)
+        print(f"\nFound {self.stats['total_files']} image files")
+        if self.stats['unchanged_files']:
+            print(f"Unchanged since last run: {self.stats['unchanged_files']} files")
+        if self.stats['resumed_files']:
+            print(f"Resumed: {self.stats['resumed_files']} files already done by an interrupted run")
         
         if not dry_run:
             self.generate_report()
+            self.progress_path.unlink(missing_ok=True)
+    
+    def _pending_images(self, image_files, force, completed):
+        """Count the files found and yield the ones that still need work"""
+        for file_path in image_files:
+            self.stats['total_files'] += 1
+            
+            # Checked first: an interrupted run saves the manifest too, so the files it
+            # finished also look unchanged, but their results belong in this run's totals
+            if file_path in completed:
+                self.stats['resumed_files'] += 1
+                self.record_result(completed[file_path])
+                continue
+            
+            # Only new or changed images need work
+            if not force and self.is_unchanged(file_path):
+                self.stats['unchanged_files'] += 1
+                continue
+            
+            yield file_path
+    
+    def _run_parallel(self, image_files, dry_run, jobs, progress):
+        """
+        Optimize images on a pool of worker processes, reporting each as it finishes
+        
+        Files are submitted while the scan is still running, keeping a few
+        per worker queued so the pool never waits on the scan.
+        """
+        print(f"Using {jobs} worker processes")
+        
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(self,)
+        ) as executor:
+            running = set()
+            finished = 0
+            
+            for file_path in image_files:
+                running.add(executor.submit(_process_in_worker, file_path, dry_run))
+                if len(running) >= jobs * 2:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    finished = self._collect(done, finished, progress)
+            
+            done, _ = wait(running)
+            self._collect(done, finished, progress)
+    
+    def _collect(self, futures, finished, progress):
+        """Report and record finished worker results; returns the running count"""
+        for future in futures:
+            result = future.result()
+            finished += 1
+            print(f"\n[{finished}] ", end="")
+            self.print_result(result)
+            self.record_result(result)
+            self._save_progress(progress, result)
+        
+        return finished
+    
+    def _save_progress(self, progress, result):
+        """Append a finished file to the progress journal"""
+        if progress:
+            progress.write(json.dumps({'record': 'file', **result}) + "\n")
+            progress.flush()
+
+class ResponsiveVariantGenerator(ImageOptimizer):
+    """
+    Builds srcset-ready variants of each image: several width breakpoints in modern formats
+    
+    Variants mirror the source tree under output_dir as <name>-<width>w.<format>,
+    and responsive_manifest.json maps each original to its variants and srcset
+    strings. Only new or changed images, or ones whose variants are missing,
+    are regenerated.
+    
+    Manifest keys and variant paths are relative to the scanned directory, and
+    srcset candidates are the same paths rooted at "/", so any page can use them
+    when the scanned directory is the web root.
+    """
+    title = "responsive variant generation"
+    
+    path_convention = ("Keys and variant paths are relative to the scanned directory; srcset candidates are "
+                       "the same paths rooted at '/', for serving the scanned directory as the web root")
+    
+    default_widths = (480, 768, 1280, 1920)
+    default_formats = ('webp', 'avif')
+    
+    # Encoder settings per output format
+    format_settings = {
+        'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+        'avif': {'format': 'AVIF', 'quality': 60, 'speed': 6},
+        'jpeg': {'format': 'JPEG', 'quality': 80, 'optimize': True, 'progressive': True}
+    }
+    
+    def __init__(self, output_dir="responsive_images", widths=None, formats=None, backup_dir="backup_images"):
+        super().__init__(backup_dir=backup_dir)
+        
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.excluded_dirs.add(self.output_dir.resolve())
+        
+        # Directory being scanned; variants mirror the tree below it (set by run())
+        self.scan_root = Path(".")
+        
+        self.widths = sorted(set(widths or self.default_widths))
+        self.formats = [f for f in (formats or self.default_formats) if self.format_supported(f)]
+        
+        self.progress_path = self.output_dir / ".variant_progress.jsonl"
+        self.snapshot_path = self.output_dir / ".scan_snapshot.json"
+        self.manifest_path = self.output_dir / "responsive_manifest.json"
+        self.manifest = self.load_manifest()
+        
+        self.stats = {
+            'total_files': 0,
+            'processed_files': 0,
+            'skipped_files': 0,
+            'unchanged_files': 0,
+            'resumed_files': 0,
+            'original_size': 0,
+            'variant_size': 0,
+            'variants_generated': 0
+        }
+    
+    def format_supported(self, fmt):
+        """Whether this Pillow build can encode the format"""
+        if fmt not in self.format_settings:
+            print(f"⚠️ Unknown variant format '{fmt}', skipping")
+            return False
+        
+        if fmt == 'avif' and not features.check('avif'):
+            try:
+                import pillow_avif  # noqa: F401 - registers the AVIF plugin on older Pillow
+            except ImportError:
+                print("⚠️ AVIF encoding not available (install Pillow >= 11.2 or pillow-avif-plugin), skipping AVIF")
+                return False
+        
+        if fmt == 'webp' and not features.check('webp'):
+            print("⚠️ WebP encoding not available in this Pillow build, skipping WebP")
+            return False
+        
+        return True
+    
+    def print_settings(self):
+        print(f"Variant directory: {self.output_dir}")
+        print(f"Widths: {', '.join(str(w) for w in self.widths)} | Formats: {', '.join(self.formats)}")
+    
+    def get_target_widths(self, width):
+        """Breakpoints for a source of the given width, never upscaling"""
+        return sorted({min(w, width) for w in self.widths})
+    
+    def variant_path(self, file_path, width, fmt):
+        """Where a variant of a source image is written, relative to the scanned directory"""
+        rel_path = Path(os.path.relpath(file_path, self.scan_root))
+        variant_path = self.output_dir / rel_path.parent / f"{rel_path.stem}-{width}w.{fmt}"
+        
+        if not variant_path.resolve().is_relative_to(self.output_dir.resolve()):
+            raise ValueError(f"Variant path {variant_path} is outside {self.output_dir}")
+        return variant_path
+    
+    def run(self, directory=".", dry_run=False, file_pattern=None, jobs=1, force=False):
+        """Run variant generation, mirroring the tree below directory"""
+        self.scan_root = Path(directory)
+        super().run(directory, dry_run, file_pattern, jobs, force)
+    
+    def manifest_key(self, file_path):
+        """Path relative to the scanned directory, used as the manifest key"""
+        return Path(os.path.relpath(file_path, self.scan_root)).as_posix()
+    
+    def load_manifest(self):
+        """Load the image entries of the manifest of earlier runs"""
+        manifest = super().load_manifest()
+        return manifest.get('images', {}) if 'path_convention' in manifest else manifest
+    
+    def save_manifest(self):
+        """Write the manifest atomically, stating how its paths are meant to be read"""
+        temp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump({'path_convention': self.path_convention, 'images': self.manifest}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+    
+    def process_image(self, file_path, dry_run=False):
+        """Generate every variant of one source image"""
+        try:
+            original_size = self.get_file_size_mb(file_path)
+            
+            with Image.open(file_path) as img:
+                # Breakpoints apply to the displayed (EXIF-rotated) width
+                rotated = img.getexif().get(0x0112, 1) in (5, 6, 7, 8)
+                display_width = img.height if rotated else img.width
+                targets = self.get_target_widths(display_width)
+                
+                if dry_run:
+                    return {
+                        'status': 'dry_run',
+                        'file': str(file_path),
+                        'original_size_mb': original_size,
+                        'targets': targets
+                    }
+                
+                # Only decode as much detail as the largest breakpoint needs
+                if img.format == 'JPEG':
+                    max_height = math.ceil((img.width if rotated else img.height) * targets[-1] / display_width)
+                    draft_size = self.get_draft_size(img, targets[-1], max_height)
+                    if draft_size:
+                        img.draft(None, draft_size)
+                
+                img = ImageOps.exif_transpose(img)
+                
+                has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+                img = img.convert('RGBA' if has_alpha else 'RGB')
+                
+                variants = []
+                for width in targets:
+                    height = max(1, round(img.height * width / img.width))
+                    resized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+                    
+                    for fmt in self.formats:
+                        variants.append(self._save_variant(resized, file_path, width, fmt))
+            
+            srcset = {
+                fmt: ", ".join(f"/{v['path']} {v['width']}w" for v in variants if v['format'] == fmt)
+                for fmt in self.formats
+            }
+            
+            return {
+                'status': 'processed',
+                'file': str(file_path),
+                'original_size_mb': original_size,
+                'widths': self.widths,
+                'formats': self.formats,
+                'variants': variants,
+                'srcset': srcset,
+                **self.file_identity(file_path)
+            }
+        
+        except Exception as e:
+            return {'status': 'error', 'file': str(file_path), 'error': str(e)}
+    
+    def _save_variant(self, img, file_path, width, fmt):
+        """Encode one variant atomically and describe it"""
+        variant_path = self.variant_path(file_path, width, fmt)
+        variant_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        settings = dict(self.format_settings[fmt])
+        pil_format = settings.pop('format')
+        if pil_format == 'JPEG' and img.mode == 'RGBA':
+            img = img.convert('RGB')
+        
+        temp_path = variant_path.with_name(variant_path.name + ".tmp")
+        img.save(temp_path, pil_format, **settings)
+        os.replace(temp_path, variant_path)
+        
+        return {
+            'path': Path(os.path.relpath(variant_path, self.scan_root)).as_posix(),
+            'format': fmt,
+            'width': img.width,
+            'height': img.height,
+            'size': variant_path.stat().st_size
+        }
+    
+    def print_result(self, result):
+        file_path = result['file']
+        
+        if result['status'] == 'dry_run':
+            print(f"🔍 Would build {len(result['targets'])} widths × {len(self.formats)} formats for {file_path}")
+        elif result['status'] == 'processed':
+            variant_size = sum(v['size'] for v in result['variants']) / (1024 * 1024)
+            print(f"✅ {file_path}: {len(result['variants'])} variants ({variant_size:.2f}MB)")
+        else:
+            print(f"❌ Error processing {file_path}: {result['error']}")
+    
+    def record_result(self, result):
+        if result['status'] != 'processed':
+            return
+        
+        self.stats['processed_files'] += 1
+        self.stats['original_size'] += result['original_size_mb']
+        self.stats['variant_size'] += sum(v['size'] for v in result['variants']) / (1024 * 1024)
+        self.stats['variants_generated'] += len(result['variants'])
+        self.update_manifest(result)
+    
+    def update_manifest(self, result):
+        key = self.manifest_key(result['file'])
+        
+        # Remove variants of the previous entry that this run did not write again, e.g. a dropped format
+        current = {v['path'] for v in result['variants']}
+        for variant in self.manifest.get(key, {}).get('variants', []):
+            if variant['path'] not in current:
+                (self.scan_root / variant['path']).unlink(missing_ok=True)
+        
+        self.manifest[key] = {
+            'sha256': result['sha256'],
+            'size': result['size'],
+            'mtime_ns': result['mtime_ns'],
+            'widths': result['widths'],
+            'formats': result['formats'],
+            'variants': result['variants'],
+            'srcset': result['srcset'],
+            'generated_at': datetime.now().isoformat(timespec='seconds')
+        }
+    
+    def is_unchanged(self, file_path):
+        """Source unchanged, same breakpoints and formats, and every variant still on disk"""
+        if not super().is_unchanged(file_path):
+            return False
+        
+        entry = self.manifest[self.manifest_key(file_path)]
+        return (
+            entry['widths'] == self.widths
+            and entry['formats'] == self.formats
+            and all((self.scan_root / v['path']).exists() for v in entry['variants'])
+        )
+    
+    def generate_report(self):
+        """Summarize the variants built in this run"""
+        if self.stats['processed_files'] == 0:
+            print("\n📊 No variants were generated")
+            return
+        
+        print(f"\n📊 Responsive Variant Report")
+        print(f"=" * 50)
+        print(f"Source images: {self.stats['processed_files']} ({self.stats['original_size']:.2f}MB)")
+        print(f"Unchanged since last run: {self.stats['unchanged_files']}")
+        print(f"Variants generated: {self.stats['variants_generated']} ({self.stats['variant_size']:.2f}MB)")
+        print(f"Manifest saved to: {self.manifest_path}")
 
 def main():
     parser = argparse.ArgumentParser(description='Optimize images for web use')
@@ -185,11 +1024,55 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
     parser.add_argument('--pattern', help='Only process files containing this pattern')
     parser.add_argument('--backup-dir', default='backup_images', help='Backup directory (default: backup_images)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Number of worker processes (default: 1)')
+    parser.add_argument('--force', action='store_true', help='Reconsider every image, ignoring the optimization manifest and the scan snapshot')
+    parser.add_argument('--restore', metavar='REPORT',
+                        help='Restore the originals listed in an optimization report, then exit')
+    parser.add_argument('--convert-report', metavar='REPORT',
+                        help='Convert a .jsonl optimization report to the single-document JSON format, then exit')
+    parser.add_argument('--target-ssim', type=float,
+                        help='Pick the lowest JPEG quality per image that keeps SSIM at or above this, e.g. 0.95 (requires numpy)')
+    parser.add_argument('--variants', action='store_true',
+                        help='After optimizing, build responsive WebP/AVIF variants at several widths')
+    parser.add_argument('--variants-only', action='store_true', help='Build responsive variants without optimizing')
+    parser.add_argument('--variants-dir', default='responsive_images',
+                        help='Output directory for responsive variants (default: responsive_images)')
+    parser.add_argument('--widths', default=','.join(str(w) for w in ResponsiveVariantGenerator.default_widths),
+                        help='Comma-separated variant widths in pixels')
+    parser.add_argument('--formats', default=','.join(ResponsiveVariantGenerator.default_formats),
+                        help='Comma-separated variant formats (webp, avif, jpeg)')
     
     args = parser.parse_args()
     
-    optimizer = ImageOptimizer(backup_dir=args.backup_dir)
-    optimizer.run(args.directory, dry_run=args.dry_run, file_pattern=args.pattern)
+    if args.convert_report:
+        ImageOptimizer.convert_report(args.convert_report)
+        return
+    
+    if args.restore:
+        ImageOptimizer(backup_dir=args.backup_dir).restore(args.restore, dry_run=args.dry_run, file_pattern=args.pattern)
+        return
+    
+    if args.target_ssim is not None:
+        if np is None:
+            parser.error("--target-ssim requires numpy (pip install numpy)")
+        if not 0 < args.target_ssim < 1:
+            parser.error("--target-ssim must be between 0 and 1")
+    
+    if not args.variants_only:
+        optimizer = ImageOptimizer(backup_dir=args.backup_dir, target_ssim=args.target_ssim)
+        optimizer.excluded_dirs.add(Path(args.variants_dir).resolve())
+        optimizer.run(args.directory, dry_run=args.dry_run, file_pattern=args.pattern, jobs=args.jobs,
+                      force=args.force)
+    
+    if args.variants or args.variants_only:
+        generator = ResponsiveVariantGenerator(
+            output_dir=args.variants_dir,
+            widths=[int(w) for w in args.widths.split(',') if w.strip()],
+            formats=[f.strip().lower() for f in args.formats.split(',') if f.strip()],
+            backup_dir=args.backup_dir
+        )
+        generator.run(args.directory, dry_run=args.dry_run, file_pattern=args.pattern, jobs=args.jobs,
+                      force=args.force)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,498 @@
+"""
+Asyncio-native Flux API client sharing one connection pool across all in-flight jobs
+"""
+import asyncio
+import logging
+import os
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional, Union
+from urllib.parse import urljoin
+
+import aiohttp
+
+from config import FluxConfig, ImageConfig, ProjectPaths
+from flux_api_client import FluxAPIClient, FluxAPIError, FluxAPITransientError, PollingTracker
+from rate_limiter import get_rate_limiter, backoff_delay, parse_retry_after
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AsyncFluxAPIClient:
+    """
+    Async sibling of FluxAPIClient, driven by a single event loop
+    
+    Usage:
+        async with AsyncFluxAPIClient() as client:
+            results = await client.batch_generate(prompts, max_concurrency=50)
+    """
+
+    def __init__(self,
+                 api_key: str = None,
+                 endpoint: str = None,
+                 base_url: str = None,
+                 max_connections: int = None):
+        """
+        Initialize async Flux API client
+        
+        Args:
+            api_key: BFL API key (defaults to config)
+            endpoint: API endpoint to use (defaults to global)
+            base_url: Override the endpoint base URL (e.g. a local test server)
+            max_connections: Size of the shared connection pool
+        """
+        self.api_key = api_key or FluxConfig.API_KEY
+        self.endpoint = endpoint or FluxConfig.DEFAULT_ENDPOINT
+        
+        if not self.api_key:
+            raise FluxAPIError("API key is required. Set BFL_API_KEY environment variable or pass api_key parameter.")
+        
+        self.base_url = base_url or FluxConfig.ENDPOINTS[self.endpoint]
+        self.max_connections = max_connections or FluxConfig.MAX_CONCURRENT_REQUESTS
+        self.rate_limiter = get_rate_limiter(self.endpoint, self.base_url)
+        self.headers = {
+            'accept': 'application/json',
+            'x-key': self.api_key,
+            'Content-Type': 'application/json'
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        logger.info(f"Initialized async Flux API client with endpoint: {self.base_url}")
+
+    async def __aenter__(self) -> "AsyncFluxAPIClient":
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared session lazily so it binds to the running loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=FluxConfig.REQUEST_TIMEOUT)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared session and its connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _make_request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        """
+        Make HTTP request with retry logic and return the parsed JSON body
+        
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            url: Request URL
+            **kwargs: Additional request parameters
+        
+        Returns:
+            Parsed JSON response
+        
+        Raises:
+            FluxAPIError: On API errors or network issues
+        """
+        body, _ = await self._request_with_headers(method, url, **kwargs)
+        return body
+
+    async def _request_with_headers(self, method: str, url: str, **kwargs) -> tuple:
+        """
+        Make HTTP request with retry logic
+        
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            url: Request URL
+            **kwargs: Additional request parameters
+        
+        Returns:
+            Tuple of (parsed JSON response, response headers)
+        
+        Raises:
+            FluxAPIError: On API errors or network issues
+        """
+        session = self._get_session()
+        
+        attempt = 0
+        rate_limited = 0
+        
+        while True:
+            await asyncio.sleep(self.rate_limiter.reserve())
+            
+            try:
+                async with session.request(method, url, headers=self.headers, **kwargs) as response:
+                    if response.status == 429:
+                        rate_limited += 1
+                        if rate_limited > FluxConfig.RATE_LIMIT_MAX_RETRIES:
+                            raise FluxAPITransientError(f"Rate limit exceeded after {rate_limited} attempts")
+                        
+                        # Pause every task sharing the limiter, as the server asked
+                        wait_time = parse_retry_after(response.headers.get('Retry-After'))
+                        if wait_time is None:
+                            wait_time = backoff_delay(rate_limited - 1)
+                        logger.warning(f"Rate limit exceeded. Waiting {wait_time:.1f} seconds...")
+                        self.rate_limiter.pause(wait_time)
+                        continue
+                    
+                    elif response.status == 402:
+                        raise FluxAPIError("Insufficient credits. Please add credits to your account.")
+                    
+                    elif response.status >= 500:
+                        error_msg = f"HTTP {response.status}: {await response.text()}"
+                        raise FluxAPITransientError(error_msg)
+                    
+                    elif response.status >= 400:
+                        error_msg = f"HTTP {response.status}: {await response.text()}"
+                        raise FluxAPIError(error_msg)
+                    
+                    return await response.json(content_type=None), response.headers
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                attempt += 1
+                if attempt == FluxConfig.MAX_RETRIES:
+                    raise FluxAPITransientError(f"Request failed after {FluxConfig.MAX_RETRIES} attempts: {str(e)}")
+                
+                wait_time = backoff_delay(attempt - 1)
+                logger.warning(f"Request failed (attempt {attempt}), retrying in {wait_time:.1f}s: {str(e)}")
+                await asyncio.sleep(wait_time)
+
+    async def _submit(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit a request and await its result"""
+        result = await self._make_request("POST", url, json=payload)
+        request_id, polling_url = FluxAPIClient.parse_submission(result)
+        
+        logger.info(f"Request submitted. ID: {request_id}")
+        
+        return await self._poll_for_result(polling_url, request_id)
+
+    async def generate_image(self,
+                             prompt: str,
+                             model: str = None,
+                             **generation_kwargs) -> Dict[str, Any]:
+        """
+        Generate image using Flux API
+        
+        Args:
+            prompt: Text description of desired image
+            model: Model to use (defaults to flux_kontext)
+            **generation_kwargs: Same options as FluxAPIClient.generate_image()
+        
+        Returns:
+            Generation result with image URL or error details
+        """
+        model = model or FluxConfig.DEFAULT_MODEL
+        model_endpoint = FluxConfig.MODELS.get(model, FluxConfig.MODELS["flux_kontext"])
+        url = urljoin(self.base_url, model_endpoint)
+        
+        payload = FluxAPIClient.build_generation_payload(prompt, **generation_kwargs)
+        
+        logger.info(f"Generating image with model: {model}")
+        logger.debug(f"Request payload: {payload}")
+        
+        return await self._submit(url, payload)
+
+    async def edit_image(self,
+                         prompt: str,
+                         input_image: Union[str, Path],
+                         **editing_kwargs) -> Dict[str, Any]:
+        """
+        Edit image using Flux Kontext
+        
+        Args:
+            prompt: Text description of the edit to apply
+            input_image: Path to input image or base64 string
+            **editing_kwargs: Same options as FluxAPIClient.edit_image()
+        
+        Returns:
+            Editing result with image URL or error details
+        """
+        url = urljoin(self.base_url, FluxConfig.MODELS["flux_kontext"])
+        
+        # Image encoding is CPU-bound, keep it off the event loop
+        payload = await asyncio.to_thread(
+            FluxAPIClient.build_edit_payload, prompt, input_image, **editing_kwargs
+        )
+        
+        logger.info(f"Editing image with prompt: {prompt[:100]}...")
+        logger.debug(f"Request payload keys: {list(payload.keys())}")
+        
+        return await self._submit(url, payload)
+
+    async def _poll_for_result(self, polling_url: str, request_id: str) -> Dict[str, Any]:
+        """
+        Poll for generation result without blocking the event loop
+        
+        Args:
+            polling_url: URL for polling status
+            request_id: Request ID for tracking
+        
+        Returns:
+            Final result with image URL, including 'polling_stats'
+        """
+        logger.info(f"Polling for result: {request_id}")
+        
+        tracker = PollingTracker(request_id)
+        
+        while True:
+            await asyncio.sleep(tracker.time_until_next_poll())
+            tracker.check_deadline()
+            
+            try:
+                result, headers = await self._request_with_headers("GET", polling_url, params={'id': request_id})
+                
+            except FluxAPITransientError as e:
+                tracker.record_transient_error(e)
+                continue
+                
+            except Exception as e:
+                logger.error(f"Polling error: {str(e)}")
+                raise FluxAPIError(f"Polling failed: {str(e)}")
+            
+            tracker.record_status(result.get('status'), headers.get('Retry-After'))
+            
+            if FluxAPIClient.check_poll_result(result):
+                logger.info(f"Generation completed successfully after {tracker.poll_count} polls "
+                            f"({tracker.elapsed:.1f}s)")
+                result['polling_stats'] = tracker.stats()
+                return result
+
+    async def download_image(self,
+                             image_url: str,
+                             filename: str = None,
+                             directory: Path = None,
+                             verify: bool = None) -> Path:
+        """
+        Download generated image through the shared session
+        
+        Streams to a partial file and renames it into place when complete,
+        resuming dropped connections like FluxAPIClient.download_image().
+        
+        Args:
+            image_url: URL of generated image
+            filename: Custom filename (auto-generated if None)
+            directory: Directory to save to (defaults to generated_images)
+            verify: Decode the image before moving it into place (defaults to config)
+        
+        Returns:
+            Path to downloaded image file
+        """
+        if not image_url:
+            raise FluxAPIError("Image URL is required")
+        
+        file_path = FluxAPIClient._resolve_image_path(image_url, filename, directory)
+        partial_path = FluxAPIClient._partial_path(file_path)
+        verify = FluxConfig.VERIFY_DOWNLOADS if verify is None else verify
+        
+        logger.info(f"Downloading image to: {file_path}")
+        
+        try:
+            attempt = 0
+            while True:
+                try:
+                    await self._stream_to_file(image_url, partial_path)
+                    break
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                        asyncio.TimeoutError, FluxAPITransientError) as e:
+                    attempt += 1
+                    if attempt > FluxConfig.MAX_RETRIES:
+                        raise
+                    
+                    wait_time = backoff_delay(attempt - 1)
+                    logger.warning(f"Download interrupted (attempt {attempt}), retrying in {wait_time:.1f}s: {str(e)}")
+                    await asyncio.sleep(wait_time)
+            
+            if verify:
+                await asyncio.to_thread(FluxAPIClient.verify_image, partial_path)
+            
+            os.replace(partial_path, file_path)
+            
+            logger.info(f"Image downloaded successfully: {file_path}")
+            return file_path
+        
+        except Exception as e:
+            partial_path.unlink(missing_ok=True)
+            raise FluxAPIError(f"Failed to download image: {str(e)}")
+
+    async def _stream_to_file(self, image_url: str, partial_path: Path):
+        """
+        Stream a download into a partial file, resuming from its current size
+        
+        Args:
+            image_url: URL of generated image
+            partial_path: File receiving the bytes
+        
+        Raises:
+            FluxAPITransientError: On server errors or a body shorter than announced
+        """
+        offset = partial_path.stat().st_size if partial_path.exists() else 0
+        headers = {'Range': f"bytes={offset}-"} if offset else {}
+        
+        # Delivery URLs are pre-signed, so API headers are not sent here
+        async with self._get_session().get(image_url, headers=headers) as response:
+            if response.status >= 500:
+                raise FluxAPITransientError(f"Download failed with HTTP {response.status}")
+            if response.status == 416:
+                partial_path.unlink(missing_ok=True)
+                raise FluxAPITransientError("Cannot resume download, restarting")
+            response.raise_for_status()
+            
+            # The server ignored the range request, start over
+            if response.status != 206:
+                offset = 0
+            
+            expected_size = offset + response.content_length if response.content_length is not None else None
+            
+            # Chunks are small enough that writing them inline does not stall the loop
+            with open(partial_path, 'ab' if offset else 'wb') as f:
+                async for chunk in response.content.iter_chunked(FluxConfig.DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        
+        actual_size = partial_path.stat().st_size
+        if expected_size is not None and actual_size != expected_size:
+            raise FluxAPITransientError(f"Incomplete download: {actual_size} of {expected_size} bytes")
+
+    async def generate_and_download(self,
+                                    prompt: str,
+                                    filename: str = None,
+                                    directory: Path = None,
+                                    **generation_kwargs) -> Dict[str, Any]:
+        """
+        Generate image and automatically download it
+        
+        Args:
+            prompt: Text description of desired image
+            filename: Custom filename for downloaded image
+            directory: Directory to save image
+            **generation_kwargs: Additional arguments for generate_image()
+        
+        Returns:
+            Dictionary with generation result and local file path
+        """
+        try:
+            result = await self.generate_image(prompt, **generation_kwargs)
+            
+            if result['status'] != 'Ready':
+                raise FluxAPIError(f"Generation not ready: {result}")
+            
+            image_url = result['result']['sample']
+            local_path = await self.download_image(image_url, filename, directory)
+            
+            return {
+                'status': 'completed',
+                'generation_result': result,
+                'local_path': str(local_path),
+                'image_url': image_url,
+                'prompt': prompt
+            }
+        
+        except Exception as e:
+            logger.error(f"Generation and download failed: {str(e)}")
+            return {
+                'status': 'failed',
+                'error': str(e),
+                'prompt': prompt
+            }
+
+    async def edit_and_download(self,
+                                prompt: str,
+                                input_image: Union[str, Path],
+                                filename: str = None,
+                                directory: Path = None,
+                                **editing_kwargs) -> Dict[str, Any]:
+        """
+        Edit image and automatically download the result
+        
+        Args:
+            prompt: Text description of the edit
+            input_image: Path to input image
+            filename: Custom filename for edited image
+            directory: Directory to save edited image
+            **editing_kwargs: Additional arguments for edit_image()
+        
+        Returns:
+            Dictionary with editing result and local file path
+        """
+        try:
+            result = await self.edit_image(prompt, input_image, **editing_kwargs)
+            
+            if result['status'] != 'Ready':
+                raise FluxAPIError(f"Editing not ready: {result}")
+            
+            image_url = result['result']['sample']
+            
+            if not filename:
+                input_path = Path(input_image) if isinstance(input_image, (str, Path)) else Path("edited_image")
+                timestamp = datetime.now().strftime(ImageConfig.TIMESTAMP_FORMAT)
+                filename = f"{input_path.stem}_edited_{timestamp}{input_path.suffix}"
+            
+            local_path = await self.download_image(image_url, filename, directory)
+            
+            return {
+                'status': 'completed',
+                'editing_result': result,
+                'local_path': str(local_path),
+                'image_url': image_url,
+                'prompt': prompt,
+                'input_image': str(input_image)
+            }
+        
+        except Exception as e:
+            logger.error(f"Image editing and download failed: {str(e)}")
+            return {
+                'status': 'failed',
+                'error': str(e),
+                'prompt': prompt,
+                'input_image': str(input_image)
+            }
+
+    async def batch_generate(self,
+                             prompts: list,
+                             output_directory: Path = None,
+                             max_concurrency: int = None,
+                             **generation_kwargs) -> list:
+        """
+        Generate multiple images concurrently on the running event loop
+        
+        Args:
+            prompts: List of prompt strings or prompt dictionaries
+            output_directory: Directory for batch output
+            max_concurrency: Maximum number of jobs in flight (defaults to pool size)
+            **generation_kwargs: Common generation parameters
+        
+        Returns:
+            List of generation results, in the same order as prompts
+        """
+        output_directory = output_directory or ProjectPaths.GENERATED_IMAGES_DIR / "batch"
+        output_directory.mkdir(exist_ok=True, parents=True)
+        
+        total = len(prompts)
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_connections)
+
+        async def run_item(index: int, prompt_data: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+            prompt, kwargs = FluxAPIClient._split_batch_entry(prompt_data, generation_kwargs)
+            
+            async with semaphore:
+                filename = f"batch_{index+1:03d}_{datetime.now().strftime('%H%M%S')}"
+                result = await self.generate_and_download(
+                    prompt=prompt,
+                    filename=filename,
+                    directory=output_directory,
+                    **kwargs
+                )
+            
+            if result['status'] == 'completed':
+                logger.info(f"Batch {index+1}/{total} completed")
+            else:
+                result['batch_index'] = index
+                logger.error(f"Batch {index+1}/{total} failed: {result.get('error')}")
+            return result
+        
+        results = await asyncio.gather(*(run_item(i, p) for i, p in enumerate(prompts)))
+        
+        logger.info(f"Batch generation completed. Results: {len(results)}")
+        logger.info(f"Rate limiter: {self.rate_limiter.stats()}")
+        return list(results)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark for advertising copy analysis
+Compares the single-pass copy analyzer with the per-field reference implementation
+"""
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+import click
+
+from config import ProjectPaths
+from utils import HTMLParser
+from prompt_generator import AdvancedPromptGenerator
+
+logging.basicConfig(level=logging.WARNING)
+
+SAMPLE_COPIES = [
+    "Struggling to grow your business? Our proven coaching program helps entrepreneurs "
+    "increase revenue by 50% in 90 days. Join now!",
+    "Stop wasting time on complicated spreadsheets. Our app helps you save $500 every month. "
+    "Download today and boost your productivity.",
+    "Transform your health with our wellness course. Achieve results in 30 days. Sign up for free!",
+    "Feeling stressed and overwhelmed at work? Get 3x faster results with our platform. Book a demo.",
+    "Limited time: get access now to the masterclass trusted by 10,000 students. Hurry!",
+    "İstanbul'daki ŞİRKETLER için DİJİTAL çözümler. Struggle less. Contact us.",
+    ""
+]
+
+def _corpus(html_files: List[Path]) -> List[str]:
+    """Sample copies plus the full copy, section copies and text blocks of each landing page"""
+    copies = list(SAMPLE_COPIES)
+
+    for html_file in html_files:
+        extracted = HTMLParser.extract_text_from_html(html_file)
+        copies.append(HTMLParser.consolidate_content_for_prompt(extracted))
+        copies.extend(extracted["headings"] + extracted["paragraphs"] + extracted["features"])
+
+    return copies
+
+def _time_analyzer(analyze: Callable[[str], Dict[str, Any]], copies: List[str], iterations: int) -> float:
+    """Best time in seconds to analyze every copy once, over the given number of iterations"""
+    best = float("inf")
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for ad_copy in copies:
+            analyze(ad_copy)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+@click.command()
+@click.argument('html_files', nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--iterations', '-n', default=5, help='Runs per implementation (best run is reported)')
+def main(html_files: List[Path], iterations: int):
+    """Benchmark copy analysis on landing page text (default: every page in the landing page folders)"""
+    html_files = html_files or sorted(
+        html_file for directory in ProjectPaths.LANDING_PAGE_DIRS for html_file in directory.rglob("*.html")
+    )
+    generator = AdvancedPromptGenerator()
+    copies = _corpus(html_files)
+
+    mismatches = [
+        ad_copy for ad_copy in copies
+        if generator.analyze_advertising_copy(ad_copy) != generator.analyze_advertising_copy_reference(ad_copy)
+    ]
+    for ad_copy in mismatches[:5]:
+        click.echo(f"⚠️  Results differ for: {ad_copy[:80]!r}")
+
+    reference_time = _time_analyzer(generator.analyze_advertising_copy_reference, copies, iterations)
+    single_pass_time = _time_analyzer(generator.analyze_advertising_copy, copies, iterations)
+    total_chars = sum(len(ad_copy) for ad_copy in copies)
+
+    click.echo(f"📄 {len(copies)} copies ({total_chars / 1024:.1f}KB) from {len(html_files)} page(s)")
+    click.echo(f"{'Implementation':<15} {'Time':>10} {'Copies/sec':>12}")
+    click.echo(f"{'Reference':<15} {reference_time * 1000:>8.2f}ms {len(copies) / reference_time:>12,.0f}")
+    click.echo(f"{'Single-pass':<15} {single_pass_time * 1000:>8.2f}ms {len(copies) / single_pass_time:>12,.0f}")
+    click.echo(f"⚡ Speedup: {reference_time / single_pass_time:.1f}x")
+
+    if mismatches:
+        click.echo(f"❌ {len(mismatches)} copies analyzed differently")
+        sys.exit(1)
+
+    click.echo("✅ Both implementations produced identical analyses")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark for landing page content extraction
+Compares the single-pass extractor with the BeautifulSoup reference implementation
+"""
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+import click
+
+from config import ProjectPaths
+from utils import HTMLParser
+
+logging.basicConfig(level=logging.WARNING)
+
+def _comparable(extracted: Dict[str, Any]) -> Dict[str, Any]:
+    """CTA and pricing lists come from sets, so their order is not meaningful"""
+    return {
+        **extracted,
+        "cta_buttons": sorted(extracted["cta_buttons"]),
+        "pricing": sorted(extracted["pricing"])
+    }
+
+def _time_extractor(extract: Callable[[Path], Dict[str, Any]], html_file: Path, iterations: int) -> float:
+    """Best per-call time in seconds over the given number of iterations"""
+    best = float("inf")
+    
+    for _ in range(iterations):
+        start = time.perf_counter()
+        extract(html_file)
+        best = min(best, time.perf_counter() - start)
+    
+    return best
+
+@click.command()
+@click.argument('html_files', nargs=-1, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--iterations', '-n', default=20, help='Runs per file and implementation (best run is reported)')
+def main(html_files: List[Path], iterations: int):
+    """Benchmark HTML content extraction (default: the repository's test.html)"""
+    html_files = html_files or [ProjectPaths.PROJECT_ROOT / "test.html"]
+    
+    click.echo(f"{'File':<45} {'Size':>8} {'Soup':>10} {'Single-pass':>12} {'Speedup':>8}")
+    
+    total_soup = total_stream = 0.0
+    mismatches = 0
+    
+    for html_file in html_files:
+        if _comparable(HTMLParser.extract_text_from_html(html_file)) != _comparable(
+            HTMLParser.extract_text_from_html_soup(html_file)
+        ):
+            mismatches += 1
+            click.echo(f"⚠️  Results differ for {html_file}")
+        
+        soup_time = _time_extractor(HTMLParser.extract_text_from_html_soup, html_file, iterations)
+        stream_time = _time_extractor(HTMLParser.extract_text_from_html, html_file, iterations)
+        total_soup += soup_time
+        total_stream += stream_time
+        
+        click.echo(
+            f"{html_file.name[:45]:<45} {html_file.stat().st_size / 1024:>6.1f}KB "
+            f"{soup_time * 1000:>8.2f}ms {stream_time * 1000:>10.2f}ms {soup_time / stream_time:>7.1f}x"
+        )
+    
+    if len(html_files) > 1:
+        click.echo(f"{'Total':<45} {'':>8} {total_soup * 1000:>8.2f}ms {total_stream * 1000:>10.2f}ms "
+                   f"{total_soup / total_stream:>7.1f}x")
+    
+    if mismatches:
+        click.echo(f"❌ {mismatches} file(s) extracted differently")
+        sys.exit(1)
+    
+    click.echo("✅ Both implementations extracted identical content")
+
+if __name__ == '__main__':
+    main()
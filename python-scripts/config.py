@@ -23,6 +23,16 @@ class FluxConfig:
         "us_single": "https://api.us1.bfl.ai"
     }
     
+    # Client-side rate limits per endpoint, shared by all workers in a process
+    RATE_LIMITS = {
+        "global": {"rate": 10.0, "burst": 20},  # requests/second, max back-to-back requests
+        "eu": {"rate": 10.0, "burst": 20},
+        "us": {"rate": 10.0, "burst": 20},
+        "eu_single": {"rate": 5.0, "burst": 10},
+        "us_single": {"rate": 5.0, "burst": 10}
+    }
+    DEFAULT_RATE_LIMIT = {"rate": 10.0, "burst": 20}
+    
     # Model endpoints
     MODELS = {
         "flux_pro": "/v1/flux-pro-1.1",
@@ -37,8 +47,36 @@ class FluxConfig:
     DEFAULT_OUTPUT_FORMAT = "jpeg"
     SAFETY_TOLERANCE = 2
     MAX_RETRIES = 3
-    POLLING_INTERVAL = 0.5  # seconds
+    RATE_LIMIT_MAX_RETRIES = 6  # extra attempts allowed for HTTP 429 responses
+    BACKOFF_BASE = 1.0  # seconds, doubled per retry (with jitter)
+    BACKOFF_MAX = 30.0  # seconds
+    POLLING_INTERVAL = 0.5  # seconds, initial and "Running" poll interval
+    POLLING_MAX_INTERVAL = 5.0  # seconds, cap for the backoff while "Pending"
+    POLLING_BACKOFF = 1.5  # interval multiplier per "Pending" poll
+    POLLING_TIMEOUT = 600  # seconds before a job is abandoned
+    POLLING_MAX_TRANSIENT_ERRORS = 5  # consecutive 5xx/network errors tolerated while polling
+    
+    # Webhook receiver (--webhook mode)
+    WEBHOOK_HOST = "127.0.0.1"
+    WEBHOOK_PORT = 8787
+    WEBHOOK_PUBLIC_URL = os.getenv("FLUX_WEBHOOK_PUBLIC_URL", "")  # e.g. a tunnel forwarding to the listener
+    WEBHOOK_TIMEOUT = 600  # seconds to wait for each request's completion
     REQUEST_TIMEOUT = 120  # seconds
+    MAX_CONCURRENT_REQUESTS = 16  # connection pool size shared by batch workers
+    DOWNLOAD_TIMEOUT = 60  # seconds without data before a download attempt is abandoned
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes written per chunk while streaming downloads
+    VERIFY_DOWNLOADS = True  # decode downloaded images before moving them into place
+
+class CacheConfig:
+    """Generation cache settings"""
+    
+    ENABLED = os.getenv("FLUX_CACHE_ENABLED", "1") != "0"
+    MAX_SIZE_MB = 1024  # least recently used entries are evicted above this size
+    MAX_AGE_DAYS = 30  # entries older than this are discarded
+    RESCAN_INTERVAL = 300  # seconds between full scans of the cache directory
+    # Only requests with an explicit seed are cached, so repeating an unseeded request gives a new image;
+    # set FLUX_CACHE_UNSEEDED=1 to cache unseeded requests too (they then return the same image until --refresh)
+    CACHE_UNSEEDED = os.getenv("FLUX_CACHE_UNSEEDED", "0") != "0"
 
 class ImageConfig:
     """Image generation and processing settings"""
@@ -56,6 +94,9 @@ class ImageConfig:
     # Output formats
     OUTPUT_FORMATS = ["jpeg", "png"]
     
+    # Edit inputs larger than this (longest side, px) are downscaled before upload; None sends them as-is
+    EDIT_INPUT_MAX_DIMENSION = None
+    
     # File naming
     TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
     IMAGE_PREFIX = "generated_"
@@ -134,13 +175,16 @@ class ProjectPaths:
     PROJECT_ROOT = Path(__file__).parent.parent
     PYTHON_SCRIPTS_DIR = Path(__file__).parent
     GENERATED_IMAGES_DIR = PYTHON_SCRIPTS_DIR / "generated_images"
+    CACHE_DIR = GENERATED_IMAGES_DIR / ".cache"
+    EXTRACTION_CACHE_DIR = CACHE_DIR / "html"
     EXAMPLES_DIR = PYTHON_SCRIPTS_DIR / "examples"
     
     # Landing page directories  
     MAV_DIR = PROJECT_ROOT / "MAV"
-    READDY_AI_DIR = PROJECT_ROOT / "ReaddyAI"
+    READDY_AI_DIR = PROJECT_ROOT / "ReaddyAI-VinceEEC"
     WORLD_MASTERCLASS_DIR = PROJECT_ROOT / "WorldMasterclass"
     TEMPLATE_DIR = PROJECT_ROOT / "Template"
+    LANDING_PAGE_DIRS = [MAV_DIR, READDY_AI_DIR, WORLD_MASTERCLASS_DIR]
     
     @classmethod
     def ensure_directories(cls):
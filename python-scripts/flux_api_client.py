@@ -2,10 +2,16 @@
 Flux API Client with proper polling, error handling, image management, and editing capabilities
 """
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import os
 import logging
 import base64
+import queue
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional, Union
@@ -13,7 +19,10 @@ from urllib.parse import urljoin
 from PIL import Image
 from io import BytesIO
 
-from config import FluxConfig, ImageConfig, ProjectPaths
+from config import FluxConfig, ImageConfig, ProjectPaths, CacheConfig
+from generation_cache import GenerationCache
+from rate_limiter import get_rate_limiter, backoff_delay, parse_retry_after
+from webhook_receiver import WebhookReceiver, parse_webhook_payload
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -23,18 +32,185 @@ class FluxAPIError(Exception):
     """Custom exception for Flux API errors"""
     pass
 
+class FluxAPITransientError(FluxAPIError):
+    """Flux API error that may succeed on a later attempt (5xx, network)"""
+    pass
+
+class PollingTracker:
+    """
+    Adaptive polling schedule and statistics for a single request
+    
+    The interval grows by POLLING_BACKOFF while the job is queued ("Pending"),
+    drops back to POLLING_INTERVAL once it is "Running", and never polls
+    sooner than a server-provided Retry-After hint.
+    """
+    
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.interval = FluxConfig.POLLING_INTERVAL
+        self.started_at = time.monotonic()
+        self.next_poll_at = self.started_at + self.interval
+        self.poll_count = 0
+        self.transient_errors = 0
+        self.consecutive_errors = 0
+        self.last_status = None
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds since polling started"""
+        return time.monotonic() - self.started_at
+    
+    def is_due(self) -> bool:
+        """Whether the next poll should be sent now"""
+        return time.monotonic() >= self.next_poll_at
+    
+    def time_until_next_poll(self) -> float:
+        """Seconds to wait before the next poll"""
+        return max(0.0, self.next_poll_at - time.monotonic())
+    
+    def check_deadline(self):
+        """Raise once the job has been polled for longer than POLLING_TIMEOUT"""
+        if self.elapsed > FluxConfig.POLLING_TIMEOUT:
+            raise FluxAPIError(
+                f"Timed out after {self.elapsed:.1f}s waiting for {self.request_id} "
+                f"(last status: {self.last_status})"
+            )
+    
+    def record_status(self, status: str, retry_after: str = None):
+        """
+        Record a successful poll and schedule the next one
+        
+        Args:
+            status: Status reported by the API
+            retry_after: Value of the Retry-After header, if any
+        """
+        self.poll_count += 1
+        self.consecutive_errors = 0
+        self.last_status = status
+        
+        if status == 'Running':
+            self.interval = FluxConfig.POLLING_INTERVAL
+        else:
+            self.interval = min(self.interval * FluxConfig.POLLING_BACKOFF, FluxConfig.POLLING_MAX_INTERVAL)
+        
+        self._schedule(retry_after)
+    
+    def record_transient_error(self, error: Exception):
+        """
+        Record a transient polling failure and back off
+        
+        Args:
+            error: The transient error
+            
+        Raises:
+            FluxAPIError: Once POLLING_MAX_TRANSIENT_ERRORS consecutive errors occurred
+        """
+        self.poll_count += 1
+        self.transient_errors += 1
+        self.consecutive_errors += 1
+        
+        if self.consecutive_errors > FluxConfig.POLLING_MAX_TRANSIENT_ERRORS:
+            raise FluxAPIError(f"Polling failed after {self.consecutive_errors} consecutive errors: {str(error)}")
+        
+        logger.warning(f"Transient polling error for {self.request_id} "
+                       f"({self.consecutive_errors}/{FluxConfig.POLLING_MAX_TRANSIENT_ERRORS}): {str(error)}")
+        
+        self.interval = min(self.interval * 2, FluxConfig.POLLING_MAX_INTERVAL)
+        self._schedule()
+    
+    def _schedule(self, retry_after: str = None):
+        """Schedule the next poll, honouring a Retry-After hint"""
+        delay = max(self.interval, parse_retry_after(retry_after) or 0.0)
+        self.next_poll_at = time.monotonic() + delay
+    
+    def stats(self) -> Dict[str, Any]:
+        """Polling statistics for tuning"""
+        return {
+            'poll_count': self.poll_count,
+            'wait_time': round(self.elapsed, 3),
+            'transient_errors': self.transient_errors,
+            'final_interval': self.interval
+        }
+
+@lru_cache(maxsize=8)
+def _encode_image_file(path: str, size: int, mtime_ns: int, max_dimension: Optional[int]) -> str:
+    """
+    Base64-encode an image file, re-encoding it only when necessary
+    
+    Size and mtime are part of the memoization key so a modified file is
+    encoded again.
+    
+    Args:
+        path: Resolved path to image file
+        size: File size in bytes
+        mtime_ns: File modification time
+        max_dimension: Longest side allowed, or None
+        
+    Returns:
+        Base64 encoded image string
+    """
+    with Image.open(path) as img:
+        fits = not max_dimension or max(img.size) <= max_dimension
+        upright = img.getexif().get(0x0112, 1) == 1  # EXIF orientation
+        
+        # Fast path: already a plain JPEG/PNG, send the original bytes
+        if img.format in ('JPEG', 'PNG') and img.mode in ('RGB', 'L') and fits and upright:
+            with open(path, 'rb') as f:
+                img_str = base64.b64encode(f.read()).decode()
+            
+            logger.debug(f"Image encoded without re-encoding: {path} ({len(img_str)} chars)")
+            return img_str
+        
+        # Let the JPEG decoder skip detail that the downscale would discard
+        if not fits and img.format == 'JPEG':
+            img.draft('RGB', (max_dimension, max_dimension))
+        
+        # Convert to RGB if necessary (for JPEG compatibility)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        
+        if not fits:
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        
+        # Save to bytes buffer
+        buffered = BytesIO()
+        
+        # Determine format based on file extension
+        format = 'JPEG' if Path(path).suffix.lower() in ['.jpg', '.jpeg'] else 'PNG'
+        img.save(buffered, format=format, quality=90 if format == 'JPEG' else None)
+        
+        # Encode to base64
+        img_str = base64.b64encode(buffered.getvalue()).decode()
+        
+        logger.debug(f"Image encoded to base64: {path} ({len(img_str)} chars)")
+        return img_str
+
 class FluxAPIClient:
     """
     Complete Flux API client with robust error handling and image management
     """
     
-    def __init__(self, api_key: str = None, endpoint: str = None):
+    # Batch entry keys forwarded to the API; anything else (style, palette, ...) is metadata
+    GENERATION_PARAMS = (
+        'model', 'aspect_ratio', 'seed', 'output_format',
+        'safety_tolerance', 'prompt_upsampling', 'webhook_url'
+    )
+    
+    def __init__(self,
+                 api_key: str = None,
+                 endpoint: str = None,
+                 base_url: str = None,
+                 use_cache: bool = None,
+                 refresh_cache: bool = False):
         """
         Initialize Flux API client
         
         Args:
             api_key: BFL API key (defaults to config)
             endpoint: API endpoint to use (defaults to global)
+            base_url: Override the endpoint base URL (e.g. a local test server)
+            use_cache: Serve identical requests from the generation cache (defaults to config)
+            refresh_cache: Skip cache lookups but still store fresh results
         """
         self.api_key = api_key or FluxConfig.API_KEY
         self.endpoint = endpoint or FluxConfig.DEFAULT_ENDPOINT
@@ -42,14 +218,30 @@ class FluxAPIClient:
         if not self.api_key:
             raise FluxAPIError("API key is required. Set BFL_API_KEY environment variable or pass api_key parameter.")
         
-        self.base_url = FluxConfig.ENDPOINTS[self.endpoint]
+        self.base_url = base_url or FluxConfig.ENDPOINTS[self.endpoint]
+        self.rate_limiter = get_rate_limiter(self.endpoint, self.base_url)
+        self.cache = GenerationCache() if (CacheConfig.ENABLED if use_cache is None else use_cache) else None
+        self.refresh_cache = refresh_cache
         self.session = requests.Session()
+        
+        # Size the connection pool so concurrent batch workers can share it
+        adapter = HTTPAdapter(
+            pool_connections=FluxConfig.MAX_CONCURRENT_REQUESTS,
+            pool_maxsize=FluxConfig.MAX_CONCURRENT_REQUESTS
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             'accept': 'application/json',
             'x-key': self.api_key,
             'Content-Type': 'application/json'
         })
         
+        # Delivery URLs are pre-signed, so downloads use a pool without the API headers
+        self.download_session = requests.Session()
+        self.download_session.mount("https://", adapter)
+        self.download_session.mount("http://", adapter)
+        
         logger.info(f"Initialized Flux API client with endpoint: {self.endpoint}")
 
     def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
@@ -67,20 +259,35 @@ class FluxAPIClient:
         Raises:
             FluxAPIError: On API errors or network issues
         """
-        for attempt in range(FluxConfig.MAX_RETRIES):
+        attempt = 0
+        rate_limited = 0
+        
+        while True:
+            self.rate_limiter.acquire()
+            
             try:
                 response = self.session.request(method, url, timeout=FluxConfig.REQUEST_TIMEOUT, **kwargs)
                 
                 if response.status_code == 429:
-                    # Rate limit exceeded - exponential backoff
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limit exceeded. Waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
+                    rate_limited += 1
+                    if rate_limited > FluxConfig.RATE_LIMIT_MAX_RETRIES:
+                        raise FluxAPITransientError(f"Rate limit exceeded after {rate_limited} attempts")
+                    
+                    # Pause every worker sharing the limiter, as the server asked
+                    wait_time = parse_retry_after(response.headers.get('Retry-After'))
+                    if wait_time is None:
+                        wait_time = backoff_delay(rate_limited - 1)
+                    logger.warning(f"Rate limit exceeded. Waiting {wait_time:.1f} seconds...")
+                    self.rate_limiter.pause(wait_time)
                     continue
                     
                 elif response.status_code == 402:
                     raise FluxAPIError("Insufficient credits. Please add credits to your account.")
                     
+                elif response.status_code >= 500:
+                    error_msg = f"HTTP {response.status_code}: {response.text}"
+                    raise FluxAPITransientError(error_msg)
+                    
                 elif response.status_code >= 400:
                     error_msg = f"HTTP {response.status_code}: {response.text}"
                     raise FluxAPIError(error_msg)
@@ -88,14 +295,13 @@ class FluxAPIClient:
                 return response
                 
             except requests.exceptions.RequestException as e:
-                if attempt == FluxConfig.MAX_RETRIES - 1:
-                    raise FluxAPIError(f"Request failed after {FluxConfig.MAX_RETRIES} attempts: {str(e)}")
+                attempt += 1
+                if attempt == FluxConfig.MAX_RETRIES:
+                    raise FluxAPITransientError(f"Request failed after {FluxConfig.MAX_RETRIES} attempts: {str(e)}")
                 
-                wait_time = 2 ** attempt
-                logger.warning(f"Request failed (attempt {attempt + 1}), retrying in {wait_time}s: {str(e)}")
+                wait_time = backoff_delay(attempt - 1)
+                logger.warning(f"Request failed (attempt {attempt}), retrying in {wait_time:.1f}s: {str(e)}")
                 time.sleep(wait_time)
-        
-        raise FluxAPIError(f"Failed after {FluxConfig.MAX_RETRIES} attempts")
 
     def generate_image(self, 
                       prompt: str,
@@ -122,11 +328,164 @@ class FluxAPIClient:
         Returns:
             Generation result with image URL or error details
         """
+        url, payload, cache_key = self._prepare_generation(
+            prompt,
+            model=model,
+            aspect_ratio=aspect_ratio,
+            seed=seed,
+            output_format=output_format,
+            safety_tolerance=safety_tolerance,
+            prompt_upsampling=prompt_upsampling,
+            webhook_url=webhook_url
+        )
+        
+        cached = self._lookup_cache(cache_key)
+        if cached:
+            return cached
+        
+        submission = self._submit_payload(url, payload)
+        
+        # Poll for completion
+        result = self._poll_for_result(submission['polling_url'], submission['id'])
+        return self._store_cache(cache_key, result)
+
+    def submit_generation(self,
+                          prompt: str,
+                          model: str = None,
+                          **generation_kwargs) -> Dict[str, str]:
+        """
+        Submit a generation request without waiting for the result
+        
+        Args:
+            prompt: Text description of desired image
+            model: Model to use (defaults to flux_kontext)
+            **generation_kwargs: Same options as generate_image()
+            
+        Returns:
+            Dictionary with the request 'id', its 'polling_url' and 'cache_key'
+        """
+        url, payload, cache_key = self._prepare_generation(prompt, model, **generation_kwargs)
+        return {**self._submit_payload(url, payload), 'cache_key': cache_key}
+
+    def _prepare_generation(self,
+                            prompt: str,
+                            model: str = None,
+                            **generation_kwargs) -> tuple:
+        """
+        Resolve the URL, payload and cache key of a generation request
+        
+        Args:
+            prompt: Text description of desired image
+            model: Model to use (defaults to flux_kontext)
+            **generation_kwargs: Same options as generate_image()
+            
+        Returns:
+            Tuple of (url, payload, cache_key)
+        """
         model = model or FluxConfig.DEFAULT_MODEL
         model_endpoint = FluxConfig.MODELS.get(model, FluxConfig.MODELS["flux_kontext"])
         url = urljoin(self.base_url, model_endpoint)
         
-        # Build request payload
+        payload = self.build_generation_payload(prompt, **generation_kwargs)
+        
+        logger.info(f"Generating image with model: {model}")
+        logger.debug(f"Request payload: {payload}")
+        
+        return url, payload, self._cache_key(model, payload)
+
+    def _submit_payload(self, url: str, payload: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Send a request payload without waiting for the result
+        
+        Args:
+            url: Model endpoint URL
+            payload: Request payload
+            
+        Returns:
+            Dictionary with the request 'id' and its 'polling_url'
+        """
+        response = self._make_request("POST", url, json=payload)
+        request_id, polling_url = self.parse_submission(response.json())
+        
+        logger.info(f"Request submitted. ID: {request_id}")
+        
+        return {'id': request_id, 'polling_url': polling_url}
+
+    def _cache_key(self, model: str, payload: Dict[str, Any]) -> Optional[str]:
+        """Cache key of a request, or None when caching is disabled for it"""
+        if self.cache is None:
+            return None
+        if payload.get('seed') is None and not CacheConfig.CACHE_UNSEEDED:
+            return None
+        return GenerationCache.key_for(model, payload)
+
+    def _lookup_cache(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previous result of an identical request
+        
+        Args:
+            cache_key: Key from _cache_key()
+            
+        Returns:
+            Cached result, or None on a miss or when refreshing
+        """
+        if cache_key is None or self.refresh_cache:
+            return None
+        return self.cache.get(cache_key)
+
+    def _store_cache(self, cache_key: Optional[str], result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Download a ready result's image into the cache
+        
+        Caching is best effort: failures are logged and the uncached result
+        is returned, since the image can still be downloaded from its URL.
+        
+        Args:
+            cache_key: Key from _cache_key()
+            result: Polling result
+            
+        Returns:
+            Result with 'cache_path' set when the image was cached
+        """
+        if cache_key is None or result.get('status') != 'Ready':
+            return result
+        
+        try:
+            image_url = result['result']['sample']
+            extension = "jpg" if "jpeg" in image_url.lower() else "png"
+            image_path = self.download_image(
+                image_url, self.cache.image_path(cache_key, extension).name, self.cache.directory
+            )
+            self.cache.put(cache_key, result, image_path)
+            return {**result, 'cache_path': str(image_path)}
+            
+        except Exception as e:
+            logger.warning(f"Failed to cache generation {cache_key[:12]}: {str(e)}")
+            return result
+
+    @staticmethod
+    def build_generation_payload(prompt: str,
+                                 aspect_ratio: str = None,
+                                 seed: int = None,
+                                 output_format: str = None,
+                                 safety_tolerance: int = None,
+                                 prompt_upsampling: bool = False,
+                                 webhook_url: str = None) -> Dict[str, Any]:
+        """
+        Build and validate the request payload for a generation request
+        
+        Args:
+            prompt: Text description of desired image
+            aspect_ratio: Image aspect ratio
+            seed: Seed for reproducibility
+            output_format: Image format (jpeg/png)
+            safety_tolerance: Moderation level (0-6)
+            prompt_upsampling: Whether to perform prompt upsampling
+            webhook_url: URL for async completion notification
+            
+        Returns:
+            Request payload dictionary
+        """
         payload = {"prompt": prompt}
         
         if aspect_ratio:
@@ -153,23 +512,103 @@ class FluxAPIClient:
         if webhook_url:
             payload["webhook_url"] = webhook_url
         
-        logger.info(f"Generating image with model: {model}")
-        logger.debug(f"Request payload: {payload}")
+        return payload
+
+    @staticmethod
+    def build_edit_payload(prompt: str,
+                           input_image: Union[str, Path],
+                           aspect_ratio: str = None,
+                           seed: int = None,
+                           output_format: str = None,
+                           safety_tolerance: int = None,
+                           prompt_upsampling: bool = False,
+                           webhook_url: str = None) -> Dict[str, Any]:
+        """
+        Build and validate the request payload for an edit request
         
-        # Make initial request
-        response = self._make_request("POST", url, json=payload)
-        result = response.json()
+        Args:
+            prompt: Text description of the edit to apply
+            input_image: Path to input image or base64 string
+            aspect_ratio: Image aspect ratio
+            seed: Seed for reproducibility
+            output_format: Image format (jpeg/png)
+            safety_tolerance: Moderation level (0-2)
+            prompt_upsampling: Whether to perform prompt upsampling
+            webhook_url: URL for async completion notification
+            
+        Returns:
+            Request payload dictionary
+        """
+        # Encode input image if it's a file path
+        if isinstance(input_image, (str, Path)) and Path(input_image).exists():
+            input_image_b64 = FluxAPIClient.encode_image_to_base64(input_image)
+        else:
+            # Assume it's already base64 encoded
+            input_image_b64 = str(input_image)
+        
+        if safety_tolerance is not None and not 0 <= safety_tolerance <= 2:
+            raise FluxAPIError("Safety tolerance must be between 0-2 for editing")
         
+        payload = FluxAPIClient.build_generation_payload(
+            prompt,
+            aspect_ratio=aspect_ratio,
+            seed=seed,
+            output_format=output_format,
+            safety_tolerance=safety_tolerance,
+            prompt_upsampling=prompt_upsampling,
+            webhook_url=webhook_url
+        )
+        payload["input_image"] = input_image_b64
+        
+        return payload
+
+    @staticmethod
+    def parse_submission(result: Dict[str, Any]) -> tuple:
+        """
+        Extract request ID and polling URL from a submission response
+        
+        Args:
+            result: Parsed JSON response of the initial POST
+            
+        Returns:
+            Tuple of (request_id, polling_url)
+        """
         request_id = result.get("id")
         polling_url = result.get("polling_url")
         
         if not request_id or not polling_url:
             raise FluxAPIError(f"Invalid API response: {result}")
         
-        logger.info(f"Request submitted. ID: {request_id}")
+        return request_id, polling_url
+
+    @staticmethod
+    def check_poll_result(result: Dict[str, Any]) -> bool:
+        """
+        Interpret a polling response
         
-        # Poll for completion
-        return self._poll_for_result(polling_url, request_id)
+        Args:
+            result: Parsed JSON response of a polling request
+            
+        Returns:
+            True if the result is ready, False if polling should continue
+            
+        Raises:
+            FluxAPIError: If the generation failed
+        """
+        status = result.get('status')
+        logger.debug(f"Status: {status}")
+        
+        if status == 'Ready':
+            return True
+            
+        elif status in ['Error', 'Failed']:
+            error_msg = result.get('error', 'Generation failed')
+            raise FluxAPIError(f"Generation failed: {error_msg}")
+            
+        elif status not in ['Pending', 'Running']:
+            logger.warning(f"Unknown status: {status}")
+        
+        return False
 
     def _poll_for_result(self, polling_url: str, request_id: str) -> Dict[str, Any]:
         """
@@ -180,48 +619,76 @@ class FluxAPIClient:
             request_id: Request ID for tracking
             
         Returns:
-            Final result with image URL or error
+            Final result with image URL, including 'polling_stats'
         """
         logger.info(f"Polling for result: {request_id}")
         
+        tracker = PollingTracker(request_id)
+        
         while True:
-            time.sleep(FluxConfig.POLLING_INTERVAL)
+            time.sleep(tracker.time_until_next_poll())
             
-            try:
-                response = self._make_request("GET", polling_url, params={'id': request_id})
-                result = response.json()
-                
-                status = result.get('status')
-                logger.debug(f"Status: {status}")
-                
-                if status == 'Ready':
-                    logger.info("Generation completed successfully")
-                    return result
-                    
-                elif status in ['Error', 'Failed']:
-                    error_msg = result.get('error', 'Generation failed')
-                    raise FluxAPIError(f"Generation failed: {error_msg}")
-                    
-                elif status in ['Pending', 'Running']:
-                    # Continue polling
-                    continue
-                    
-                else:
-                    logger.warning(f"Unknown status: {status}")
-                    continue
-                    
-            except Exception as e:
-                logger.error(f"Polling error: {str(e)}")
-                raise FluxAPIError(f"Polling failed: {str(e)}")
+            result = self._check_status(polling_url, tracker)
+            if result is not None:
+                logger.info(f"Generation completed successfully after {tracker.poll_count} polls "
+                            f"({tracker.elapsed:.1f}s)")
+                return result
 
-    def download_image(self, image_url: str, filename: str = None, directory: Path = None) -> Path:
+    def _check_status(self, polling_url: str, tracker: PollingTracker) -> Optional[Dict[str, Any]]:
+        """
+        Poll a request once and update its polling schedule
+        
+        Args:
+            polling_url: URL for polling status
+            tracker: Polling tracker of the request
+            
+        Returns:
+            Final result if the request is ready, None if it is still in progress
+            
+        Raises:
+            FluxAPIError: If the generation failed, timed out or polling kept failing
+        """
+        tracker.check_deadline()
+        
+        try:
+            response = self._make_request("GET", polling_url, params={'id': tracker.request_id})
+            result = response.json()
+            
+        except FluxAPITransientError as e:
+            tracker.record_transient_error(e)
+            return None
+            
+        except Exception as e:
+            logger.error(f"Polling error: {str(e)}")
+            raise FluxAPIError(f"Polling failed: {str(e)}")
+        
+        tracker.record_status(result.get('status'), response.headers.get('Retry-After'))
+        
+        if not self.check_poll_result(result):
+            return None
+        
+        result['polling_stats'] = tracker.stats()
+        return result
+
+    def download_image(self,
+                       image_url: str,
+                       filename: str = None,
+                       directory: Path = None,
+                       verify: bool = None) -> Path:
         """
         Download generated image from delivery URL
         
+        The image is streamed in chunks to a hidden partial file next to the
+        destination and renamed into place only once complete, so an
+        interrupted download never leaves a truncated image behind. Dropped
+        connections are retried, resuming from the bytes already received
+        when the server supports range requests.
+        
         Args:
             image_url: URL of generated image
             filename: Custom filename (auto-generated if None)
             directory: Directory to save to (defaults to generated_images)
+            verify: Decode the image before moving it into place (defaults to config)
             
         Returns:
             Path to downloaded image file
@@ -229,6 +696,113 @@ class FluxAPIClient:
         if not image_url:
             raise FluxAPIError("Image URL is required")
         
+        file_path = self._resolve_image_path(image_url, filename, directory)
+        partial_path = self._partial_path(file_path)
+        verify = FluxConfig.VERIFY_DOWNLOADS if verify is None else verify
+        
+        logger.info(f"Downloading image to: {file_path}")
+        
+        try:
+            attempt = 0
+            while True:
+                try:
+                    self._stream_to_file(image_url, partial_path)
+                    break
+                except (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError, FluxAPITransientError) as e:
+                    attempt += 1
+                    if attempt > FluxConfig.MAX_RETRIES:
+                        raise
+                    
+                    wait_time = backoff_delay(attempt - 1)
+                    logger.warning(f"Download interrupted (attempt {attempt}), retrying in {wait_time:.1f}s: {str(e)}")
+                    time.sleep(wait_time)
+            
+            if verify:
+                self.verify_image(partial_path)
+            
+            os.replace(partial_path, file_path)
+            
+            logger.info(f"Image downloaded successfully: {file_path}")
+            return file_path
+            
+        except Exception as e:
+            partial_path.unlink(missing_ok=True)
+            raise FluxAPIError(f"Failed to download image: {str(e)}")
+
+    def _stream_to_file(self, image_url: str, partial_path: Path):
+        """
+        Stream a download into a partial file, resuming from its current size
+        
+        Args:
+            image_url: URL of generated image
+            partial_path: File receiving the bytes
+            
+        Raises:
+            FluxAPITransientError: On server errors or a body shorter than announced
+        """
+        offset = partial_path.stat().st_size if partial_path.exists() else 0
+        headers = {'Range': f"bytes={offset}-"} if offset else {}
+        
+        with self.download_session.get(image_url, headers=headers, stream=True,
+                                       timeout=FluxConfig.DOWNLOAD_TIMEOUT) as response:
+            if response.status_code >= 500:
+                raise FluxAPITransientError(f"Download failed with HTTP {response.status_code}")
+            if response.status_code == 416:
+                partial_path.unlink(missing_ok=True)
+                raise FluxAPITransientError("Cannot resume download, restarting")
+            response.raise_for_status()
+            
+            # The server ignored the range request, start over
+            if response.status_code != 206:
+                offset = 0
+            
+            content_length = response.headers.get('Content-Length')
+            expected_size = offset + int(content_length) if content_length else None
+            
+            with open(partial_path, 'ab' if offset else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=FluxConfig.DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        
+        actual_size = partial_path.stat().st_size
+        if expected_size is not None and actual_size != expected_size:
+            raise FluxAPITransientError(f"Incomplete download: {actual_size} of {expected_size} bytes")
+
+    @staticmethod
+    def _partial_path(file_path: Path) -> Path:
+        """Hidden, per-download temporary path next to the destination"""
+        return file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:8]}.part")
+
+    @staticmethod
+    def verify_image(image_path: Union[str, Path]):
+        """
+        Check that an image file decodes completely
+        
+        Args:
+            image_path: Path to image file
+            
+        Raises:
+            FluxAPIError: If the file is not a complete, decodable image
+        """
+        try:
+            with Image.open(image_path) as img:
+                img.load()
+        except Exception as e:
+            raise FluxAPIError(f"Downloaded file is not a valid image: {str(e)}")
+
+    @staticmethod
+    def _resolve_image_path(image_url: str, filename: str = None, directory: Path = None) -> Path:
+        """
+        Resolve where an image is saved, creating the directory
+        
+        Args:
+            image_url: URL of generated image
+            filename: Custom filename (auto-generated if None)
+            directory: Directory to save to (defaults to generated_images)
+            
+        Returns:
+            Destination file path
+        """
         # Set default directory and filename
         directory = directory or ProjectPaths.GENERATED_IMAGES_DIR
         directory.mkdir(exist_ok=True, parents=True)
@@ -238,24 +812,30 @@ class FluxAPIClient:
             extension = "jpg" if "jpeg" in image_url.lower() else "png"
             filename = f"{ImageConfig.IMAGE_PREFIX}{timestamp}.{extension}"
         
-        file_path = directory / filename
-        
-        logger.info(f"Downloading image to: {file_path}")
+        return directory / filename
+
+    def save_result_image(self, result: Dict[str, Any], filename: str = None, directory: Path = None) -> Path:
+        """
+        Save the image of a ready result, copying it from the cache when possible
         
-        try:
-            # Download image data
-            response = requests.get(image_url, timeout=60)
-            response.raise_for_status()
-            
-            # Save to file
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
+        Args:
+            result: Ready generation or editing result
+            filename: Custom filename (auto-generated if None)
+            directory: Directory to save to (defaults to generated_images)
             
-            logger.info(f"Image downloaded successfully: {file_path}")
+        Returns:
+            Path to saved image file
+        """
+        image_url = result['result']['sample']
+        cache_path = result.get('cache_path')
+        
+        if cache_path and os.path.exists(cache_path):
+            file_path = self._resolve_image_path(image_url, filename, directory)
+            shutil.copyfile(cache_path, file_path)
+            logger.info(f"Image copied from cache: {file_path}")
             return file_path
-            
-        except Exception as e:
-            raise FluxAPIError(f"Failed to download image: {str(e)}")
+        
+        return self.download_image(image_url, filename, directory)
 
     def generate_and_download(self, 
                             prompt: str,
@@ -284,7 +864,7 @@ class FluxAPIClient:
             image_url = result['result']['sample']
             
             # Download image
-            local_path = self.download_image(image_url, filename, directory)
+            local_path = self.save_result_image(result, filename, directory)
             
             # Return complete result
             return {
@@ -303,12 +883,20 @@ class FluxAPIClient:
                 'prompt': prompt
             }
 
-    def encode_image_to_base64(self, image_path: Union[str, Path]) -> str:
+    @staticmethod
+    def encode_image_to_base64(image_path: Union[str, Path], max_dimension: int = None) -> str:
         """
         Encode image file to base64 string for API requests
         
+        JPEG and PNG files that need no conversion are sent as-is, without
+        being decoded. Results are memoized by file path, size and
+        modification time, so editing the same input repeatedly (as in
+        batch_edit_variations) encodes it only once.
+        
         Args:
             image_path: Path to image file
+            max_dimension: Downscale so the longest side fits (defaults to config,
+                None keeps the original size)
             
         Returns:
             Base64 encoded image string
@@ -318,26 +906,11 @@ class FluxAPIClient:
         if not image_path.exists():
             raise FluxAPIError(f"Image file not found: {image_path}")
         
+        max_dimension = max_dimension or ImageConfig.EDIT_INPUT_MAX_DIMENSION
+        stat = image_path.stat()
+        
         try:
-            # Open and validate image
-            with Image.open(image_path) as img:
-                # Convert to RGB if necessary (for JPEG compatibility)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Save to bytes buffer
-                buffered = BytesIO()
-                
-                # Determine format based on file extension
-                format = 'JPEG' if image_path.suffix.lower() in ['.jpg', '.jpeg'] else 'PNG'
-                img.save(buffered, format=format, quality=90 if format == 'JPEG' else None)
-                
-                # Encode to base64
-                img_str = base64.b64encode(buffered.getvalue()).decode()
-                
-                logger.debug(f"Image encoded to base64: {image_path} ({len(img_str)} chars)")
-                return img_str
-                
+            return _encode_image_file(str(image_path.resolve()), stat.st_size, stat.st_mtime_ns, max_dimension)
         except Exception as e:
             raise FluxAPIError(f"Failed to encode image: {str(e)}")
 
@@ -369,60 +942,31 @@ class FluxAPIClient:
         model_endpoint = FluxConfig.MODELS["flux_kontext"]
         url = urljoin(self.base_url, model_endpoint)
         
-        # Encode input image if it's a file path
-        if isinstance(input_image, (str, Path)) and Path(input_image).exists():
-            input_image_b64 = self.encode_image_to_base64(input_image)
-        else:
-            # Assume it's already base64 encoded
-            input_image_b64 = str(input_image)
-        
-        # Build request payload
-        payload = {
-            "prompt": prompt,
-            "input_image": input_image_b64
-        }
-        
-        if aspect_ratio:
-            if aspect_ratio not in ImageConfig.ASPECT_RATIOS:
-                raise FluxAPIError(f"Invalid aspect ratio. Supported: {ImageConfig.ASPECT_RATIOS}")
-            payload["aspect_ratio"] = aspect_ratio
-        
-        if seed is not None:
-            payload["seed"] = seed
-            
-        if output_format:
-            if output_format not in ImageConfig.OUTPUT_FORMATS:
-                raise FluxAPIError(f"Invalid output format. Supported: {ImageConfig.OUTPUT_FORMATS}")
-            payload["output_format"] = output_format
-            
-        if safety_tolerance is not None:
-            if not 0 <= safety_tolerance <= 2:
-                raise FluxAPIError("Safety tolerance must be between 0-2 for editing")
-            payload["safety_tolerance"] = safety_tolerance
-            
-        if prompt_upsampling:
-            payload["prompt_upsampling"] = True
-            
-        if webhook_url:
-            payload["webhook_url"] = webhook_url
+        payload = self.build_edit_payload(
+            prompt,
+            input_image,
+            aspect_ratio=aspect_ratio,
+            seed=seed,
+            output_format=output_format,
+            safety_tolerance=safety_tolerance,
+            prompt_upsampling=prompt_upsampling,
+            webhook_url=webhook_url
+        )
         
         logger.info(f"Editing image with prompt: {prompt[:100]}...")
         logger.debug(f"Request payload keys: {list(payload.keys())}")
         
-        # Make initial request
-        response = self._make_request("POST", url, json=payload)
-        result = response.json()
-        
-        request_id = result.get("id")
-        polling_url = result.get("polling_url")
-        
-        if not request_id or not polling_url:
-            raise FluxAPIError(f"Invalid API response: {result}")
+        cache_key = self._cache_key("flux_kontext", payload)
+        cached = self._lookup_cache(cache_key)
+        if cached:
+            return cached
         
-        logger.info(f"Edit request submitted. ID: {request_id}")
+        # Make initial request
+        submission = self._submit_payload(url, payload)
         
         # Poll for completion
-        return self._poll_for_result(polling_url, request_id)
+        result = self._poll_for_result(submission['polling_url'], submission['id'])
+        return self._store_cache(cache_key, result)
 
     def edit_and_download(self,
                          prompt: str,
@@ -459,7 +1003,7 @@ class FluxAPIClient:
                 filename = f"{input_path.stem}_edited_{timestamp}{input_path.suffix}"
             
             # Download edited image
-            local_path = self.download_image(image_url, filename, directory)
+            local_path = self.save_result_image(result, filename, directory)
             
             # Return complete result
             return {
@@ -483,6 +1027,7 @@ class FluxAPIClient:
     def batch_generate(self, 
                       prompts: list,
                       output_directory: Path = None,
+                      max_workers: int = 1,
                       **generation_kwargs) -> list:
         """
         Generate multiple images in batch
@@ -490,49 +1035,409 @@ class FluxAPIClient:
         Args:
             prompts: List of prompt strings or prompt dictionaries
             output_directory: Directory for batch output
+            max_workers: Number of generations to run concurrently
             **generation_kwargs: Common generation parameters
             
         Returns:
-            List of generation results
+            List of generation results, in the same order as prompts
         """
         output_directory = output_directory or ProjectPaths.GENERATED_IMAGES_DIR / "batch"
         output_directory.mkdir(exist_ok=True, parents=True)
         
-        results = []
+        total = len(prompts)
+        results = [None] * total
         
-        for i, prompt_data in enumerate(prompts):
-            if isinstance(prompt_data, str):
-                prompt = prompt_data
-                kwargs = generation_kwargs.copy()
-            else:
-                prompt = prompt_data.get('prompt', '')
-                kwargs = {**generation_kwargs, **prompt_data}
-                kwargs.pop('prompt', None)  # Remove prompt from kwargs
+        if max_workers <= 1:
+            for i, prompt_data in enumerate(prompts):
+                results[i] = self._run_batch_item(i, total, prompt_data, output_directory, generation_kwargs)
+        else:
+            logger.info(f"Running batch of {total} prompts with {max_workers} workers")
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._run_batch_item, i, total, prompt_data, output_directory, generation_kwargs): i
+                    for i, prompt_data in enumerate(prompts)
+                }
+                
+                # Collect results as they land, but store them by input index
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        
+        logger.info(f"Batch generation completed. Results: {len(results)}")
+        return results
+
+    def batch_generate_pipelined(self,
+                                 prompts: list,
+                                 output_directory: Path = None,
+                                 max_workers: int = None,
+                                 **generation_kwargs) -> list:
+        """
+        Generate multiple images by submitting everything up front
+        
+        All requests are submitted first so they queue on the API side
+        together, then a single poller sweeps every pending request each
+        tick and hands each one to a download worker as soon as it is ready.
+        
+        Args:
+            prompts: List of prompt strings or prompt dictionaries
+            output_directory: Directory for batch output
+            max_workers: Number of concurrent downloads (defaults to pool size)
+            **generation_kwargs: Common generation parameters
             
+        Returns:
+            List of generation results, in the same order as prompts
+        """
+        output_directory = output_directory or ProjectPaths.GENERATED_IMAGES_DIR / "batch"
+        output_directory.mkdir(exist_ok=True, parents=True)
+        
+        total = len(prompts)
+        results = [None] * total
+        pending = {}
+        
+        # Phase 1: submit every request
+        for i, prompt_data in enumerate(prompts):
+            prompt, kwargs = self._split_batch_entry(prompt_data, generation_kwargs)
             try:
-                filename = f"batch_{i+1:03d}_{datetime.now().strftime('%H%M%S')}"
-                result = self.generate_and_download(
-                    prompt=prompt,
-                    filename=filename,
-                    directory=output_directory,
-                    **kwargs
-                )
-                results.append(result)
-                logger.info(f"Batch {i+1}/{len(prompts)} completed")
+                url, payload, cache_key = self._prepare_generation(prompt, **kwargs)
+                cached = self._lookup_cache(cache_key)
+                if cached:
+                    results[i] = self._download_batch_result(i, total, prompt, cached, output_directory)
+                    continue
                 
+                submission = self._submit_payload(url, payload)
+                pending[i] = {
+                    **submission,
+                    'prompt': prompt,
+                    'cache_key': cache_key,
+                    'tracker': PollingTracker(submission['id'])
+                }
             except Exception as e:
-                error_result = {
+                logger.error(f"Batch {i+1}/{total} submission failed: {str(e)}")
+                results[i] = {
                     'status': 'failed',
                     'error': str(e),
                     'prompt': prompt,
                     'batch_index': i
                 }
-                results.append(error_result)
-                logger.error(f"Batch {i+1}/{len(prompts)} failed: {str(e)}")
+        
+        logger.info(f"Submitted {len(pending)}/{total} requests, polling for results")
+        
+        # Phase 2: sweep all pending requests, downloading each as it lands
+        with ThreadPoolExecutor(max_workers=max_workers or FluxConfig.MAX_CONCURRENT_REQUESTS) as executor:
+            downloads = {}
+            
+            while pending:
+                time.sleep(min(job['tracker'].time_until_next_poll() for job in pending.values()))
+                
+                for i, job in list(pending.items()):
+                    if not job['tracker'].is_due():
+                        continue
+                    
+                    try:
+                        result = self._check_status(job['polling_url'], job['tracker'])
+                    except FluxAPIError as e:
+                        logger.error(f"Batch {i+1}/{total} failed: {str(e)}")
+                        results[i] = {
+                            'status': 'failed',
+                            'error': str(e),
+                            'prompt': job['prompt'],
+                            'batch_index': i
+                        }
+                        del pending[i]
+                        continue
+                    
+                    if result is not None:
+                        del pending[i]
+                        downloads[executor.submit(
+                            self._download_batch_result, i, total, job['prompt'], result, output_directory,
+                            job['cache_key']
+                        )] = i
+            
+            for future in as_completed(downloads):
+                results[downloads[future]] = future.result()
         
         logger.info(f"Batch generation completed. Results: {len(results)}")
         return results
 
+    def batch_generate_webhook(self,
+                               prompts: list,
+                               output_directory: Path = None,
+                               max_workers: int = None,
+                               webhook_host: str = None,
+                               webhook_port: int = None,
+                               webhook_public_url: str = None,
+                               **generation_kwargs) -> list:
+        """
+        Generate multiple images with webhook completions instead of polling
+        
+        A local WebhookReceiver is started, every request is submitted with
+        its URL, and each completion posted back is handed straight to a
+        download worker. A request whose webhook has not arrived within
+        WEBHOOK_TIMEOUT of its own submission is checked once by polling
+        before being failed. Prompt dictionaries may carry a 'filename' to
+        save their image under instead of the default batch name.
+        
+        Args:
+            prompts: List of prompt strings or prompt dictionaries
+            output_directory: Directory for batch output
+            max_workers: Number of concurrent downloads (defaults to pool size)
+            webhook_host: Interface for the receiver to listen on
+            webhook_port: Port for the receiver to listen on
+            webhook_public_url: Externally reachable URL forwarding to the receiver
+            **generation_kwargs: Common generation parameters
+            
+        Returns:
+            List of generation results, in the same order as prompts
+        """
+        output_directory = output_directory or ProjectPaths.GENERATED_IMAGES_DIR / "batch"
+        output_directory.mkdir(exist_ok=True, parents=True)
+        
+        total = len(prompts)
+        results = [None] * total
+        completions = queue.Queue()
+        
+        receiver = WebhookReceiver(
+            callback=completions.put,
+            host=webhook_host,
+            port=webhook_port,
+            public_url=webhook_public_url
+        )
+        
+        with receiver, ThreadPoolExecutor(max_workers=max_workers or FluxConfig.MAX_CONCURRENT_REQUESTS) as executor:
+            pending = {}
+            downloads = {}
+            
+            # Submit every request without polling
+            for i, prompt_data in enumerate(prompts):
+                prompt, kwargs = self._split_batch_entry(prompt_data, generation_kwargs)
+                kwargs['webhook_url'] = receiver.webhook_url
+                filename = prompt_data.get('filename') if isinstance(prompt_data, dict) else None
+                try:
+                    url, payload, cache_key = self._prepare_generation(prompt, **kwargs)
+                    cached = self._lookup_cache(cache_key)
+                    if cached:
+                        results[i] = self._download_batch_result(
+                            i, total, prompt, cached, output_directory, filename=filename
+                        )
+                        continue
+                    
+                    submission = self._submit_payload(url, payload)
+                    pending[submission['id']] = {
+                        **submission,
+                        'index': i,
+                        'prompt': prompt,
+                        'cache_key': cache_key,
+                        'filename': filename,
+                        'deadline': time.monotonic() + FluxConfig.WEBHOOK_TIMEOUT
+                    }
+                except Exception as e:
+                    logger.error(f"Batch {i+1}/{total} submission failed: {str(e)}")
+                    results[i] = {
+                        'status': 'failed',
+                        'error': str(e),
+                        'prompt': prompt,
+                        'batch_index': i
+                    }
+            
+            logger.info(f"Submitted {len(pending)}/{total} requests, waiting for webhooks")
+            
+            while pending:
+                # Fall back to a single poll for requests whose webhook did not arrive in time
+                now = time.monotonic()
+                for request_id in [request_id for request_id, job in pending.items() if job['deadline'] <= now]:
+                    job = pending.pop(request_id)
+                    logger.warning(f"No webhook received for {request_id}, checking status directly")
+                    try:
+                        result = self._check_status(job['polling_url'], PollingTracker(request_id))
+                        if result is None:
+                            raise FluxAPIError(f"Timed out waiting for webhook ({FluxConfig.WEBHOOK_TIMEOUT}s)")
+                    except FluxAPIError as e:
+                        logger.error(f"Batch {job['index']+1}/{total} failed: {str(e)}")
+                        results[job['index']] = {
+                            'status': 'failed',
+                            'error': str(e),
+                            'prompt': job['prompt'],
+                            'batch_index': job['index']
+                        }
+                        continue
+                    
+                    downloads[executor.submit(
+                        self._download_batch_result, job['index'], total, job['prompt'], result, output_directory,
+                        job['cache_key'], job['filename']
+                    )] = job['index']
+                
+                if not pending:
+                    break
+                
+                try:
+                    payload = completions.get(timeout=min(job['deadline'] for job in pending.values()) - now)
+                except queue.Empty:
+                    continue
+                
+                result = parse_webhook_payload(payload)
+                job = pending.get(result['id'])
+                
+                if job is None:
+                    logger.debug(f"Ignoring webhook for unknown request: {result['id']}")
+                    continue
+                
+                try:
+                    if not self.check_poll_result(result):
+                        continue  # Progress notification, keep waiting
+                except FluxAPIError as e:
+                    logger.error(f"Batch {job['index']+1}/{total} failed: {str(e)}")
+                    results[job['index']] = {
+                        'status': 'failed',
+                        'error': str(e),
+                        'prompt': job['prompt'],
+                        'batch_index': job['index']
+                    }
+                    del pending[result['id']]
+                    continue
+                
+                del pending[result['id']]
+                downloads[executor.submit(
+                    self._download_batch_result, job['index'], total, job['prompt'], result, output_directory,
+                    job['cache_key'], job['filename']
+                )] = job['index']
+            
+            for future in as_completed(downloads):
+                results[downloads[future]] = future.result()
+        
+        logger.info(f"Batch generation completed. Results: {len(results)}")
+        return results
+
+    def _download_batch_result(self,
+                               index: int,
+                               total: int,
+                               prompt: str,
+                               result: Dict[str, Any],
+                               output_directory: Path,
+                               cache_key: str = None,
+                               filename: str = None) -> Dict[str, Any]:
+        """
+        Download the image of a finished batch request
+        
+        Args:
+            index: Position of the entry in the batch
+            total: Total number of entries in the batch
+            prompt: Prompt the image was generated from
+            result: Ready polling result
+            output_directory: Directory for batch output
+            cache_key: Key to store a fresh result under in the generation cache
+            filename: Filename without extension (defaults to a numbered batch name)
+            
+        Returns:
+            Generation result for this entry
+        """
+        try:
+            result = self._store_cache(cache_key, result)
+            image_url = result['result']['sample']
+            filename = filename or f"batch_{index+1:03d}_{datetime.now().strftime('%H%M%S')}"
+            local_path = self.save_result_image(result, filename, output_directory)
+            logger.info(f"Batch {index+1}/{total} completed")
+            
+            return {
+                'status': 'completed',
+                'generation_result': result,
+                'local_path': str(local_path),
+                'image_url': image_url,
+                'prompt': prompt
+            }
+            
+        except Exception as e:
+            logger.error(f"Batch {index+1}/{total} failed: {str(e)}")
+            return {
+                'status': 'failed',
+                'error': str(e),
+                'prompt': prompt,
+                'batch_index': index
+            }
+
+    @staticmethod
+    def _split_batch_entry(prompt_data: Union[str, Dict[str, Any]],
+                           generation_kwargs: Dict[str, Any]) -> tuple:
+        """
+        Split a batch entry into its prompt and generation parameters
+        
+        Args:
+            prompt_data: Prompt string or prompt dictionary
+            generation_kwargs: Common generation parameters
+            
+        Returns:
+            Tuple of (prompt, kwargs)
+        """
+        if isinstance(prompt_data, str):
+            return prompt_data, generation_kwargs.copy()
+        
+        kwargs = {**generation_kwargs, **prompt_data}
+        prompt = kwargs.pop('prompt', '')  # Remove prompt from kwargs
+        
+        # Drop metadata keys that the API does not accept
+        kwargs = {k: v for k, v in kwargs.items() if k in FluxAPIClient.GENERATION_PARAMS}
+        return prompt, kwargs
+
+    def _run_batch_item(self,
+                        index: int,
+                        total: int,
+                        prompt_data: Union[str, Dict[str, Any]],
+                        output_directory: Path,
+                        generation_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate and download a single batch entry
+        
+        Args:
+            index: Position of the entry in the batch
+            total: Total number of entries in the batch
+            prompt_data: Prompt string or prompt dictionary
+            output_directory: Directory for batch output
+            generation_kwargs: Common generation parameters
+            
+        Returns:
+            Generation result for this entry
+        """
+        prompt, kwargs = self._split_batch_entry(prompt_data, generation_kwargs)
+        
+        try:
+            filename = f"batch_{index+1:03d}_{datetime.now().strftime('%H%M%S')}"
+            result = self.generate_and_download(
+                prompt=prompt,
+                filename=filename,
+                directory=output_directory,
+                **kwargs
+            )
+            logger.info(f"Batch {index+1}/{total} completed")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Batch {index+1}/{total} failed: {str(e)}")
+            return {
+                'status': 'failed',
+                'error': str(e),
+                'prompt': prompt,
+                'batch_index': index
+            }
+
+    def get_throttle_stats(self) -> Dict[str, Any]:
+        """
+        Get client-side rate limiting statistics for this client's endpoint
+        
+        Returns:
+            Dictionary with total/throttled request counts and seconds spent throttled
+        """
+        return self.rate_limiter.stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get generation cache statistics for this client
+        
+        Returns:
+            Dictionary with cache hit and miss counts
+        """
+        if self.cache is None:
+            return {'hits': 0, 'misses': 0}
+        return self.cache.stats()
+
     def get_account_info(self) -> Dict[str, Any]:
         """
         Get account information (if endpoint supports it)
@@ -621,6 +1526,7 @@ def quick_edit(input_image: Union[str, Path], prompt: str, **kwargs) -> Dict[str
 
 def batch_edit_variations(input_image: Union[str, Path], 
                          edit_prompts: list, 
+                         client: FluxAPIClient = None,
                          **kwargs) -> list:
     """
     Apply multiple edits to the same base image
@@ -628,12 +1534,13 @@ def batch_edit_variations(input_image: Union[str, Path],
     Args:
         input_image: Path to input image
         edit_prompts: List of edit descriptions
+        client: Client to use (a default client is created if None)
         **kwargs: Additional editing parameters
         
     Returns:
         List of editing results
     """
-    client = FluxAPIClient()
+    client = client or FluxAPIClient()
     results = []
     
     for i, prompt in enumerate(edit_prompts):
@@ -0,0 +1,223 @@
+"""
+Content-addressed on-disk cache of generated images and their API results
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config import CacheConfig, ProjectPaths
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class GenerationCache:
+    """
+    Persistent cache keyed by a hash of the normalized request payload
+    
+    Each entry is a pair of files named by the key: ``<key>.json`` with the
+    API result and ``<key>.<ext>`` with the image bytes. Entries expire after
+    CacheConfig.MAX_AGE_DAYS, and the least recently used entries are evicted
+    once the cache grows past CacheConfig.MAX_SIZE_MB.
+    
+    Sizes and last-use times are kept in an in-memory index, built by one
+    directory scan and updated by get() and put(), so a write only evicts
+    when it pushes the cache over its limit. The directory is scanned again
+    every CacheConfig.RESCAN_INTERVAL seconds to pick up entries written or
+    removed by other processes.
+    """
+    
+    # Payload fields that do not affect the generated image
+    IGNORED_FIELDS = ('webhook_url',)
+
+    def __init__(self, directory: Path = None, max_size_mb: float = None, max_age_days: float = None):
+        """
+        Initialize generation cache
+        
+        Args:
+            directory: Cache directory (defaults to config)
+            max_size_mb: Size limit before LRU eviction (defaults to config)
+            max_age_days: Entry lifetime (defaults to config)
+        """
+        self.directory = Path(directory or ProjectPaths.CACHE_DIR)
+        self.directory.mkdir(exist_ok=True, parents=True)
+        self.max_size_bytes = (max_size_mb or CacheConfig.MAX_SIZE_MB) * 1024 * 1024
+        self.max_age_seconds = (max_age_days or CacheConfig.MAX_AGE_DAYS) * 24 * 3600
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        # key -> [last used, size in bytes, entry]; None until the first scan
+        self._index = None
+        self._total_size = 0
+        self._scanned_at = 0.0
+
+    @classmethod
+    def key_for(cls, model: str, payload: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a request
+        
+        Args:
+            model: Model name the payload is sent to
+            payload: Request payload
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        normalized = {k: v for k, v in payload.items() if k not in cls.IGNORED_FIELDS}
+        normalized['model'] = model
+        normalized['prompt'] = " ".join(str(normalized.get('prompt', '')).split())
+        
+        # Hash large input images separately so the key material stays small
+        if 'input_image' in normalized:
+            normalized['input_image'] = hashlib.sha256(str(normalized['input_image']).encode()).hexdigest()
+        
+        material = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def image_path(self, key: str, extension: str) -> Path:
+        """Path where the image of an entry is stored"""
+        return self.directory / f"{key}.{extension}"
+
+    def _metadata_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached generation
+        
+        Args:
+            key: Cache key from key_for()
+        
+        Returns:
+            Cached API result with 'cache_path' pointing at the image, or None
+        """
+        metadata_path = self._metadata_path(key)
+        
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        image_path = self.directory / entry['image_file']
+        
+        if time.time() - entry['created_at'] > self.max_age_seconds or not image_path.exists():
+            self._remove(key, entry)
+            with self._lock:
+                self.misses += 1
+                if self._index is not None and key in self._index:
+                    self._total_size -= self._index.pop(key)[1]
+            return None
+        
+        # Touch the entry so eviction is least-recently-used
+        os.utime(metadata_path)
+        
+        with self._lock:
+            self.hits += 1
+            if self._index is not None and key in self._index:
+                self._index[key][0] = time.time()
+        
+        logger.info(f"Cache hit: {key[:12]}")
+        return {**entry['result'], 'cached': True, 'cache_path': str(image_path)}
+
+    def put(self, key: str, result: Dict[str, Any], image_path: Path):
+        """
+        Record a generation whose image was already saved at image_path(key, ext)
+        
+        Args:
+            key: Cache key from key_for()
+            result: API result of the generation
+            image_path: Cached image file inside the cache directory
+        """
+        entry = {
+            'created_at': time.time(),
+            'image_file': Path(image_path).name,
+            'result': {k: v for k, v in result.items() if k not in ('cached', 'cache_path')}
+        }
+        
+        # Write atomically so concurrent readers never see a partial entry
+        metadata_path = self._metadata_path(key)
+        temp_path = metadata_path.with_suffix(f".json.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, metadata_path)
+        
+        with self._lock:
+            if self._index is None or time.time() - self._scanned_at > CacheConfig.RESCAN_INTERVAL:
+                self._scan()
+            else:
+                size = metadata_path.stat().st_size + Path(image_path).stat().st_size
+                previous = self._index.get(key)
+                self._total_size += size - (previous[1] if previous else 0)
+                self._index[key] = [entry['created_at'], size, entry]
+            
+            if self._total_size > self.max_size_bytes:
+                self._evict_lru()
+
+    def evict(self):
+        """Remove expired entries, then least recently used ones above the size limit"""
+        with self._lock:
+            self._scan()
+            self._evict_lru()
+
+    def _scan(self):
+        """Rebuild the index from the cache directory, removing expired entries"""
+        now = time.time()
+        self._index = {}
+        self._total_size = 0
+        
+        for metadata_path in self.directory.glob("*.json"):
+            try:
+                with open(metadata_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                stat = metadata_path.stat()
+                image_size = (self.directory / entry['image_file']).stat().st_size
+            except (OSError, KeyError, json.JSONDecodeError):
+                continue
+            
+            key = metadata_path.stem
+            if now - entry['created_at'] > self.max_age_seconds:
+                self._remove(key, entry)
+                continue
+            
+            self._index[key] = [stat.st_mtime, stat.st_size + image_size, entry]
+            self._total_size += stat.st_size + image_size
+        
+        self._scanned_at = now
+
+    def _evict_lru(self):
+        """Remove least recently used entries until the cache fits its size limit"""
+        for key in sorted(self._index, key=lambda k: self._index[k][0]):
+            if self._total_size <= self.max_size_bytes:
+                break
+            _, size, entry = self._index.pop(key)
+            self._remove(key, entry)
+            self._total_size -= size
+
+    def _remove(self, key: str, entry: Dict[str, Any] = None):
+        """Delete an entry's files"""
+        paths = [self._metadata_path(key)]
+        if entry and entry.get('image_file'):
+            paths.append(self.directory / entry['image_file'])
+        
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        
+        logger.debug(f"Evicted cache entry: {key[:12]}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit/miss statistics"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
@@ -6,6 +6,7 @@ Comprehensive image generation system using Flux API with advanced prompt genera
 import click
 import json
 import sys
+import time
 from pathlib import Path
 from typing import Dict, List, Optional
 import logging
@@ -19,13 +20,16 @@ logger = logging.getLogger(__name__)
 
 # Import our modules
 try:
-    from config import FluxConfig, ColorPalettes, ProjectPaths
+    from config import FluxConfig, ColorPalettes, TypographyStyles, ProjectPaths
     from flux_api_client import FluxAPIClient, quick_generate, batch_generate_styles, quick_edit, batch_edit_variations
-    from prompt_generator import AdvancedPromptGenerator, quick_prompt_from_copy, analyze_copy_only
+    from prompt_generator import (
+        AdvancedPromptGenerator, PromptVariantEngine, ImagePurpose,
+        quick_prompt_from_copy, analyze_copy_only, read_copies, analyze_copies
+    )
     from visual_styles import VisualStyleSelector
     from image_editor import LandingPageImageEditor, ImageEditingWorkflows, get_editor, suggest_edits, build_edit_prompt
     from utils import (
-        HTMLParser, extract_landing_page_content, 
+        HTMLParser, ExtractionCache, extract_landing_page_content, 
         FileManager, ImageValidator, ProgressTracker,
         validate_project_structure
     )
@@ -37,8 +41,12 @@ except ImportError as e:
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
 @click.option('--api-key', help='Override API key from environment')
 @click.option('--endpoint', default='global', help='API endpoint to use (global, eu, us)')
+@click.option('--no-cache', is_flag=True, help='Bypass the generation cache')
+@click.option('--refresh', is_flag=True,
+              help='Ignore cached generations but store the new results. Only seeded requests are cached '
+                   'unless FLUX_CACHE_UNSEEDED=1 is set')
 @click.pass_context
-def cli(ctx, verbose, api_key, endpoint):
+def cli(ctx, verbose, api_key, endpoint, no_cache, refresh):
     """
     Landing Page Image Generator
     
@@ -51,6 +59,8 @@ def cli(ctx, verbose, api_key, endpoint):
     ctx.ensure_object(dict)
     ctx.obj['api_key'] = api_key
     ctx.obj['endpoint'] = endpoint
+    ctx.obj['no_cache'] = no_cache
+    ctx.obj['refresh'] = refresh
     
     # Validate project structure
     validation = validate_project_structure()
@@ -67,7 +77,7 @@ def cli(ctx, verbose, api_key, endpoint):
 @click.option('--output', '-o', type=click.Path(), help='Output directory')
 @click.option('--filename', '-f', help='Custom filename')
 @click.option('--aspect-ratio', '-ar', default='1:1', help='Image aspect ratio')
-@click.option('--seed', type=int, help='Seed for reproducibility')
+@click.option('--seed', type=int, help='Seed for reproducibility (seeded results are cached)')
 @click.pass_context
 def generate(ctx, prompt, style, palette, output, filename, aspect_ratio, seed):
     """
@@ -80,7 +90,9 @@ def generate(ctx, prompt, style, palette, output, filename, aspect_ratio, seed):
         # Initialize client
         client = FluxAPIClient(
             api_key=ctx.obj.get('api_key'),
-            endpoint=ctx.obj.get('endpoint')
+            endpoint=ctx.obj.get('endpoint'),
+            use_cache=not ctx.obj.get('no_cache'),
+            refresh_cache=ctx.obj.get('refresh')
         )
         
         # Set output directory
@@ -172,7 +184,9 @@ def from_copy(ctx, ad_copy, style, palette, output, analyze_only, show_prompt):
         # Initialize client and generate
         client = FluxAPIClient(
             api_key=ctx.obj.get('api_key'),
-            endpoint=ctx.obj.get('endpoint')
+            endpoint=ctx.obj.get('endpoint'),
+            use_cache=not ctx.obj.get('no_cache'),
+            refresh_cache=ctx.obj.get('refresh')
         )
         
         output_dir = Path(output) if output else ProjectPaths.GENERATED_IMAGES_DIR
@@ -210,6 +224,21 @@ def from_copy(ctx, ad_copy, style, palette, output, analyze_only, show_prompt):
         click.echo(f"❌ Error: {str(e)}")
         sys.exit(1)
 
+def _section_copy(extracted_content: Dict, section: Optional[str]) -> str:
+    """Consolidate extracted page content into ad copy, focusing on one section if requested"""
+    if section:
+        content_map = {
+            'hero': ['title', 'headings', 'cta_buttons'],
+            'features': ['features', 'paragraphs'],
+            'testimonials': ['testimonials'],
+            'pricing': ['pricing', 'cta_buttons']
+        }
+        
+        relevant_keys = content_map.get(section, list(extracted_content.keys()))
+        extracted_content = {k: v for k, v in extracted_content.items() if k in relevant_keys}
+    
+    return HTMLParser.consolidate_content_for_prompt(extracted_content)
+
 @cli.command()
 @click.argument('html_file', type=click.Path(exists=True))
 @click.option('--section', type=click.Choice(['hero', 'features', 'testimonials', 'pricing']),
@@ -230,23 +259,9 @@ def from_html(ctx, html_file, section, style, output):
         
         logger.info(f"Extracting content from: {html_path}")
         
-        # Extract content from HTML
-        extracted_content = HTMLParser.extract_text_from_html(html_path)
-        
-        # Focus on specific section if requested
-        if section:
-            content_map = {
-                'hero': ['title', 'headings', 'cta_buttons'],
-                'features': ['features', 'paragraphs'],
-                'testimonials': ['testimonials'],
-                'pricing': ['pricing', 'cta_buttons']
-            }
-            
-            relevant_keys = content_map.get(section, list(extracted_content.keys()))
-            filtered_content = {k: v for k, v in extracted_content.items() if k in relevant_keys}
-            ad_copy = HTMLParser.consolidate_content_for_prompt(filtered_content)
-        else:
-            ad_copy = HTMLParser.consolidate_content_for_prompt(extracted_content)
+        # Extract content from HTML (reused from the extraction cache if the page is unchanged)
+        extracted_content = HTMLParser.extract_cached(html_path)
+        ad_copy = _section_copy(extracted_content, section)
         
         click.echo(f"📄 Extracted content: {ad_copy[:200]}...")
         
@@ -258,13 +273,158 @@ def from_html(ctx, html_file, section, style, output):
         click.echo(f"❌ Error: {str(e)}")
         sys.exit(1)
 
+@cli.command()
+@click.argument('directories', nargs=-1, type=click.Path(exists=True, file_okay=False))
+@click.option('--section', type=click.Choice(['hero', 'features', 'testimonials', 'pricing']),
+              help='Specific section to focus on')
+@click.option('--style', '-s', type=click.Choice(VisualStyleSelector.get_style_names()),
+              help='Visual style to apply')
+@click.option('--palette', '-p', type=click.Choice(ColorPalettes.list_palettes()),
+              help='Color palette to use')
+@click.option('--workers', '-w', type=int, help='Extraction processes (default: CPU count)')
+@click.option('--output', '-o', type=click.Path(), help='Prompts file to write')
+@click.option('--generate', is_flag=True, help='Generate an image for every page with the batch command')
+@click.option('--concurrent', '-c', type=int, default=1, help='Concurrent generations with --generate')
+@click.pass_context
+def from_html_dir(ctx, directories, section, style, palette, workers, output, generate, concurrent):
+    """
+    Build prompts from every HTML landing page in one or more directories
+    
+    Pages are extracted on a process pool, and extractions are cached by
+    page content, so unchanged pages are not parsed again. The prompts are
+    written as a batch file; --generate runs it right away.
+    
+    Example:
+        python image_generator.py from-html-dir ../MAV ../WorldMasterclass --section hero --generate
+    """
+    try:
+        directories = [Path(d) for d in directories] or [d for d in ProjectPaths.LANDING_PAGE_DIRS if d.exists()]
+        html_files = sorted(f for d in directories for f in d.rglob('*.html'))
+        
+        if not html_files:
+            click.echo("❌ No HTML files found")
+            return
+        
+        click.echo(f"📄 Extracting {len(html_files)} pages from {', '.join(str(d) for d in directories)}")
+        
+        cache = ExtractionCache()
+        results = HTMLParser.extract_many(html_files, max_workers=workers, cache=cache)
+        
+        generator = AdvancedPromptGenerator()
+        prompts = []
+        
+        for result in results:
+            if 'error' in result:
+                click.echo(f"  ❌ {result['file']}: {result['error']}")
+                continue
+            
+            ad_copy = _section_copy(result['content'], section)
+            prompts.append({
+                'prompt': generator.generate_comprehensive_prompt(
+                    ad_copy,
+                    preferred_style=style,
+                    preferred_palette=palette,
+                    include_text=True
+                ),
+                'source': result['file'],
+                'ad_copy': ad_copy
+            })
+        
+        stats = cache.stats()
+        click.echo(f"✅ Built {len(prompts)} prompts ({stats['hits']} pages from the extraction cache, "
+                   f"{stats['misses']} parsed)")
+        
+        if output:
+            prompts_file = Path(output)
+        else:
+            prompts_file = ProjectPaths.GENERATED_IMAGES_DIR / FileManager.generate_filename("html_prompts", extension="json")
+        prompts_file.parent.mkdir(exist_ok=True, parents=True)
+        
+        with open(prompts_file, 'w', encoding='utf-8') as f:
+            json.dump(prompts, f, indent=2, ensure_ascii=False)
+        
+        click.echo(f"📋 Prompts saved to: {prompts_file}")
+        
+        if generate and prompts:
+            ctx.invoke(batch, prompts_file=str(prompts_file), concurrent=concurrent)
+        
+    except Exception as e:
+        logger.error(f"Multi-page HTML extraction failed: {str(e)}")
+        click.echo(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--field', '-f', help='CSV column or JSONL key holding the copy (default: ad_copy or copy)')
+@click.option('--style', '-s', type=click.Choice(VisualStyleSelector.get_style_names()),
+              help='Visual style for the prompts')
+@click.option('--palette', '-p', type=click.Choice(ColorPalettes.list_palettes()),
+              help='Color palette for the prompts')
+@click.option('--no-prompts', is_flag=True, help='Only analyze the copy, without building prompts')
+@click.option('--prompt-seed', type=int, help='Seed for a different (still reproducible) set of prompts')
+@click.option('--workers', '-w', type=int, default=1, help='Worker processes (0: CPU count)')
+@click.option('--output', '-o', type=click.Path(), help='JSONL file to write')
+def analyze_batch(input_file, field, style, palette, no_prompts, prompt_seed, workers, output):
+    """
+    Analyze every advertising copy in a CSV, JSONL or text file
+    
+    Copies are streamed through one generator per process and each result
+    is written as one JSONL line as soon as it is ready, so files with
+    tens of thousands of variants are handled in constant memory.
+    
+    Example:
+        python image_generator.py analyze-batch headlines.csv --field headline -w 4
+    """
+    try:
+        if output:
+            output_file = Path(output)
+        else:
+            output_file = ProjectPaths.GENERATED_IMAGES_DIR / FileManager.generate_filename("copy_analysis", extension="jsonl")
+        output_file.parent.mkdir(exist_ok=True, parents=True)
+        
+        click.echo(f"📊 Analyzing copies from {input_file}" + (f" ({workers} workers)" if workers != 1 else ""))
+        
+        results = analyze_copies(
+            read_copies(input_file, field),
+            include_prompt=not no_prompts,
+            style=style,
+            palette=palette,
+            seed=prompt_seed,
+            workers=workers or None
+        )
+        
+        start = time.perf_counter()
+        count = 0
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                count += 1
+                if count % 10000 == 0:
+                    logger.info(f"Analyzed {count} copies ({count / (time.perf_counter() - start):,.0f} copies/sec)")
+        elapsed = time.perf_counter() - start
+        
+        if not count:
+            click.echo("❌ No copies found in file")
+            return
+        
+        click.echo(f"✅ Analyzed {count} copies in {elapsed:.2f}s ({count / elapsed:,.0f} copies/sec)")
+        click.echo(f"📋 Results saved to: {output_file}")
+        
+    except Exception as e:
+        logger.error(f"Batch copy analysis failed: {str(e)}")
+        click.echo(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
 @cli.command()
 @click.argument('base_prompt', type=str)
 @click.option('--styles', '-s', multiple=True, type=click.Choice(VisualStyleSelector.get_style_names()),
               help='Specific styles to generate (default: all styles)')
 @click.option('--output', '-o', type=click.Path(), help='Output directory')
+@click.option('--webhook', is_flag=True, help='Receive completions on a local webhook listener instead of polling')
+@click.option('--webhook-port', type=int, default=FluxConfig.WEBHOOK_PORT, help='Port for the webhook listener')
+@click.option('--webhook-url', help='Public URL forwarding to the webhook listener (e.g. a tunnel)')
 @click.pass_context
-def multi_style(ctx, base_prompt, styles, output):
+def multi_style(ctx, base_prompt, styles, output, webhook, webhook_port, webhook_url):
     """
     Generate the same prompt in multiple visual styles
     
@@ -284,7 +444,9 @@ def multi_style(ctx, base_prompt, styles, output):
         # Initialize client
         client = FluxAPIClient(
             api_key=ctx.obj.get('api_key'),
-            endpoint=ctx.obj.get('endpoint')
+            endpoint=ctx.obj.get('endpoint'),
+            use_cache=not ctx.obj.get('no_cache'),
+            refresh_cache=ctx.obj.get('refresh')
         )
         
         # Generate prompts for each style
@@ -295,32 +457,42 @@ def multi_style(ctx, base_prompt, styles, output):
                 enhanced_prompt = f"{base_prompt}, {style_info['formula'].lower()}"
                 prompts.append({
                     'prompt': enhanced_prompt,
-                    'style': style
+                    'style': style,
+                    'filename': f"{style}_{len(prompts)+1:02d}"
                 })
         
         # Batch generate
         progress = ProgressTracker(len(prompts), "Multi-style generation")
         results = []
         
-        for i, prompt_data in enumerate(prompts):
-            try:
-                filename = f"{prompt_data['style']}_{i+1:02d}"
-                result = client.generate_and_download(
-                    prompt=prompt_data['prompt'],
-                    filename=filename,
-                    directory=output_dir
-                )
-                results.append({**result, **prompt_data})
-                progress.update()
-                
-            except Exception as e:
-                logger.error(f"Failed to generate style {prompt_data['style']}: {str(e)}")
-                results.append({
-                    'status': 'failed',
-                    'error': str(e),
-                    'style': prompt_data['style']
-                })
-                progress.update()
+        if webhook:
+            batch_results = client.batch_generate_webhook(
+                prompts,
+                output_directory=output_dir,
+                webhook_port=webhook_port,
+                webhook_public_url=webhook_url
+            )
+            results = [{**result, **prompt_data} for result, prompt_data in zip(batch_results, prompts)]
+            progress.update(len(results))
+        else:
+            for prompt_data in prompts:
+                try:
+                    result = client.generate_and_download(
+                        prompt=prompt_data['prompt'],
+                        filename=prompt_data['filename'],
+                        directory=output_dir
+                    )
+                    results.append({**result, **prompt_data})
+                    progress.update()
+                    
+                except Exception as e:
+                    logger.error(f"Failed to generate style {prompt_data['style']}: {str(e)}")
+                    results.append({
+                        'status': 'failed',
+                        'error': str(e),
+                        'style': prompt_data['style']
+                    })
+                    progress.update()
         
         progress.finish()
         
@@ -343,12 +515,79 @@ def multi_style(ctx, base_prompt, styles, output):
         click.echo(f"❌ Error: {str(e)}")
         sys.exit(1)
 
+@cli.command()
+@click.argument('ad_copy', type=str)
+@click.option('--styles', '-s', multiple=True, type=click.Choice(VisualStyleSelector.get_style_names()),
+              help='Styles to explore (default: all)')
+@click.option('--palettes', '-p', multiple=True, type=click.Choice(ColorPalettes.list_palettes()),
+              help='Palettes to explore (default: all)')
+@click.option('--typography', '-t', multiple=True, type=click.Choice(list(TypographyStyles.STYLES)),
+              help='Typography styles to explore (default: all)')
+@click.option('--purposes', multiple=True, type=click.Choice([p.value for p in ImagePurpose]),
+              help='Image purposes to explore (default: all)')
+@click.option('--limit', '-n', type=int, help='Maximum number of distinct prompts')
+@click.option('--sample', is_flag=True, help='Pick combinations in random order (reproducible with --seed)')
+@click.option('--seed', type=int, help='Seed for --sample')
+@click.option('--no-text', is_flag=True, help='Build prompts without text elements')
+@click.option('--output', '-o', type=click.Path(), help='Prompts file to write')
+@click.option('--generate', is_flag=True, help='Generate every variant with the batch command')
+@click.option('--concurrent', '-c', type=int, default=1, help='Concurrent generations with --generate')
+@click.pass_context
+def variants(ctx, ad_copy, styles, palettes, typography, purposes, limit, sample, seed, no_text,
+             output, generate, concurrent):
+    """
+    Fan advertising copy out over style × palette × typography × purpose
+    
+    Combinations are built lazily and near-identical prompts are skipped, so
+    each prompt written (and generated with --generate) is distinct.
+    
+    Example:
+        python image_generator.py variants "Save 50% on operations today" -s high_contrast -s hand_drawn -n 20 --sample
+    """
+    try:
+        engine = PromptVariantEngine(
+            styles=list(styles),
+            palettes=list(palettes),
+            typographies=list(typography),
+            purposes=[ImagePurpose(p) for p in purposes]
+        )
+        
+        click.echo(f"🎨 Exploring {engine.space_size} combinations" + (f" (up to {limit} prompts)" if limit else ""))
+        
+        prompts = list(engine.variants(ad_copy, limit=limit, sample=sample, seed=seed, include_text=not no_text))
+        
+        click.echo(f"✅ Built {len(prompts)} distinct prompts from {engine.stats['candidates']} combinations "
+                   f"({engine.stats['duplicates']} duplicates skipped)")
+        
+        if output:
+            prompts_file = Path(output)
+        else:
+            prompts_file = ProjectPaths.GENERATED_IMAGES_DIR / FileManager.generate_filename("variant_prompts", extension="json")
+        prompts_file.parent.mkdir(exist_ok=True, parents=True)
+        
+        with open(prompts_file, 'w', encoding='utf-8') as f:
+            json.dump(prompts, f, indent=2, ensure_ascii=False)
+        
+        click.echo(f"📋 Prompts saved to: {prompts_file}")
+        
+        if generate and prompts:
+            ctx.invoke(batch, prompts_file=str(prompts_file), concurrent=concurrent)
+        
+    except Exception as e:
+        logger.error(f"Variant fan-out failed: {str(e)}")
+        click.echo(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
 @cli.command()
 @click.argument('prompts_file', type=click.Path(exists=True))
 @click.option('--output', '-o', type=click.Path(), help='Output directory')
 @click.option('--concurrent', '-c', type=int, default=1, help='Number of concurrent generations')
+@click.option('--pipeline', is_flag=True, help='Submit all prompts first, then poll them together')
+@click.option('--webhook', is_flag=True, help='Receive completions on a local webhook listener instead of polling')
+@click.option('--webhook-port', type=int, default=FluxConfig.WEBHOOK_PORT, help='Port for the webhook listener')
+@click.option('--webhook-url', help='Public URL forwarding to the webhook listener (e.g. a tunnel)')
 @click.pass_context
-def batch(ctx, prompts_file, output, concurrent):
+def batch(ctx, prompts_file, output, concurrent, pipeline, webhook, webhook_port, webhook_url):
     """
     Generate images from a batch file (JSON or text)
     
@@ -378,16 +617,37 @@ def batch(ctx, prompts_file, output, concurrent):
         output_dir = Path(output) if output else ProjectPaths.GENERATED_IMAGES_DIR / "batch"
         output_dir.mkdir(exist_ok=True, parents=True)
         
-        logger.info(f"Processing {len(prompts_data)} prompts from: {prompts_path}")
+        logger.info(f"Processing {len(prompts_data)} prompts from: {prompts_path} ({concurrent} concurrent)")
         
         # Initialize client
         client = FluxAPIClient(
             api_key=ctx.obj.get('api_key'),
-            endpoint=ctx.obj.get('endpoint')
+            endpoint=ctx.obj.get('endpoint'),
+            use_cache=not ctx.obj.get('no_cache'),
+            refresh_cache=ctx.obj.get('refresh')
         )
         
         # Process batch
-        results = client.batch_generate(prompts_data, output_directory=output_dir)
+        if webhook:
+            results = client.batch_generate_webhook(
+                prompts_data,
+                output_directory=output_dir,
+                max_workers=concurrent if concurrent > 1 else None,
+                webhook_port=webhook_port,
+                webhook_public_url=webhook_url
+            )
+        elif pipeline:
+            results = client.batch_generate_pipelined(
+                prompts_data,
+                output_directory=output_dir,
+                max_workers=concurrent if concurrent > 1 else None
+            )
+        else:
+            results = client.batch_generate(
+                prompts_data,
+                output_directory=output_dir,
+                max_workers=concurrent
+            )
         
         # Report results
         successful = [r for r in results if r['status'] == 'completed']
@@ -395,6 +655,15 @@ def batch(ctx, prompts_file, output, concurrent):
         
         click.echo(f"✅ Batch processing completed: {len(successful)}/{len(results)} successful")
         
+        throttle = client.get_throttle_stats()
+        if throttle['throttled_requests']:
+            click.echo(f"⏱️ Rate limited {throttle['throttled_requests']}/{throttle['total_requests']} requests "
+                       f"for {throttle['throttled_time']:.1f}s total")
+        
+        cache = client.get_cache_stats()
+        if cache['hits']:
+            click.echo(f"💾 Served {cache['hits']} images from the generation cache")
+        
         if successful:
             click.echo(f"📁 Images saved to: {output_dir}")
         
@@ -506,7 +775,7 @@ def status():
 @click.option('--output', '-o', type=click.Path(), help='Output directory')
 @click.option('--filename', '-f', help='Custom filename')
 @click.option('--aspect-ratio', '-ar', help='Aspect ratio for edited image')
-@click.option('--seed', type=int, help='Seed for reproducibility')
+@click.option('--seed', type=int, help='Seed for reproducibility (seeded results are cached)')
 @click.pass_context
 def edit(ctx, input_image, edit_prompt, output, filename, aspect_ratio, seed):
     """
@@ -519,7 +788,9 @@ def edit(ctx, input_image, edit_prompt, output, filename, aspect_ratio, seed):
         # Initialize client
         client = FluxAPIClient(
             api_key=ctx.obj.get('api_key'),
-            endpoint=ctx.obj.get('endpoint')
+            endpoint=ctx.obj.get('endpoint'),
+            use_cache=not ctx.obj.get('no_cache'),
+            refresh_cache=ctx.obj.get('refresh')
         )
         
         # Set output directory
@@ -680,7 +951,9 @@ def smart_edit(ctx, input_image, ad_copy, output, apply_all, interactive):
         output_dir = Path(output) if output else ProjectPaths.GENERATED_IMAGES_DIR
         client = FluxAPIClient(
             api_key=ctx.obj.get('api_key'),
-            endpoint=ctx.obj.get('endpoint')
+            endpoint=ctx.obj.get('endpoint'),
+            use_cache=not ctx.obj.get('no_cache'),
+            refresh_cache=ctx.obj.get('refresh')
         )
         
         current_image = input_image
@@ -759,7 +1032,9 @@ def batch_edit(ctx, input_image, edits_file, output, iterative):
         
         client = FluxAPIClient(
             api_key=ctx.obj.get('api_key'),
-            endpoint=ctx.obj.get('endpoint')
+            endpoint=ctx.obj.get('endpoint'),
+            use_cache=not ctx.obj.get('no_cache'),
+            refresh_cache=ctx.obj.get('refresh')
         )
         
         if iterative:
@@ -793,7 +1068,7 @@ def batch_edit(ctx, input_image, edits_file, output, iterative):
             
         else:
             # Apply edits independently (all from original)
-            results = batch_edit_variations(input_image, edit_prompts, directory=output_dir)
+            results = batch_edit_variations(input_image, edit_prompts, client=client, directory=output_dir)
             
             successful = [r for r in results if r['status'] == 'completed']
             failed = [r for r in results if r['status'] == 'failed']
@@ -2,9 +2,18 @@
 Advanced Prompt Generator for Landing Page Images
 Implements the comprehensive prompt generation framework from the provided documentation
 """
+import os
 import re
+import csv
+import json
 import random
-from typing import Dict, List, Optional, Union, Any
+import hashlib
+from bisect import bisect_right
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, product
+from pathlib import Path
+from typing import Dict, List, Optional, Union, Any, Iterable, Iterator
 from dataclasses import dataclass
 from enum import Enum
 
@@ -31,17 +40,264 @@ class PromptComponents:
     texture_effects: List[str]
     text_content: Dict[str, str]
 
+class CopyAnalyzer:
+    """
+    Single-pass analysis engine behind AdvancedPromptGenerator.analyze_advertising_copy()
+    
+    Every keyword in the tables below is compiled once into a combined regex
+    that finds all (overlapping) keyword occurrences in one scan of the
+    lowercased copy. The audience, offering, tone and pain point fields are
+    answered from that scan; the benefit, value and CTA patterns all start
+    with a literal trigger word and only run when their trigger was seen.
+    Results are identical to the per-field reference implementation.
+    """
+    
+    AUDIENCE_KEYWORDS = {
+        "business": ["business", "entrepreneur", "company", "enterprise", "B2B"],
+        "professional": ["professional", "career", "workplace", "corporate"],
+        "personal": ["personal", "individual", "family", "lifestyle"],
+        "students": ["student", "learning", "education", "course"],
+        "health": ["health", "fitness", "wellness", "medical"],
+        "tech": ["tech", "software", "digital", "app", "platform"]
+    }
+    
+    PAIN_INDICATORS = [
+        "struggle", "difficult", "hard", "challenge", "problem",
+        "frustrating", "time-consuming", "expensive", "complicated",
+        "stressed", "overwhelmed", "confused", "stuck"
+    ]
+    
+    BENEFIT_INDICATORS = [
+        "achieve", "get", "receive", "gain", "improve", "increase",
+        "boost", "enhance", "optimize", "maximize", "save", "reduce"
+    ]
+    
+    OFFERING_KEYWORDS = {
+        "software": ["software", "app", "platform", "tool", "system"],
+        "service": ["service", "consulting", "coaching", "done-for-you"],
+        "course": ["course", "training", "education", "masterclass"],
+        "product": ["product", "device", "equipment", "supplement"],
+        "membership": ["membership", "community", "access", "subscription"]
+    }
+    
+    EMOTIONAL_INDICATORS = {
+        "urgent": ["now", "today", "limited time", "hurry", "urgent", "immediate"],
+        "aspirational": ["dream", "achieve", "success", "transform", "breakthrough"],
+        "fear": ["miss out", "behind", "struggle", "failure", "lose"],
+        "excitement": ["amazing", "incredible", "revolutionary", "game-changing"],
+        "trust": ["proven", "guaranteed", "trusted", "verified", "secure"]
+    }
+    
+    # (trigger word, pattern): a pattern can only match where its trigger occurs
+    VALUE_PATTERNS = [
+        ("save", r"save\s+\$?\d+"), ("increase", r"increase\s+\w+\s+by\s+\d+%"),
+        ("reduce", r"reduce\s+\w+\s+by\s+\d+%"), ("get", r"get\s+\d+x\s+\w+"),
+        ("boost", r"boost\s+your\s+\w+"), ("achieve", r"achieve\s+\w+\s+in\s+\d+")
+    ]
+    
+    CTA_PATTERNS = [
+        ("click", r"click\s+\w+"), ("get", r"get\s+\w+\s+now"), ("start", r"start\s+\w+"),
+        ("join", r"join\s+\w+"), ("sign", r"sign\s+up"), ("download", r"download\s+\w+"),
+        ("book", r"book\s+\w+"), ("schedule", r"schedule\s+\w+"), ("contact", r"contact\s+\w+")
+    ]
+    
+    def __init__(self):
+        keywords = set(self.PAIN_INDICATORS) | set(self.BENEFIT_INDICATORS)
+        for table in (self.AUDIENCE_KEYWORDS, self.OFFERING_KEYWORDS, self.EMOTIONAL_INDICATORS):
+            for words in table.values():
+                keywords.update(words)
+        keywords.update(trigger for trigger, _ in self.VALUE_PATTERNS + self.CTA_PATTERNS)
+        
+        # The scanner matches the longest keyword starting at a position; shorter
+        # keywords that are prefixes of it are added from this table
+        self.keyword_scanner = re.compile(self._trie_pattern(keywords))
+        self.prefixes = {k: [p for p in keywords if k.startswith(p)] for k in keywords}
+        
+        # Keyword -> rank of the first category listing it, and keyword -> tones listing it
+        self.audience_ranks = self._category_ranks(self.AUDIENCE_KEYWORDS)
+        self.offering_ranks = self._category_ranks(self.OFFERING_KEYWORDS)
+        self.keyword_tones = {}
+        for tone, words in self.EMOTIONAL_INDICATORS.items():
+            for keyword in words:
+                self.keyword_tones.setdefault(keyword, []).append(tone)
+        
+        self.value_patterns = [(trigger, re.compile(pattern)) for trigger, pattern in self.VALUE_PATTERNS]
+        self.cta_patterns = [(trigger, re.compile(pattern)) for trigger, pattern in self.CTA_PATTERNS]
+        self.benefit_patterns = [
+            (indicator, re.compile(rf"{indicator}\s+[\w\s]+(?:[.!?]|$)")) for indicator in self.BENEFIT_INDICATORS
+        ]
+    
+    @classmethod
+    def _trie_pattern(cls, keywords) -> str:
+        """
+        Regex matching any of the keywords, factored by common prefix
+        
+        A flat alternation retries every keyword at every position; the
+        factored form only follows branches whose next character matches.
+        Optional tails are greedy, so the longest keyword wins.
+        """
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        
+        def build(node):
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            return f"(?:{pattern})?" if "" in node else pattern
+        
+        return build(trie)
+    
+    def find_keywords(self, text_lower: str) -> Dict[str, int]:
+        """Every table keyword occurring in the text, with the offset of its first occurrence"""
+        found = {}
+        match = self.keyword_scanner.search(text_lower)
+        while match:
+            for keyword in self.prefixes[match.group()]:
+                if keyword not in found:
+                    found[keyword] = match.start()
+            # Keywords may overlap, so resume one character on rather than after the match
+            match = self.keyword_scanner.search(text_lower, match.start() + 1)
+        return found
+    
+    def analyze(self, ad_copy: str) -> Dict[str, Any]:
+        """
+        Analyze advertising copy in one scan
+        
+        Args:
+            ad_copy: The advertising copy text to analyze
+            
+        Returns:
+            Dictionary with analyzed components
+        """
+        text_lower = ad_copy.lower()
+        found = self.find_keywords(text_lower)
+        sentences = ad_copy.split('.')
+        
+        return {
+            "value_proposition": self._first_match(self.value_patterns, text_lower, found) or sentences[0].strip(),
+            "target_audience": self._first_category(self.AUDIENCE_KEYWORDS, self.audience_ranks, found, "general"),
+            "pain_points": self._pain_points(ad_copy, sentences, found),
+            "benefits": [
+                benefit for indicator, pattern in self.benefit_patterns if indicator in found
+                for benefit in pattern.findall(text_lower)
+            ],
+            "offering_type": self._first_category(self.OFFERING_KEYWORDS, self.offering_ranks, found, "service"),
+            "emotional_tone": self._emotional_tone(found),
+            "call_to_action": self._first_match(self.cta_patterns, text_lower, found)
+        }
+    
+    @staticmethod
+    def _first_match(patterns: List[tuple], text_lower: str, found: Dict[str, int]) -> str:
+        """Match of the first pattern (in table order) that matches"""
+        for trigger, pattern in patterns:
+            if trigger in found:
+                match = pattern.search(text_lower)
+                if match:
+                    return match.group()
+        return ""
+    
+    @staticmethod
+    def _category_ranks(table: Dict[str, List[str]]) -> Dict[str, int]:
+        """Position (in table order) of the first category listing each keyword"""
+        ranks = {}
+        for rank, keywords in enumerate(table.values()):
+            for keyword in keywords:
+                ranks.setdefault(keyword, rank)
+        return ranks
+    
+    @staticmethod
+    def _first_category(table: Dict[str, List[str]], ranks: Dict[str, int],
+                        found: Dict[str, int], default: str) -> str:
+        """First category (in table order) with a keyword in the text"""
+        matched = [ranks[keyword] for keyword in found if keyword in ranks]
+        return list(table)[min(matched)] if matched else default
+    
+    def _emotional_tone(self, found: Dict[str, int]) -> str:
+        """Tone with the most keywords in the text (the first listed one on ties)"""
+        scores = dict.fromkeys(self.EMOTIONAL_INDICATORS, 0)
+        for keyword in found:
+            for tone in self.keyword_tones.get(keyword, ()):
+                scores[tone] += 1
+        return max(scores, key=scores.get)
+    
+    def _pain_points(self, ad_copy: str, sentences: List[str], found: Dict[str, int]) -> List[str]:
+        """Per pain indicator, the first sentence containing it"""
+        indicators = [indicator for indicator in self.PAIN_INDICATORS if indicator in found]
+        if not indicators:
+            return []
+        
+        if not ad_copy.isascii():
+            # Lowercasing may change lengths or depend on context; check each sentence as written
+            lowered = [sentence.lower() for sentence in sentences]
+            pain_points = []
+            for indicator in indicators:
+                for sentence, sentence_lower in zip(sentences, lowered):
+                    if indicator in sentence_lower:
+                        pain_points.append(sentence.strip())
+                        break
+            return pain_points
+        
+        # No keyword contains '.', so the first occurrence lies in the first sentence containing it
+        starts = [0]
+        for sentence in sentences[:-1]:
+            starts.append(starts[-1] + len(sentence) + 1)
+        
+        return [sentences[bisect_right(starts, found[indicator]) - 1].strip() for indicator in indicators]
+
 class AdvancedPromptGenerator:
     """
     Advanced prompt generator that transforms advertising copy into 
     comprehensive image generation prompts following the detailed guidelines
+    
+    Prompts are reproducible: the random choices for each prompt come from an
+    RNG seeded with a hash of the copy (and the generator's seed, if given),
+    so the same inputs always give the same prompt text. That keeps prompt-keyed
+    caches such as the generation cache hitting, and lets results be memoized.
     """
     
-    def __init__(self):
+    PROMPT_CACHE_SIZE = 1024
+    
+    # Compiled once and shared; the analyzer holds no per-call state
+    copy_analyzer = CopyAnalyzer()
+    
+    def __init__(self, seed: Optional[int] = None, rng: Optional[random.Random] = None):
+        """
+        Initialize the prompt generator
+        
+        Args:
+            seed: Mixed into every prompt's seed, to get a different but still
+                reproducible set of prompts
+            rng: Random generator used for every prompt instead of per-copy
+                seeding (prompts then depend on call order and are not memoized)
+        """
         self.asian_demographics = [
             "Chinese", "Malay", "Indian", "Japanese", "Korean", 
             "Thai", "Vietnamese", "Filipino", "Indonesian"
         ]
+        self.seed = seed
+        self.rng = rng
+        self.prompt_cache = OrderedDict()
+    
+    def rng_for(self, ad_copy: str) -> random.Random:
+        """
+        Random generator for the prompt of one copy
+        
+        Args:
+            ad_copy: The advertising copy the prompt is built from
+            
+        Returns:
+            The explicit RNG if one was given, else a new RNG seeded from the copy
+        """
+        if self.rng is not None:
+            return self.rng
+        
+        material = ad_copy if self.seed is None else f"{self.seed}\0{ad_copy}"
+        return random.Random(int(hashlib.sha256(material.encode('utf-8')).hexdigest(), 16))
     
     def analyze_advertising_copy(self, ad_copy: str) -> Dict[str, Any]:
         """
@@ -53,6 +309,15 @@ class AdvancedPromptGenerator:
         Returns:
             Dictionary with analyzed components
         """
+        return self.copy_analyzer.analyze(ad_copy)
+    
+    def analyze_advertising_copy_reference(self, ad_copy: str) -> Dict[str, Any]:
+        """
+        Reference implementation of analyze_advertising_copy(), one pass per field
+        
+        Slower, but simple enough to check the single-pass analyzer against
+        (see benchmark_copy_analysis.py).
+        """
         analysis = {
             "value_proposition": self._extract_value_proposition(ad_copy),
             "target_audience": self._identify_target_audience(ad_copy),
@@ -67,13 +332,7 @@ class AdvancedPromptGenerator:
     def _extract_value_proposition(self, text: str) -> str:
         """Extract the main value proposition from ad copy"""
         # Look for key value indicators
-        value_patterns = [
-            r"save\s+\$?\d+", r"increase\s+\w+\s+by\s+\d+%",
-            r"reduce\s+\w+\s+by\s+\d+%", r"get\s+\d+x\s+\w+",
-            r"boost\s+your\s+\w+", r"achieve\s+\w+\s+in\s+\d+"
-        ]
-        
-        for pattern in value_patterns:
+        for _, pattern in CopyAnalyzer.VALUE_PATTERNS:
             match = re.search(pattern, text.lower())
             if match:
                 return match.group()
@@ -84,17 +343,8 @@ class AdvancedPromptGenerator:
     
     def _identify_target_audience(self, text: str) -> str:
         """Identify target audience from ad copy"""
-        audience_keywords = {
-            "business": ["business", "entrepreneur", "company", "enterprise", "B2B"],
-            "professional": ["professional", "career", "workplace", "corporate"],
-            "personal": ["personal", "individual", "family", "lifestyle"],
-            "students": ["student", "learning", "education", "course"],
-            "health": ["health", "fitness", "wellness", "medical"],
-            "tech": ["tech", "software", "digital", "app", "platform"]
-        }
-        
         text_lower = text.lower()
-        for audience, keywords in audience_keywords.items():
+        for audience, keywords in CopyAnalyzer.AUDIENCE_KEYWORDS.items():
             if any(keyword in text_lower for keyword in keywords):
                 return audience
         
@@ -102,16 +352,10 @@ class AdvancedPromptGenerator:
     
     def _extract_pain_points(self, text: str) -> List[str]:
         """Extract pain points mentioned in ad copy"""
-        pain_indicators = [
-            "struggle", "difficult", "hard", "challenge", "problem",
-            "frustrating", "time-consuming", "expensive", "complicated",
-            "stressed", "overwhelmed", "confused", "stuck"
-        ]
-        
         pain_points = []
         text_lower = text.lower()
         
-        for indicator in pain_indicators:
+        for indicator in CopyAnalyzer.PAIN_INDICATORS:
             if indicator in text_lower:
                 # Extract sentence containing the pain point
                 sentences = text.split('.')
@@ -124,15 +368,10 @@ class AdvancedPromptGenerator:
     
     def _extract_benefits(self, text: str) -> List[str]:
         """Extract benefits from ad copy"""
-        benefit_indicators = [
-            "achieve", "get", "receive", "gain", "improve", "increase",
-            "boost", "enhance", "optimize", "maximize", "save", "reduce"
-        ]
-        
         benefits = []
         text_lower = text.lower()
         
-        for indicator in benefit_indicators:
+        for indicator in CopyAnalyzer.BENEFIT_INDICATORS:
             pattern = rf"{indicator}\s+[\w\s]+(?:[.!?]|$)"
             matches = re.findall(pattern, text_lower)
             benefits.extend(matches)
@@ -141,16 +380,8 @@ class AdvancedPromptGenerator:
     
     def _classify_offering(self, text: str) -> str:
         """Classify the type of offering"""
-        offering_types = {
-            "software": ["software", "app", "platform", "tool", "system"],
-            "service": ["service", "consulting", "coaching", "done-for-you"],
-            "course": ["course", "training", "education", "masterclass"],
-            "product": ["product", "device", "equipment", "supplement"],
-            "membership": ["membership", "community", "access", "subscription"]
-        }
-        
         text_lower = text.lower()
-        for offering_type, keywords in offering_types.items():
+        for offering_type, keywords in CopyAnalyzer.OFFERING_KEYWORDS.items():
             if any(keyword in text_lower for keyword in keywords):
                 return offering_type
         
@@ -158,18 +389,10 @@ class AdvancedPromptGenerator:
     
     def _analyze_emotional_tone(self, text: str) -> str:
         """Analyze emotional tone of the ad copy"""
-        emotional_indicators = {
-            "urgent": ["now", "today", "limited time", "hurry", "urgent", "immediate"],
-            "aspirational": ["dream", "achieve", "success", "transform", "breakthrough"],
-            "fear": ["miss out", "behind", "struggle", "failure", "lose"],
-            "excitement": ["amazing", "incredible", "revolutionary", "game-changing"],
-            "trust": ["proven", "guaranteed", "trusted", "verified", "secure"]
-        }
-        
         text_lower = text.lower()
         tone_scores = {}
         
-        for tone, keywords in emotional_indicators.items():
+        for tone, keywords in CopyAnalyzer.EMOTIONAL_INDICATORS.items():
             score = sum(1 for keyword in keywords if keyword in text_lower)
             tone_scores[tone] = score
         
@@ -177,13 +400,7 @@ class AdvancedPromptGenerator:
     
     def _extract_cta(self, text: str) -> str:
         """Extract call-to-action from ad copy"""
-        cta_patterns = [
-            r"click\s+\w+", r"get\s+\w+\s+now", r"start\s+\w+",
-            r"join\s+\w+", r"sign\s+up", r"download\s+\w+",
-            r"book\s+\w+", r"schedule\s+\w+", r"contact\s+\w+"
-        ]
-        
-        for pattern in cta_patterns:
+        for _, pattern in CopyAnalyzer.CTA_PATTERNS:
             match = re.search(pattern, text.lower())
             if match:
                 return match.group()
@@ -218,7 +435,8 @@ class AdvancedPromptGenerator:
     def select_visual_style(self, 
                           analysis: Dict[str, Any], 
                           purpose: ImagePurpose,
-                          preferred_style: str = None) -> str:
+                          preferred_style: str = None,
+                          rng: random.Random = None) -> str:
         """
         Select appropriate visual style based on analysis and purpose
         
@@ -226,6 +444,7 @@ class AdvancedPromptGenerator:
             analysis: Analyzed advertising copy
             purpose: Determined image purpose
             preferred_style: Override style selection
+            rng: Random generator for the choice (default: the generator's RNG, or unseeded)
             
         Returns:
             Selected visual style name
@@ -254,12 +473,13 @@ class AdvancedPromptGenerator:
         
         # Default to purpose-based selection
         possible_styles = style_mapping.get(purpose, ["high_contrast"])
-        return random.choice(possible_styles)
+        return (rng or self.rng or random).choice(possible_styles)
     
     def select_color_palette(self, 
                            analysis: Dict[str, Any], 
                            style: str,
-                           preferred_palette: str = None) -> Dict[str, Any]:
+                           preferred_palette: str = None,
+                           rng: random.Random = None) -> Dict[str, Any]:
         """
         Select appropriate color palette
         
@@ -267,6 +487,7 @@ class AdvancedPromptGenerator:
             analysis: Analyzed advertising copy
             style: Selected visual style
             preferred_palette: Override palette selection
+            rng: Random generator for the choice (default: the generator's RNG, or unseeded)
             
         Returns:
             Selected color palette configuration
@@ -295,7 +516,7 @@ class AdvancedPromptGenerator:
         
         # Audience-based selection
         possible_palettes = palette_mapping.get(audience, ["red_white", "black_yellow"])
-        palette_name = random.choice(possible_palettes)
+        palette_name = (rng or self.rng or random).choice(possible_palettes)
         return ColorPalettes.get_palette(palette_name)
     
     def select_typography(self, 
@@ -337,13 +558,15 @@ class AdvancedPromptGenerator:
     
     def generate_text_content(self, 
                             analysis: Dict[str, Any],
-                            purpose: ImagePurpose) -> Dict[str, str]:
+                            purpose: ImagePurpose,
+                            rng: random.Random = None) -> Dict[str, str]:
         """
         Generate text content for the image based on analysis and purpose
         
         Args:
             analysis: Analyzed advertising copy
             purpose: Image purpose
+            rng: Random generator for the trust element (default: the generator's RNG, or unseeded)
             
         Returns:
             Dictionary with different text elements
@@ -354,7 +577,7 @@ class AdvancedPromptGenerator:
             "title": self._generate_title(analysis, purpose),
             "sub_headline": self._generate_sub_headline(analysis, purpose),
             "cta": analysis.get("call_to_action", "Get Started"),
-            "trust_element": self._generate_trust_element(analysis)
+            "trust_element": self._generate_trust_element(analysis, rng)
         }
         
         return text_content
@@ -392,7 +615,7 @@ class AdvancedPromptGenerator:
         else:
             return "Proven system for guaranteed results"
     
-    def _generate_trust_element(self, analysis: Dict[str, Any]) -> str:
+    def _generate_trust_element(self, analysis: Dict[str, Any], rng: random.Random = None) -> str:
         """Generate trust/social proof element"""
         trust_elements = [
             "30-Day Money Back Guarantee",
@@ -401,15 +624,16 @@ class AdvancedPromptGenerator:
             "Verified Results",
             "Risk-Free Trial"
         ]
-        return random.choice(trust_elements)
+        return (rng or self.rng or random).choice(trust_elements)
     
-    def ensure_asian_appearance(self, prompt: str, style: str) -> str:
+    def ensure_asian_appearance(self, prompt: str, style: str, rng: random.Random = None) -> str:
         """
         Ensure human subjects have Asian appearance as specified
         
         Args:
             prompt: Current prompt text
             style: Visual style being used
+            rng: Random generator for the demographics (default: the generator's RNG, or unseeded)
             
         Returns:
             Modified prompt with Asian appearance specification
@@ -418,8 +642,9 @@ class AdvancedPromptGenerator:
         human_indicators = ["person", "woman", "man", "girl", "boy", "child", "face", "portrait"]
         
         if any(indicator in prompt.lower() for indicator in human_indicators):
-            asian_demo = random.choice(self.asian_demographics)
-            age_gender = random.choice(["young woman", "young man", "child", "adult"])
+            rng = rng or self.rng or random
+            asian_demo = rng.choice(self.asian_demographics)
+            age_gender = rng.choice(["young woman", "young man", "child", "adult"])
             
             # Insert Asian appearance specification
             asian_spec = f"{asian_demo} {age_gender}"
@@ -437,7 +662,8 @@ class AdvancedPromptGenerator:
                                     preferred_style: str = None,
                                     preferred_palette: str = None,
                                     include_text: bool = True,
-                                    custom_elements: Dict[str, Any] = None) -> str:
+                                    custom_elements: Dict[str, Any] = None,
+                                    analysis: Dict[str, Any] = None) -> str:
         """
         Generate comprehensive image prompt from advertising copy
         
@@ -447,29 +673,80 @@ class AdvancedPromptGenerator:
             preferred_palette: Override color palette
             include_text: Whether to include text elements in image
             custom_elements: Custom elements to include
+            analysis: Result of analyze_advertising_copy(ad_copy), if already known
             
         Returns:
-            Complete image generation prompt
+            Complete image generation prompt (identical for identical inputs
+            unless the generator was given an explicit RNG)
         """
+        # Prompts are deterministic per input, so repeated copies are served from memory
+        key = None
+        if self.rng is None:
+            key = (ad_copy, preferred_style, preferred_palette, include_text,
+                   json.dumps(custom_elements, sort_keys=True, default=str) if custom_elements else None)
+            if key in self.prompt_cache:
+                self.prompt_cache.move_to_end(key)
+                return self.prompt_cache[key]
+        
+        rng = self.rng_for(ad_copy)
+        
         # Step 1: Analyze advertising copy
-        analysis = self.analyze_advertising_copy(ad_copy)
+        if analysis is None:
+            analysis = self.analyze_advertising_copy(ad_copy)
         
         # Step 2: Determine image purpose
         purpose = self.determine_image_purpose(analysis)
         
         # Step 3: Select visual style
-        style = self.select_visual_style(analysis, purpose, preferred_style)
+        style = self.select_visual_style(analysis, purpose, preferred_style, rng)
         
         # Step 4: Select color palette
-        color_palette = self.select_color_palette(analysis, style, preferred_palette)
+        color_palette = self.select_color_palette(analysis, style, preferred_palette, rng)
         
         # Step 5: Select typography
         typography = self.select_typography(analysis, style)
         
-        # Step 6: Generate text content
-        text_content = self.generate_text_content(analysis, purpose) if include_text else {}
+        # Steps 6-7: Generate text content and build the prompt
+        full_prompt = self.assemble_prompt(
+            analysis, purpose, style, color_palette, typography, include_text, custom_elements, rng
+        )
         
-        # Step 7: Build comprehensive prompt
+        if key is not None:
+            self.prompt_cache[key] = full_prompt
+            if len(self.prompt_cache) > self.PROMPT_CACHE_SIZE:
+                self.prompt_cache.popitem(last=False)
+        
+        return full_prompt
+    
+    def assemble_prompt(self,
+                        analysis: Dict[str, Any],
+                        purpose: ImagePurpose,
+                        style: str,
+                        color_palette: Dict[str, Any],
+                        typography: Dict[str, Any],
+                        include_text: bool = True,
+                        custom_elements: Dict[str, Any] = None,
+                        rng: random.Random = None) -> str:
+        """
+        Build the prompt text for an explicit purpose, style, palette and typography
+        
+        Args:
+            analysis: Analyzed advertising copy
+            purpose: Image purpose
+            style: Visual style name
+            color_palette: Color palette configuration
+            typography: Typography configuration
+            include_text: Whether to include text elements in image
+            custom_elements: Custom elements to include
+            rng: Random generator for the remaining choices (default: the generator's RNG, or unseeded)
+            
+        Returns:
+            Complete image generation prompt
+        """
+        # Generate text content
+        text_content = self.generate_text_content(analysis, purpose, rng) if include_text else {}
+        
+        # Build comprehensive prompt
         prompt_parts = []
         
         # Add offering description
@@ -531,18 +808,167 @@ class AdvancedPromptGenerator:
         full_prompt = "\n\n".join(prompt_parts)
         
         # Ensure Asian appearance for human subjects
-        full_prompt = self.ensure_asian_appearance(full_prompt, style)
+        full_prompt = self.ensure_asian_appearance(full_prompt, style, rng)
         
         # Add custom elements if provided
         if custom_elements:
             custom_section = "\n\n**Custom Elements:**\n"
-            for key, value in custom_elements.items():
-                custom_section += f"- {key}: {value}\n"
+            for name, value in custom_elements.items():
+                custom_section += f"- {name}: {value}\n"
             full_prompt += custom_section
         
         return full_prompt
 
+class PromptVariantEngine:
+    """
+    Fans one advertising copy out over style × palette × typography × purpose
+    
+    Combinations are enumerated lazily, so a limit or an early break only
+    builds the prompts that are used. Each prompt is checked against the
+    normalized hashes of the prompts already produced (case, whitespace and
+    punctuation ignored), and a near-identical one is skipped before it can
+    cost an API call.
+    """
+    
+    def __init__(self,
+                 generator: AdvancedPromptGenerator = None,
+                 styles: List[str] = None,
+                 palettes: List[str] = None,
+                 typographies: List[str] = None,
+                 purposes: List[ImagePurpose] = None):
+        """
+        Initialize the variant engine
+        
+        Args:
+            generator: Prompt generator to analyze and assemble with
+            styles: Visual style names (default: all of VisualStyleSelector)
+            palettes: Color palette names (default: all of ColorPalettes)
+            typographies: Typography names (default: all of TypographyStyles)
+            purposes: Image purposes (default: all of ImagePurpose)
+        """
+        self.generator = generator or AdvancedPromptGenerator()
+        self.axes = [
+            list(styles or VisualStyleSelector.get_style_names()),
+            list(palettes or ColorPalettes.list_palettes()),
+            list(typographies or TypographyStyles.STYLES),
+            list(purposes or ImagePurpose)
+        ]
+        self.stats = {'candidates': 0, 'duplicates': 0}
+    
+    @property
+    def space_size(self) -> int:
+        """Number of combinations in the space"""
+        size = 1
+        for axis in self.axes:
+            size *= len(axis)
+        return size
+    
+    @staticmethod
+    def prompt_key(prompt: str) -> str:
+        """Hash of a prompt with case, whitespace and punctuation normalized away"""
+        normalized = " ".join(re.findall(r"\w+", prompt.lower()))
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    
+    def combinations(self, sample: bool = False, seed: int = None) -> Iterator[tuple]:
+        """
+        Yield (style, palette, typography, purpose) combinations
+        
+        Args:
+            sample: Visit the space in a seeded random order, so that a limit
+                spreads over every axis instead of stopping in the first style
+            seed: Seed for the sampling order
+            
+        Returns:
+            Iterator of combinations
+        """
+        if not sample:
+            yield from product(*self.axes)
+            return
+        
+        # Lazy Fisher-Yates shuffle of the indices: only positions already swapped
+        # are stored, so memory grows with the number of combinations drawn
+        rng = random.Random(seed)
+        swapped = {}
+        for position in range(self.space_size):
+            target = rng.randrange(position, self.space_size)
+            index = swapped.get(target, target)
+            swapped[target] = swapped.get(position, position)
+            swapped.pop(position, None)
+            
+            combination = []
+            for axis in reversed(self.axes):
+                index, offset = divmod(index, len(axis))
+                combination.append(axis[offset])
+            yield tuple(reversed(combination))
+    
+    def variants(self,
+                 ad_copy: str,
+                 limit: int = None,
+                 sample: bool = False,
+                 seed: int = None,
+                 include_text: bool = True,
+                 seen: set = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield distinct prompt variants of one advertising copy
+        
+        Args:
+            ad_copy: Advertising copy text
+            limit: Stop after this many distinct variants
+            sample: Visit combinations in a seeded random order (see combinations())
+            seed: Seed for the sampling order
+            include_text: Whether to include text elements in the images
+            seen: Prompt keys to treat as duplicates; shared across calls to
+                deduplicate several copies together
+            
+        Returns:
+            Iterator of dictionaries with the prompt, its key and its combination,
+            ready for the batch command
+        """
+        seen = set() if seen is None else seen
+        analysis = self.generator.analyze_advertising_copy(ad_copy)
+        produced = 0
+        
+        for style, palette, typography, purpose in self.combinations(sample, seed):
+            if limit is not None and produced >= limit:
+                return
+            
+            # Same seed per copy for every variant, so variants differ only in the combination
+            prompt = self.generator.assemble_prompt(
+                analysis,
+                purpose,
+                style,
+                ColorPalettes.get_palette(palette),
+                TypographyStyles.STYLES[typography],
+                include_text=include_text,
+                rng=self.generator.rng_for(ad_copy)
+            )
+            self.stats['candidates'] += 1
+            
+            key = self.prompt_key(prompt)
+            if key in seen:
+                self.stats['duplicates'] += 1
+                continue
+            seen.add(key)
+            
+            produced += 1
+            yield {
+                'prompt': prompt,
+                'key': key,
+                'style': style,
+                'palette': palette,
+                'typography': typography,
+                'purpose': purpose.value
+            }
+
 # Convenience functions
+_shared_generators = {}
+
+def get_generator(seed: int = None) -> AdvancedPromptGenerator:
+    """Get the generator shared by the convenience functions (one per process and seed)"""
+    if seed not in _shared_generators:
+        _shared_generators[seed] = AdvancedPromptGenerator(seed=seed)
+    return _shared_generators[seed]
+
 def quick_prompt_from_copy(ad_copy: str, style: str = None) -> str:
     """
     Quick prompt generation from advertising copy
@@ -554,8 +980,7 @@ def quick_prompt_from_copy(ad_copy: str, style: str = None) -> str:
     Returns:
         Generated prompt string
     """
-    generator = AdvancedPromptGenerator()
-    return generator.generate_comprehensive_prompt(ad_copy, preferred_style=style)
+    return get_generator().generate_comprehensive_prompt(ad_copy, preferred_style=style)
 
 def analyze_copy_only(ad_copy: str) -> Dict[str, Any]:
     """
@@ -567,5 +992,132 @@ def analyze_copy_only(ad_copy: str) -> Dict[str, Any]:
     Returns:
         Analysis results dictionary
     """
-    generator = AdvancedPromptGenerator()
-    return generator.analyze_advertising_copy(ad_copy)
\ No newline at end of file
+    return get_generator().analyze_advertising_copy(ad_copy)
+
+COPY_FIELDS = ("ad_copy", "copy")
+
+def _with_copy_field(record: Dict[str, Any], field: Optional[str]) -> Dict[str, Any]:
+    """Move the copy from the given (or first known) field to the "ad_copy" key"""
+    field = field or next((f for f in COPY_FIELDS if f in record), COPY_FIELDS[0])
+    ad_copy = record.pop(field, None)
+    return {**record, "ad_copy": ad_copy}
+
+def read_copies(path: Union[str, Path], field: str = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream advertising copy records from a CSV, JSONL or text file
+    
+    CSV rows and JSONL objects are yielded as they are, with the copy
+    moved to the "ad_copy" key; a JSONL line may also be a bare string.
+    Any other file is read as one copy per line. Blank entries are skipped.
+    
+    Args:
+        path: Input file
+        field: Column or key holding the copy (default: "ad_copy" or "copy")
+        
+    Returns:
+        Iterator of records, each with an "ad_copy" string
+        
+    Raises:
+        ValueError: If a CSV file has no copy column (checked before any record is read)
+    """
+    path = Path(path)
+    
+    if path.suffix.lower() == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            columns = next(csv.reader(f), [])
+        wanted = [field] if field else COPY_FIELDS
+        if not any(c in columns for c in wanted):
+            raise ValueError(
+                f"No {f'{field!r} column' if field else 'ad_copy or copy column'} in {path}; "
+                f"columns are: {', '.join(columns) or '(none)'}. Choose the copy column with --field"
+            )
+    
+    return _stream_copies(path, field)
+
+def _stream_copies(path: Path, field: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """Records of read_copies(), read lazily"""
+    suffix = path.suffix.lower()
+    
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            records = (_with_copy_field(row, field) for row in csv.DictReader(f))
+        elif suffix in (".jsonl", ".ndjson"):
+            records = (json.loads(line) for line in f if line.strip())
+            records = (_with_copy_field(r, field) if isinstance(r, dict) else {"ad_copy": r} for r in records)
+        else:
+            records = ({"ad_copy": line.strip()} for line in f)
+        
+        for record in records:
+            if isinstance(record["ad_copy"], str) and record["ad_copy"].strip():
+                yield record
+
+def _analyze_records(records: List[Dict[str, Any]],
+                     include_prompt: bool,
+                     style: Optional[str],
+                     palette: Optional[str],
+                     seed: Optional[int]) -> List[Dict[str, Any]]:
+    """Analyze one chunk of records with this process's shared generator"""
+    generator = get_generator(seed)
+    results = []
+    
+    for record in records:
+        analysis = generator.analyze_advertising_copy(record["ad_copy"])
+        result = {**record, "analysis": analysis}
+        if include_prompt:
+            result["prompt"] = generator.generate_comprehensive_prompt(
+                record["ad_copy"],
+                preferred_style=style,
+                preferred_palette=palette,
+                analysis=analysis
+            )
+        results.append(result)
+    
+    return results
+
+def analyze_copies(records: Iterable[Union[str, Dict[str, Any]]],
+                   include_prompt: bool = True,
+                   style: str = None,
+                   palette: str = None,
+                   seed: int = None,
+                   workers: int = 1,
+                   chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze a stream of advertising copies, yielding results in input order
+    
+    Records are consumed lazily and results are yielded as soon as their
+    chunk is done, so memory use does not grow with the input. With several
+    workers, chunks are analyzed on a process pool, at most two per worker
+    at a time.
+    
+    Args:
+        records: Copy strings, or dicts with an "ad_copy" key (see read_copies())
+        include_prompt: Also generate the comprehensive prompt for each copy
+        style: Preferred visual style for the prompts
+        palette: Preferred color palette for the prompts
+        seed: Prompt seed (see AdvancedPromptGenerator); results do not depend on workers
+        workers: Number of worker processes (1 analyzes in this process,
+            None uses the CPU count)
+        chunk_size: Records sent to a worker at a time
+        
+    Returns:
+        Iterator of the input records with "analysis" (and "prompt") added
+    """
+    records = ({"ad_copy": r} if isinstance(r, str) else r for r in records)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    
+    if workers == 1:
+        for chunk in chunks:
+            yield from _analyze_records(chunk, include_prompt, style, palette, seed)
+        return
+    
+    window = 2 * (workers or os.cpu_count() or 1)
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_analyze_records, chunk, include_prompt, style, palette, seed))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,152 @@
+"""
+Client-side rate limiting shared by every worker talking to the same Flux endpoint
+"""
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+from config import FluxConfig
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+    
+    Callers reserve a token and are told how long to wait for it, so the
+    same bucket serves blocking threads (acquire) and asyncio tasks
+    (reserve + asyncio.sleep). A Retry-After from the server pauses every
+    caller of the bucket, not just the one that received it.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize token bucket
+        
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens (requests allowed back to back)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        
+        self.total_requests = 0
+        self.throttled_requests = 0
+        self.throttled_time = 0.0
+        
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token
+        
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            
+            delay = max(0.0, -self.tokens / self.rate, self.paused_until - now)
+            
+            self.total_requests += 1
+            if delay > 0:
+                self.throttled_requests += 1
+                self.throttled_time += delay
+            
+            return delay
+
+    def acquire(self) -> float:
+        """
+        Take a token, sleeping until it is available
+        
+        Returns:
+            Seconds spent waiting
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def pause(self, seconds: float):
+        """Hold back every caller for the given number of seconds"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Throttling statistics"""
+        with self._lock:
+            return {
+                'total_requests': self.total_requests,
+                'throttled_requests': self.throttled_requests,
+                'throttled_time': round(self.throttled_time, 3)
+            }
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(endpoint: str, base_url: str) -> TokenBucket:
+    """
+    Get the process-wide rate limiter for an endpoint
+    
+    Args:
+        endpoint: Endpoint name, used to look up FluxConfig.RATE_LIMITS
+        base_url: Base URL requests are sent to
+    
+    Returns:
+        Token bucket shared by all clients using this endpoint
+    """
+    with _limiters_lock:
+        if base_url not in _limiters:
+            limits = FluxConfig.RATE_LIMITS.get(endpoint, FluxConfig.DEFAULT_RATE_LIMIT)
+            _limiters[base_url] = TokenBucket(limits['rate'], limits['burst'])
+            logger.debug(f"Rate limiter for {base_url}: {limits['rate']}/s, burst {limits['burst']}")
+        return _limiters[base_url]
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with jitter, so workers do not retry in lockstep
+    
+    Args:
+        attempt: Zero-based retry attempt
+    
+    Returns:
+        Seconds to wait
+    """
+    ceiling = min(FluxConfig.BACKOFF_MAX, FluxConfig.BACKOFF_BASE * 2 ** attempt)
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header
+    
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+    
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
@@ -5,10 +5,15 @@ import os
 import re
 import json
 import shutil
+import hashlib
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Union, Any
 import logging
+import html
+from concurrent.futures import ProcessPoolExecutor
+import html.entities
+from html.parser import HTMLParser as StreamingHTMLParser
 
 from bs4 import BeautifulSoup
 from PIL import Image
@@ -135,6 +140,294 @@ class FileManager:
         
         return destination
 
+class _LandingPageExtractor(StreamingHTMLParser):
+    """
+    Single-pass extractor behind HTMLParser.extract_text_from_html()
+    
+    Mirrors the BeautifulSoup extraction: every element a selector would
+    match collects the text of its descendants while the document streams
+    past, and results are ordered by selector, then document position,
+    as the separate soup traversals returned them.
+    """
+    
+    # Elements html.parser's tree builder never leaves open
+    VOID_ELEMENTS = frozenset({
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+        'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+        'image', 'isindex', 'nextid', 'spacer'
+    })
+    
+    # Strings inside these are not page text to BeautifulSoup's get_text()
+    NON_TEXT_ELEMENTS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+    
+    # Elements inside which whitespace-only strings are kept as they are
+    PRESERVE_WHITESPACE_ELEMENTS = frozenset({'pre', 'textarea'})
+    ASCII_SPACES = ' \n\t\x0c\r'
+    
+    CTA_KEYWORDS = ('get', 'start', 'sign', 'join', 'buy', 'order', 'download', 'contact')
+    
+    PRICE_PATTERNS = [
+        re.compile(pattern, re.IGNORECASE) for pattern in (
+            r'\$\d+(?:\.\d{2})?',  # $99.99
+            r'\d+\s*(?:dollar|usd|€|£)',  # 99 dollars
+            r'free',  # Free
+            r'\d+%\s*off'  # 50% off
+        )
+    ]
+    
+    def __init__(self):
+        # References are resolved by the handlers below, the way BeautifulSoup resolves them
+        super().__init__(convert_charrefs=False)
+        
+        self.order = 0
+        self.stack = []  # Open elements: (tag, order, buckets, text parts)
+        self.collecting = []  # Text parts of open elements that match a selector
+        self.buckets = {}  # Bucket name -> [(order, text)]
+        self.document_text = []
+        self.pending_text = []  # Text since the last tag, handled as one string
+        self.non_text_depth = 0
+        self.preserve_whitespace_depth = 0
+        self.list_depth = {'ul': 0, 'ol': 0}
+        self.meta_description = None
+    
+    def _buckets_for(self, tag: str, attrs: Dict[str, str]) -> List[str]:
+        """Names of the selector buckets an element falls into"""
+        buckets = []
+        class_attr = attrs.get('class')
+        classes = class_attr.split() if class_attr is not None else []
+        
+        if tag == 'title' or tag == 'p':
+            buckets.append(tag)
+        elif len(tag) == 2 and tag[0] == 'h' and tag[1] in '123456':
+            buckets.append(tag)
+        
+        # CTA selectors: button, a[href], .btn, .button, .cta (deduplicated afterwards)
+        if tag == 'button' or (tag == 'a' and 'href' in attrs) or any(c in ('btn', 'button', 'cta') for c in classes):
+            buckets.append('cta')
+        
+        if class_attr:
+            # Testimonial selectors in order: .testimonial, .review, .quote, [class*=testimonial], [class*=review]
+            for index, name in enumerate(('testimonial', 'review', 'quote')):
+                if name in classes:
+                    buckets.append(f'testimonial{index}')
+            if 'testimonial' in class_attr:
+                buckets.append('testimonial3')
+            if 'review' in class_attr:
+                buckets.append('testimonial4')
+            
+            # Feature selectors in order: .feature, .benefit, .advantage, [class*=feature], [class*=benefit]
+            for index, name in enumerate(('feature', 'benefit', 'advantage')):
+                if name in classes:
+                    buckets.append(f'feature{index}')
+            if 'feature' in class_attr:
+                buckets.append('feature3')
+            if 'benefit' in class_attr:
+                buckets.append('feature4')
+        
+        # ... then 'ul li' and 'ol li'
+        if tag == 'li':
+            if self.list_depth['ul']:
+                buckets.append('feature5')
+            if self.list_depth['ol']:
+                buckets.append('feature6')
+        
+        return buckets
+    
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        attrs = {name: value or '' for name, value in attrs}
+        
+        if tag == 'meta' and self.meta_description is None and attrs.get('name') == 'description':
+            self.meta_description = attrs.get('content', '').strip()
+        
+        if tag in self.VOID_ELEMENTS:
+            return
+        
+        buckets = self._buckets_for(tag, attrs)
+        parts = [] if buckets else None
+        if parts is not None:
+            self.collecting.append(parts)
+        
+        self.stack.append((tag, self.order, buckets, parts))
+        self.order += 1
+        
+        if tag in self.NON_TEXT_ELEMENTS:
+            self.non_text_depth += 1
+        if tag in self.PRESERVE_WHITESPACE_ELEMENTS:
+            self.preserve_whitespace_depth += 1
+        if tag in self.list_depth:
+            self.list_depth[tag] += 1
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID_ELEMENTS:
+            self.handle_endtag(tag)
+    
+    def handle_endtag(self, tag):
+        self._flush_text()
+        
+        # Close the most recent open element of this name; stray end tags are ignored
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                while len(self.stack) > index:
+                    self._close_element()
+                return
+    
+    def _close_element(self):
+        tag, order, buckets, parts = self.stack.pop()
+        
+        if parts is not None:
+            self.collecting.pop()  # Elements close innermost first
+            text = ''.join(parts).strip()
+            for bucket in buckets:
+                self.buckets.setdefault(bucket, []).append((order, text))
+        
+        if tag in self.NON_TEXT_ELEMENTS:
+            self.non_text_depth -= 1
+        if tag in self.PRESERVE_WHITESPACE_ELEMENTS:
+            self.preserve_whitespace_depth -= 1
+        if tag in self.list_depth:
+            self.list_depth[tag] -= 1
+    
+    def handle_data(self, data):
+        self.pending_text.append(data)
+    
+    def handle_charref(self, name):
+        self.pending_text.append(html.unescape(f'&#{name};'))
+    
+    def handle_entityref(self, name):
+        # Unknown names are kept as literal text, without the semicolon
+        self.pending_text.append(html.entities.html5.get(f'{name};', f'&{name}'))
+    
+    def _flush_text(self):
+        """Add the text since the last tag to every element collecting it"""
+        if not self.pending_text:
+            return
+        
+        data = ''.join(self.pending_text)
+        self.pending_text = []
+        
+        if self.non_text_depth:
+            return
+        
+        # Like BeautifulSoup, collapse whitespace-only strings to a newline or a space
+        if not self.preserve_whitespace_depth and not data.strip(self.ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        
+        self.document_text.append(data)
+        for parts in self.collecting:
+            parts.append(data)
+    
+    def handle_comment(self, data):
+        self._flush_text()
+    
+    def handle_decl(self, decl):
+        self._flush_text()
+    
+    def handle_pi(self, data):
+        self._flush_text()
+    
+    def unknown_decl(self, data):
+        self._flush_text()
+        
+        # CDATA sections count as text
+        if data.startswith('CDATA['):
+            self.handle_data(data[6:])
+            self._flush_text()
+    
+    def _texts(self, *buckets: str) -> List[str]:
+        """Texts of the given buckets, each in document order, concatenated"""
+        texts = []
+        for bucket in buckets:
+            texts.extend(text for _, text in sorted(self.buckets.get(bucket, [])))
+        return texts
+    
+    def result(self) -> Dict[str, Any]:
+        """Close the document and return the extracted content"""
+        self.close()
+        self._flush_text()
+        while self.stack:
+            self._close_element()
+        
+        titles = self._texts('title') or self._texts('h1')[:1]
+        text_content = ''.join(self.document_text)
+        
+        pricing = []
+        for pattern in self.PRICE_PATTERNS:
+            pricing.extend(pattern.findall(text_content))
+        
+        return {
+            "title": titles[0] if titles else "",
+            "headings": [t for t in self._texts('h1', 'h2', 'h3', 'h4', 'h5', 'h6') if t],
+            "paragraphs": [t for t in self._texts('p') if len(t) > 20],
+            "cta_buttons": list(set(
+                t for t in self._texts('cta') if t and any(keyword in t.lower() for keyword in self.CTA_KEYWORDS)
+            )),
+            "testimonials": [t for t in self._texts(*(f'testimonial{i}' for i in range(5))) if len(t) > 30],
+            "features": [t for t in self._texts(*(f'feature{i}' for i in range(7))) if 10 < len(t) < 200],
+            "pricing": list(set(pricing)),
+            "meta_description": self.meta_description or ""
+        }
+
+class ExtractionCache:
+    """
+    Persistent store of HTMLParser.extract_text_from_html() results
+    
+    Entries are keyed by the SHA-256 of the page bytes and the extractor
+    version, so a page is only parsed again when its content (or the
+    extractor) changes. Each entry is a ``<key>.json`` file.
+    """
+    
+    # Bump when the extractor's output changes so old entries are not reused
+    VERSION = 1
+    
+    def __init__(self, directory: Path = None):
+        """
+        Initialize extraction cache
+        
+        Args:
+            directory: Cache directory (defaults to config)
+        """
+        self.directory = Path(directory or ProjectPaths.EXTRACTION_CACHE_DIR)
+        self.directory.mkdir(exist_ok=True, parents=True)
+        
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def key_for(cls, html_file: Union[str, Path]) -> str:
+        """Cache key of a page's current content"""
+        return cls.key_for_bytes(Path(html_file).read_bytes())
+    
+    @classmethod
+    def key_for_bytes(cls, data: bytes) -> str:
+        """Cache key of page content that has already been read"""
+        return f"{hashlib.sha256(data).hexdigest()}-v{cls.VERSION}"
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached extraction for a key, or None"""
+        try:
+            with open(self.directory / f"{key}.json", 'r', encoding='utf-8') as f:
+                extracted = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return extracted
+    
+    def put(self, key: str, extracted: Dict[str, Any]):
+        """Store an extraction atomically"""
+        entry_path = self.directory / f"{key}.json"
+        temp_path = entry_path.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(extracted, f, ensure_ascii=False)
+        os.replace(temp_path, entry_path)
+    
+    def stats(self) -> Dict[str, int]:
+        """Cache hit/miss statistics"""
+        return {'hits': self.hits, 'misses': self.misses}
+
 class HTMLParser:
     """HTML parsing utilities for landing page content extraction"""
     
@@ -143,21 +436,133 @@ class HTMLParser:
         """
         Extract relevant text content from HTML landing page
         
+        Streams the page through a single html.parser pass; the result is
+        the same as extract_text_from_html_soup() gives.
+        
         Args:
             html_file: Path to HTML file
             
         Returns:
             Dictionary with extracted content
         """
-        html_file = Path(html_file)
+        return HTMLParser._extract_text(HTMLParser._read_html(html_file))
+    
+    @staticmethod
+    def _extract_text(html_text: str) -> Dict[str, Any]:
+        """Run the single-pass extractor over page markup"""
+        extractor = _LandingPageExtractor()
+        extractor.feed(html_text)
+        return extractor.result()
+    
+    @staticmethod
+    def _extract_bytes(data: bytes) -> Dict[str, Any]:
+        """Decode page bytes that have already been read and extract their content"""
+        return HTMLParser._extract_text(HTMLParser._decode_html(data))
         
-        if not html_file.exists():
-            raise FileNotFoundError(f"HTML file not found: {html_file}")
+    @staticmethod
+    def extract_cached(html_file: Union[str, Path], cache: Optional[ExtractionCache] = None) -> Dict[str, Any]:
+        """
+        Extract content from a page, reusing the stored result if the page is unchanged
+        
+        Args:
+            html_file: Path to HTML file
+            cache: Extraction cache (defaults to the project cache)
+            
+        Returns:
+            Dictionary with extracted content
+        """
+        # Read once: the same bytes are hashed for the key and, on a miss, parsed
+        data = HTMLParser._read_html_bytes(html_file)
+        cache = cache or ExtractionCache()
+        key = cache.key_for_bytes(data)
+        
+        extracted = cache.get(key)
+        if extracted is None:
+            extracted = HTMLParser._extract_bytes(data)
+            cache.put(key, extracted)
+        
+        return extracted
+    
+    @staticmethod
+    def extract_many(html_files: List[Union[str, Path]],
+                     max_workers: Optional[int] = None,
+                     cache: Optional[ExtractionCache] = None) -> List[Dict[str, Any]]:
+        """
+        Extract content from many pages, parsing the uncached ones on a process pool
+        
+        Args:
+            html_files: Paths to HTML files
+            max_workers: Number of worker processes (defaults to the CPU count)
+            cache: Extraction cache (defaults to the project cache)
+            
+        Returns:
+            One result per file, in input order: 'file', 'content' and 'cached',
+            or 'file' and 'error' if the page could not be read
+        """
+        cache = cache or ExtractionCache()
+        results = []
+        to_parse = {}
+        
+        # Each page is read once: the bytes hashed for the key are the ones handed to the parser
+        for html_file in html_files:
+            result = {'file': str(html_file)}
+            try:
+                data = HTMLParser._read_html_bytes(html_file)
+            except OSError as e:
+                result['error'] = str(e)
+                results.append(result)
+                continue
+            
+            key = cache.key_for_bytes(data)
+            extracted = cache.get(key)
+            if extracted is None:
+                to_parse[len(results)] = (data, key)
+            else:
+                result.update(content=extracted, cached=True)
+            results.append(result)
+        
+        if to_parse:
+            logger.info(f"Parsing {len(to_parse)} of {len(results)} pages ({len(results) - len(to_parse)} cached)")
+        
+        def record(index: int, extracted: Dict[str, Any]):
+            cache.put(to_parse[index][1], extracted)
+            results[index].update(content=extracted, cached=False)
+        
+        if len(to_parse) > 1 and max_workers != 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    index: executor.submit(HTMLParser._extract_bytes, data)
+                    for index, (data, _) in to_parse.items()
+                }
+                for index, future in futures.items():
+                    try:
+                        record(index, future.result())
+                    except Exception as e:
+                        results[index]['error'] = str(e)
+        else:
+            for index, (data, _) in to_parse.items():
+                try:
+                    record(index, HTMLParser._extract_bytes(data))
+                except Exception as e:
+                    results[index]['error'] = str(e)
         
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        return results
+    
+    @staticmethod
+    def extract_text_from_html_soup(html_file: Union[str, Path]) -> Dict[str, Any]:
+        """
+        Extract content by building a BeautifulSoup tree and querying it per category
         
-        soup = BeautifulSoup(content, 'html.parser')
+        Reference implementation for extract_text_from_html(), kept for
+        benchmarking and cross-checking.
+        
+        Args:
+            html_file: Path to HTML file
+        
+        Returns:
+            Dictionary with extracted content
+        """
+        soup = BeautifulSoup(HTMLParser._read_html(html_file), 'html.parser')
         
         # Extract different content types
         extracted = {
@@ -173,6 +578,26 @@ class HTMLParser:
         
         return extracted
     
+    @staticmethod
+    def _read_html(html_file: Union[str, Path]) -> str:
+        """Read an HTML file, failing clearly if it is missing"""
+        return HTMLParser._decode_html(HTMLParser._read_html_bytes(html_file))
+    
+    @staticmethod
+    def _read_html_bytes(html_file: Union[str, Path]) -> bytes:
+        """Read the raw bytes of an HTML file, failing clearly if it is missing"""
+        html_file = Path(html_file)
+        
+        if not html_file.is_file():
+            raise FileNotFoundError(f"HTML file not found: {html_file}")
+        
+        return html_file.read_bytes()
+    
+    @staticmethod
+    def _decode_html(data: bytes) -> str:
+        """Decode page bytes the way reading the file in text mode would (UTF-8, universal newlines)"""
+        return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    
     @staticmethod
     def _extract_title(soup: BeautifulSoup) -> str:
         """Extract page title"""
@@ -564,7 +989,7 @@ def extract_landing_page_content(html_file: Union[str, Path]) -> str:
     Returns:
         Consolidated advertising copy
     """
-    extracted = HTMLParser.extract_text_from_html(html_file)
+    extracted = HTMLParser.extract_cached(html_file)
     return HTMLParser.consolidate_content_for_prompt(extracted)
 
 def validate_project_structure() -> Dict[str, bool]:
@@ -0,0 +1,141 @@
+"""
+Lightweight local HTTP listener for Flux API webhook completions
+"""
+import json
+import logging
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from config import FluxConfig
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class WebhookReceiver:
+    """
+    Background HTTP server that receives generation completions
+    
+    Every POST to the receiver's webhook URL is parsed as JSON and handed
+    to the callback. The URL path carries a random token, so requests that
+    do not know the token are rejected.
+    
+    Usage:
+        with WebhookReceiver(callback=completions.put) as receiver:
+            client.submit_generation(prompt, webhook_url=receiver.webhook_url)
+    """
+
+    def __init__(self,
+                 callback: Callable[[Dict[str, Any]], None],
+                 host: str = None,
+                 port: int = None,
+                 public_url: str = None):
+        """
+        Initialize webhook receiver
+        
+        Args:
+            callback: Called with each completion payload (from a server thread)
+            host: Interface to listen on (defaults to config)
+            port: Port to listen on, 0 picks a free port (defaults to config)
+            public_url: Externally reachable base URL that forwards to this
+                listener, e.g. a tunnel (defaults to config, then http://host:port)
+        """
+        self.callback = callback
+        self.host = host if host is not None else FluxConfig.WEBHOOK_HOST
+        self.port = port if port is not None else FluxConfig.WEBHOOK_PORT
+        self.public_url = public_url or FluxConfig.WEBHOOK_PUBLIC_URL
+        self.path = f"/flux-webhook/{secrets.token_urlsafe(16)}"
+        self.received = 0
+        
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def webhook_url(self) -> str:
+        """URL to pass as webhook_url when submitting requests"""
+        if self._server is None:
+            raise RuntimeError("Webhook receiver is not running")
+        
+        base_url = self.public_url or f"http://{self.host}:{self._server.server_address[1]}"
+        return base_url.rstrip('/') + self.path
+
+    def start(self) -> "WebhookReceiver":
+        """Start listening in a background thread"""
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != receiver.path:
+                    self.send_error(404)
+                    return
+                
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                except (ValueError, json.JSONDecodeError) as e:
+                    logger.warning(f"Ignoring malformed webhook payload: {str(e)}")
+                    self.send_error(400)
+                    return
+                
+                # Acknowledge first so the API is never kept waiting on our callback
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                
+                receiver.received += 1
+                try:
+                    receiver.callback(payload)
+                except Exception as e:
+                    logger.error(f"Webhook callback failed: {str(e)}")
+
+            def log_message(self, format, *args):
+                logger.debug(f"Webhook: {format % args}")
+        
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        
+        logger.info(f"Webhook receiver listening on {self.host}:{self._server.server_address[1]}")
+        return self
+
+    def stop(self):
+        """Stop the listener"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+            logger.info(f"Webhook receiver stopped ({self.received} completions received)")
+
+    def __enter__(self) -> "WebhookReceiver":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+def parse_webhook_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize a webhook payload to the shape of a polling result
+    
+    Args:
+        payload: JSON body posted by the API
+    
+    Returns:
+        Dictionary with 'id', 'status' ("Ready", "Error", ...) and 'result'
+    """
+    request_id = payload.get('id') or payload.get('task_id')
+    status = payload.get('status', '')
+    
+    # Webhooks may report SUCCESS/FAILED instead of the polling statuses
+    status_map = {'SUCCESS': 'Ready', 'FAILED': 'Error', 'ERROR': 'Error'}
+    status = status_map.get(str(status).upper(), status)
+    
+    return {
+        **payload,
+        'id': request_id,
+        'status': status,
+        'result': payload.get('result') or {}
+    }
@@ -0,0 +1,131 @@
+import io
+import sys
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'python-scripts'))
+
+from config import FluxConfig
+from async_flux_api_client import AsyncFluxAPIClient
+
+def jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+class FakeBFLServer:
+    """
+    Minimal BFL API: submissions return a polling URL, each job reports
+    Pending once and then Ready, and the sample URL serves a small JPEG.
+    The first submission is answered with 429 + Retry-After, and the first
+    poll of the first job with a 503.
+    """
+
+    RETRY_AFTER = 0.3
+
+    def __init__(self):
+        self.jobs = {}
+        self.submissions = []
+        self.rate_limited_at = None
+        self.failed_poll = False
+        self.image = jpeg_bytes()
+
+        self.app = web.Application()
+        self.app.router.add_post('/v1/flux-kontext-pro', self.submit)
+        self.app.router.add_get('/v1/get_result', self.get_result)
+        self.app.router.add_get('/images/{request_id}.jpeg', self.sample)
+        self.server = TestServer(self.app)
+
+    @property
+    def base_url(self):
+        return str(self.server.make_url(''))
+
+    async def submit(self, request):
+        if self.rate_limited_at is None:
+            self.rate_limited_at = time.monotonic()
+            return web.json_response({'detail': 'Too many requests'}, status=429,
+                                     headers={'Retry-After': str(self.RETRY_AFTER)})
+
+        payload = await request.json()
+        request_id = f"req-{len(self.submissions)}"
+        self.submissions.append((time.monotonic(), payload))
+        self.jobs[request_id] = 0
+        return web.json_response({'id': request_id, 'polling_url': f"{self.base_url}/v1/get_result"})
+
+    async def get_result(self, request):
+        request_id = request.query['id']
+        if request_id == 'req-0' and not self.failed_poll:
+            self.failed_poll = True
+            return web.Response(status=503, text='Service unavailable')
+
+        self.jobs[request_id] += 1
+        if self.jobs[request_id] == 1:
+            return web.json_response({'id': request_id, 'status': 'Pending'})
+        return web.json_response({
+            'id': request_id,
+            'status': 'Ready',
+            'result': {'sample': f"{self.base_url}/images/{request_id}.jpeg"}
+        })
+
+    async def sample(self, request):
+        return web.Response(body=self.image, content_type='image/jpeg')
+
+class AsyncFluxAPIClientTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        for name, value in (('POLLING_INTERVAL', 0.05), ('POLLING_MAX_INTERVAL', 0.1), ('BACKOFF_BASE', 0.05)):
+            patcher = mock.patch.object(FluxConfig, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.output_dir = Path(self.temp_dir.name)
+
+        self.fake = FakeBFLServer()
+        await self.fake.server.start_server()
+        self.addAsyncCleanup(self.fake.server.close)
+
+        self.client = AsyncFluxAPIClient(api_key='test-key', base_url=self.fake.base_url)
+        self.addAsyncCleanup(self.client.close)
+
+    async def test_generate_and_download_retries_rate_limit_and_server_error(self):
+        result = await self.client.generate_and_download('A red square', filename='square', directory=self.output_dir)
+
+        self.assertEqual(result['status'], 'completed', result.get('error'))
+        self.assertEqual(Path(result['local_path']).read_bytes(), self.fake.image)
+
+        # The 429 was retried no sooner than its Retry-After, the 503 poll was retried too
+        [(submitted_at, payload)] = self.fake.submissions
+        self.assertGreaterEqual(submitted_at - self.fake.rate_limited_at, FakeBFLServer.RETRY_AFTER - 0.05)
+        self.assertEqual(payload['prompt'], 'A red square')
+        self.assertTrue(self.fake.failed_poll)
+        self.assertEqual(result['generation_result']['polling_stats']['transient_errors'], 1)
+        self.assertGreaterEqual(self.client.rate_limiter.stats()['throttled_requests'], 1)
+
+    async def test_batch_generate_downloads_every_prompt_in_order(self):
+        prompts = ['First prompt', {'prompt': 'Second prompt', 'seed': 7}, 'Third prompt']
+
+        results = await self.client.batch_generate(prompts, output_directory=self.output_dir, max_concurrency=2)
+
+        self.assertEqual([r['status'] for r in results], ['completed'] * 3, results)
+        self.assertEqual([r['prompt'] for r in results], ['First prompt', 'Second prompt', 'Third prompt'])
+        self.assertEqual(len({r['local_path'] for r in results}), 3)
+        for result in results:
+            self.assertEqual(Path(result['local_path']).read_bytes(), self.fake.image)
+
+        # The rate-limited submission was retried once the shared limiter's Retry-After pause ended
+        self.assertEqual(len(self.fake.submissions), 3)
+        last_submitted_at = max(submitted_at for submitted_at, _ in self.fake.submissions)
+        self.assertGreaterEqual(last_submitted_at - self.fake.rate_limited_at, FakeBFLServer.RETRY_AFTER - 0.05)
+        self.assertGreaterEqual(self.client.rate_limiter.stats()['throttled_requests'], 1)
+        self.assertEqual({payload.get('seed') for _, payload in self.fake.submissions}, {None, 7})
+
+if __name__ == '__main__':
+    unittest.main()
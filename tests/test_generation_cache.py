@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'python-scripts'))
+
+from config import CacheConfig
+from flux_api_client import FluxAPIClient
+from generation_cache import GenerationCache
+
+def ready_result(name):
+    return {'id': name, 'status': 'Ready', 'result': {'sample': f"https://cdn.example/{name}.jpeg"}}
+
+class CacheKeyTest(unittest.TestCase):
+    def test_key_is_stable(self):
+        payload = {'prompt': 'A red  square\n on white', 'seed': 1, 'aspect_ratio': '1:1'}
+        reordered = {'aspect_ratio': '1:1', 'seed': 1, 'prompt': 'A red square on white'}
+
+        self.assertEqual(GenerationCache.key_for('flux_pro', payload), GenerationCache.key_for('flux_pro', reordered))
+        self.assertNotEqual(GenerationCache.key_for('flux_pro', payload), GenerationCache.key_for('flux_dev', payload))
+        self.assertNotEqual(GenerationCache.key_for('flux_pro', payload),
+                            GenerationCache.key_for('flux_pro', {**payload, 'seed': 2}))
+
+    def test_webhook_url_is_not_part_of_the_key(self):
+        payload = {'prompt': 'A red square', 'seed': 1}
+        self.assertEqual(GenerationCache.key_for('flux_pro', payload),
+                         GenerationCache.key_for('flux_pro', {**payload, 'webhook_url': 'https://hook.example/a'}))
+
+    def test_input_image_bytes_are_part_of_the_key(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            red, blue = Path(temp_dir) / 'red.png', Path(temp_dir) / 'blue.png'
+            Image.new('RGB', (8, 8), 'red').save(red)
+            Image.new('RGB', (8, 8), 'blue').save(blue)
+
+            keys = [
+                GenerationCache.key_for('flux_kontext', FluxAPIClient.build_edit_payload('Make it pop', path, seed=1))
+                for path in (red, red, blue)
+            ]
+
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+
+class GenerationCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.directory = Path(self.temp_dir.name)
+
+    def put(self, cache, key, size=4096):
+        image_path = cache.image_path(key, 'jpg')
+        image_path.write_bytes(os.urandom(size))
+        cache.put(key, ready_result(key), image_path)
+
+    def test_round_trip(self):
+        cache = GenerationCache(self.directory)
+        self.put(cache, 'k1')
+
+        cached = cache.get('k1')
+        self.assertEqual(cached['id'], 'k1')
+        self.assertTrue(cached['cached'])
+        self.assertEqual(Path(cached['cache_path']), cache.image_path('k1', 'jpg'))
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_least_recently_used_entries_are_evicted_above_the_size_limit(self):
+        # Room for two 4KB entries but not three
+        cache = GenerationCache(self.directory, max_size_mb=10 / 1024)
+        self.put(cache, 'k1')
+        time.sleep(0.01)
+        self.put(cache, 'k2')
+        time.sleep(0.01)
+        self.assertIsNotNone(cache.get('k1'))
+        time.sleep(0.01)
+        self.put(cache, 'k3')
+
+        self.assertIsNotNone(cache.get('k1'))
+        self.assertIsNone(cache.get('k2'))
+        self.assertIsNotNone(cache.get('k3'))
+        self.assertFalse(cache.image_path('k2', 'jpg').exists())
+
+        # Only the surviving entries are left on disk
+        self.assertEqual(sorted(path.stem for path in self.directory.glob('*.json')), ['k1', 'k3'])
+
+    def test_expired_entries_are_removed(self):
+        cache = GenerationCache(self.directory, max_age_days=1)
+        self.put(cache, 'k1')
+        self.put(cache, 'k2')
+
+        later = time.time() + 2 * 24 * 3600
+        with mock.patch('generation_cache.time.time', return_value=later):
+            self.assertIsNone(cache.get('k1'))
+            cache.evict()
+
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+class ClientCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.cache = GenerationCache(Path(self.temp_dir.name))
+
+    def client(self, **kwargs):
+        client = FluxAPIClient(api_key='test-key', base_url='http://127.0.0.1:9', use_cache=False, **kwargs)
+        client.cache = self.cache
+        return client
+
+    def test_only_seeded_requests_are_cached_by_default(self):
+        client = self.client()
+        self.assertIsNone(client._cache_key('flux_pro', {'prompt': 'A red square'}))
+        self.assertIsNotNone(client._cache_key('flux_pro', {'prompt': 'A red square', 'seed': 1}))
+
+        with mock.patch.object(CacheConfig, 'CACHE_UNSEEDED', True):
+            self.assertIsNotNone(client._cache_key('flux_pro', {'prompt': 'A red square'}))
+
+    def test_refresh_skips_lookups_but_stores_fresh_results(self):
+        def download(image_url, filename, directory):
+            path = Path(directory) / filename
+            path.write_bytes(image_url.encode())
+            return path
+
+        key = GenerationCache.key_for('flux_pro', {'prompt': 'A red square', 'seed': 1})
+        with mock.patch.object(FluxAPIClient, 'download_image', side_effect=download):
+            self.client()._store_cache(key, ready_result('first'))
+            self.assertEqual(self.client()._lookup_cache(key)['id'], 'first')
+
+            refreshing = self.client(refresh_cache=True)
+            self.assertIsNone(refreshing._lookup_cache(key))
+            refreshing._store_cache(key, ready_result('second'))
+
+        cached = self.client()._lookup_cache(key)
+        self.assertEqual(cached['id'], 'second')
+        self.assertEqual(Path(cached['cache_path']).read_bytes(), b'https://cdn.example/second.jpeg')
+
+if __name__ == '__main__':
+    unittest.main()
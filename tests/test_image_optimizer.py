@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from image_optimizer import ImageOptimizer, ResponsiveVariantGenerator
+
+def write_noise_jpeg(path, size):
+    # Noise does not compress, so a quality-95 JPEG of this size lands above the 2MB threshold
+    Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3)).save(path, 'JPEG', quality=95)
+
+class ResumeTotalsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.temp_dir.name)
+
+        os.mkdir('images')
+        for name in ('a.jpg', 'b.jpg', 'c.jpg'):
+            write_noise_jpeg(os.path.join('images', name), (1800, 1500))
+        Image.new('RGB', (64, 64)).save(os.path.join('images', 'small.png'))
+
+    def test_interrupted_run_resumes_with_consistent_totals(self):
+        optimizer = ImageOptimizer(backup_dir='backups')
+        optimize_image = optimizer.optimize_image
+        calls = []
+
+        def interrupt_on_third_file(file_path, dry_run=False):
+            calls.append(file_path)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return optimize_image(file_path, dry_run)
+
+        with mock.patch.object(optimizer, 'optimize_image', side_effect=interrupt_on_third_file):
+            with self.assertRaises(KeyboardInterrupt):
+                optimizer.run('images')
+
+        resumed = ImageOptimizer(backup_dir='backups')
+        resumed.run('images')
+
+        self.assertEqual(resumed.stats['total_files'], 4)
+        self.assertEqual(resumed.stats['resumed_files'], 2)
+        self.assertEqual(resumed.stats['unchanged_files'], 0)
+        self.assertEqual(resumed.stats['processed_files'], 3)
+        self.assertEqual(resumed.stats['skipped_files'], 1)
+
+        # Every file record in the report is counted in its summary, exactly once
+        [report_path] = Path('.').glob('optimization_report_*.jsonl')
+        with open(report_path) as f:
+            records = [json.loads(line) for line in f]
+        files = [r for r in records if r['record'] == 'file']
+        [summary] = [r for r in records if r['record'] == 'summary']
+
+        self.assertEqual(sorted(r['file'] for r in files), sorted(str(p) for p in Path('images').iterdir()))
+        self.assertEqual(summary['processed_files'] + summary['skipped_files'], len(files))
+        self.assertEqual(summary['resumed_files'], 2)
+
+class ResponsiveVariantTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.site = Path(self.temp_dir.name) / 'site'
+        (self.site / 'images' / 'stage').mkdir(parents=True)
+        Image.new('RGB', (1000, 600), 'red').save(self.site / 'images' / 'stage' / 'hero.jpg')
+
+        # Run from outside the scanned directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.temp_dir.name)
+
+    def generate(self, formats):
+        generator = ResponsiveVariantGenerator(output_dir=self.site / 'variants', widths=[480], formats=formats,
+                                               backup_dir=self.site / 'backups')
+        generator.run(str(self.site))
+        with open(generator.manifest_path) as f:
+            return json.load(f)
+
+    def test_paths_are_relative_to_the_scanned_directory(self):
+        manifest = self.generate(['webp'])
+
+        self.assertIn('path_convention', manifest)
+        entry = manifest['images']['images/stage/hero.jpg']
+        self.assertEqual([v['path'] for v in entry['variants']], ['variants/images/stage/hero-480w.webp'])
+        self.assertEqual(entry['srcset'], {'webp': '/variants/images/stage/hero-480w.webp 480w'})
+
+    def test_variants_of_dropped_formats_are_removed(self):
+        self.generate(['webp', 'jpeg'])
+        self.assertTrue((self.site / 'variants' / 'images' / 'stage' / 'hero-480w.jpeg').exists())
+
+        manifest = self.generate(['webp'])
+
+        self.assertEqual(sorted(p.name for p in (self.site / 'variants' / 'images' / 'stage').iterdir()),
+                         ['hero-480w.webp'])
+        self.assertEqual(list(manifest['images']['images/stage/hero.jpg']['srcset']), ['webp'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'python-scripts'))
+
+from prompt_generator import AdvancedPromptGenerator
+
+# Copies whose keyword matches are easy to get wrong in a single scan
+TRICKY_COPIES = {
+    'overlapping keywords': "Boostart your techallenge: accessecure tools for the overwhelmedigital team.",
+    'nested keywords': "Our budget software targets hardware teams. Knowledge is power for insecure closers. "
+                       "Technology courses with accessibility built in.",
+    'non-ASCII text': "İSTANBUL'daki ŞİRKETLER struggle with paperwork. İİİ Ünlü girişimciler are stressed. "
+                      "Our platform is not complicated.",
+    'upper-case keyword': "The B2B tool for ENTREPRENEURS. Save $500 today!",
+    'CTA trigger only': "Just click. Or start. Then sign the form and book.",
+    'benefit trigger only': "We save, you gain; improve!",
+    'trigger inside another word': "A getaway for startups that bookmark signposts.",
+    'value and CTA patterns': "Increase revenue by 50% in 90 days. Get 3x results. Get access now. Sign up today.",
+    'empty copy': ""
+}
+
+class CopyAnalyzerTest(unittest.TestCase):
+    def setUp(self):
+        self.generator = AdvancedPromptGenerator()
+
+    def test_single_pass_analysis_matches_the_reference(self):
+        for case, ad_copy in TRICKY_COPIES.items():
+            with self.subTest(case):
+                self.assertEqual(self.generator.analyze_advertising_copy(ad_copy),
+                                 self.generator.analyze_advertising_copy_reference(ad_copy))
+
+    def test_non_ascii_pain_points_keep_their_sentences(self):
+        analysis = self.generator.analyze_advertising_copy(TRICKY_COPIES['non-ASCII text'])
+        self.assertEqual(analysis['pain_points'], [
+            "İSTANBUL'daki ŞİRKETLER struggle with paperwork",
+            "Our platform is not complicated",
+            "İİİ Ünlü girişimciler are stressed"
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
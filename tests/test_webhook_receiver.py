@@ -0,0 +1,195 @@
+import sys
+import json
+import queue
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'python-scripts'))
+
+from config import FluxConfig
+from flux_api_client import FluxAPIClient
+from webhook_receiver import WebhookReceiver, parse_webhook_payload
+
+def post_json(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.status
+
+class WebhookReceiverTest(unittest.TestCase):
+    def setUp(self):
+        self.payloads = queue.Queue()
+        self.receiver = WebhookReceiver(callback=self.payloads.put, host='127.0.0.1', port=0)
+        self.receiver.start()
+        self.addCleanup(self.receiver.stop)
+
+    def test_posts_to_the_token_path_reach_the_callback(self):
+        self.assertEqual(post_json(self.receiver.webhook_url, {'id': 'a', 'status': 'SUCCESS'}), 200)
+        self.assertEqual(self.payloads.get(timeout=5), {'id': 'a', 'status': 'SUCCESS'})
+        self.assertEqual(self.receiver.received, 1)
+
+    def test_posts_without_the_token_are_rejected(self):
+        parts = urlsplit(self.receiver.webhook_url)
+        for path in ('/flux-webhook/wrong-token', '/'):
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                post_json(f"{parts.scheme}://{parts.netloc}{path}", {'id': 'a', 'status': 'SUCCESS'})
+            self.assertEqual(raised.exception.code, 404)
+        self.assertTrue(self.payloads.empty())
+
+    def test_malformed_payload_is_rejected(self):
+        request = urllib.request.Request(self.receiver.webhook_url, data=b'{not json')
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(request, timeout=5)
+        self.assertEqual(raised.exception.code, 400)
+        self.assertTrue(self.payloads.empty())
+
+    def test_reply_is_sent_before_the_callback_runs(self):
+        release = threading.Event()
+        finished = threading.Event()
+
+        def slow_callback(payload):
+            release.wait(5)
+            finished.set()
+
+        self.receiver.callback = slow_callback
+        self.assertEqual(post_json(self.receiver.webhook_url, {'id': 'a'}), 200)
+        self.assertFalse(finished.is_set())
+
+        release.set()
+        self.assertTrue(finished.wait(5))
+
+class ParseWebhookPayloadTest(unittest.TestCase):
+    def test_statuses_map_to_polling_statuses(self):
+        cases = {'SUCCESS': 'Ready', 'success': 'Ready', 'FAILED': 'Error', 'ERROR': 'Error',
+                 'Ready': 'Ready', 'Pending': 'Pending', 'Running': 'Running'}
+        for status, expected in cases.items():
+            self.assertEqual(parse_webhook_payload({'id': 'a', 'status': status})['status'], expected)
+
+    def test_task_id_and_missing_result(self):
+        result = parse_webhook_payload({'task_id': 'b', 'status': 'SUCCESS'})
+        self.assertEqual(result['id'], 'b')
+        self.assertEqual(result['result'], {})
+
+        result = parse_webhook_payload({'id': 'c', 'status': 'SUCCESS', 'result': {'sample': 'https://x/c.jpeg'}})
+        self.assertEqual(result['result'], {'sample': 'https://x/c.jpeg'})
+
+class StubBFLServer:
+    """
+    BFL API stub for webhook batches
+
+    Each submission's prompt picks what happens to it: "complete" posts a
+    progress webhook, a SUCCESS webhook and a duplicate of it; "fail" posts
+    a FAILED webhook; "silent-ready" and "silent-pending" post nothing and
+    report Ready or Pending when polled. An unknown id is posted as well.
+    """
+
+    def __init__(self):
+        self.polled = []
+        self.jobs = {}
+        self.threads = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                request_id = f"req-{len(stub.jobs)}"
+                stub.jobs[request_id] = payload['prompt']
+                stub.reply({'id': request_id, 'polling_url': f"{stub.base_url}/v1/get_result"}, self)
+
+                thread = threading.Thread(target=stub.post_webhooks,
+                                          args=(payload['webhook_url'], request_id, payload['prompt']))
+                thread.start()
+                stub.threads.append(thread)
+
+            def do_GET(self):
+                request_id = parse_qs(urlsplit(self.path).query)['id'][0]
+                stub.polled.append(request_id)
+                if stub.jobs[request_id] == 'silent-ready':
+                    stub.reply(stub.ready(request_id), self)
+                else:
+                    stub.reply({'id': request_id, 'status': 'Pending'}, self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @staticmethod
+    def reply(body, handler):
+        data = json.dumps(body).encode()
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    @staticmethod
+    def ready(request_id):
+        return {'id': request_id, 'status': 'Ready', 'result': {'sample': f"https://cdn.example/{request_id}.jpeg"}}
+
+    def post_webhooks(self, webhook_url, request_id, prompt):
+        if prompt == 'complete':
+            post_json(webhook_url, {'id': request_id, 'status': 'Pending'})
+            post_json(webhook_url, {**self.ready(request_id), 'status': 'SUCCESS'})
+            post_json(webhook_url, {**self.ready(request_id), 'status': 'SUCCESS'})
+            post_json(webhook_url, {'id': 'unknown-request', 'status': 'SUCCESS'})
+        elif prompt == 'fail':
+            post_json(webhook_url, {'id': request_id, 'status': 'FAILED', 'error': 'Content moderated'})
+
+    def close(self):
+        for thread in self.threads:
+            thread.join()
+        self.server.shutdown()
+        self.server.server_close()
+
+class BatchGenerateWebhookTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(FluxConfig, 'WEBHOOK_TIMEOUT', 1.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.stub = StubBFLServer()
+        self.addCleanup(self.stub.close)
+        self.client = FluxAPIClient(api_key='test-key', base_url=self.stub.base_url, use_cache=False)
+
+    def test_completions_are_downloaded_and_missing_webhooks_fall_back_to_polling(self):
+        downloads = []
+
+        def download(index, total, prompt, result, output_directory, cache_key=None, filename=None):
+            downloads.append((index, result['id'], result['status'], filename))
+            return {'status': 'completed', 'prompt': prompt, 'local_path': f"{filename}.jpeg"}
+
+        prompts = [
+            {'prompt': 'complete', 'filename': 'vivid_01'},
+            'fail',
+            'silent-ready',
+            'silent-pending'
+        ]
+        with mock.patch.object(self.client, '_download_batch_result', side_effect=download):
+            results = self.client.batch_generate_webhook(
+                prompts, output_directory=Path(self.temp_dir.name), webhook_port=0
+            )
+
+        # The completion posted by webhook and the one found by the fallback poll are each downloaded once
+        self.assertEqual(sorted(downloads), [(0, 'req-0', 'Ready', 'vivid_01'), (2, 'req-2', 'Ready', None)])
+        self.assertEqual([r['status'] for r in results], ['completed', 'failed', 'completed', 'failed'])
+        self.assertIn('Content moderated', results[1]['error'])
+        self.assertIn('Timed out waiting for webhook', results[3]['error'])
+
+        # Only the requests without a webhook were polled, once each
+        self.assertEqual(sorted(self.stub.polled), ['req-2', 'req-3'])
+
+if __name__ == '__main__':
+    unittest.main()